@@ -0,0 +1,77 @@
+"""
+Compara dois arquivos de resultados de `benchmarks.executar`.
+
+    python -m benchmarks.comparar antes.json depois.json --limite 1.2
+
+Sai com código 1 se algum benchmark ficou mais lento que `limite` vezes.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def _indexar(relatorio: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    indice: dict[str, dict[str, Any]] = {}
+    for r in relatorio.get("resultados", []):
+        parametros = ",".join(f"{k}={v}" for k, v in sorted(r["parametros"].items()))
+        indice[f"{r['benchmark']}[{parametros}]"] = r
+    return indice
+
+
+def comparar(
+    antes: dict[str, Any],
+    depois: dict[str, Any],
+    metrica: str = "mediana_s",
+) -> list[tuple[str, float, float, float]]:
+    """Devolve (benchmark, antes, depois, razão depois/antes) para os comuns."""
+    idx_antes = _indexar(antes)
+    idx_depois = _indexar(depois)
+
+    linhas = []
+    for chave in sorted(idx_antes.keys() & idx_depois.keys()):
+        t0 = idx_antes[chave][metrica]
+        t1 = idx_depois[chave][metrica]
+        razao = t1 / t0 if t0 else float("inf")
+        linhas.append((chave, t0, t1, razao))
+
+    return linhas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara resultados de benchmarks.")
+    parser.add_argument("antes", type=Path)
+    parser.add_argument("depois", type=Path)
+    parser.add_argument("--metrica", default="mediana_s", choices=["min_s", "mediana_s", "media_s"])
+    parser.add_argument(
+        "--limite",
+        type=float,
+        default=1.25,
+        help="Razão depois/antes a partir da qual conta como regressão.",
+    )
+    args = parser.parse_args()
+
+    antes = json.loads(args.antes.read_text(encoding="utf-8"))
+    depois = json.loads(args.depois.read_text(encoding="utf-8"))
+
+    print(
+        f"{antes['meta'].get('commit') or args.antes.name} -> "
+        f"{depois['meta'].get('commit') or args.depois.name} ({args.metrica})"
+    )
+
+    regressoes = 0
+    for chave, t0, t1, razao in comparar(antes, depois, args.metrica):
+        marcador = ""
+        if razao >= args.limite:
+            marcador = "  <-- REGRESSÃO"
+            regressoes += 1
+        print(f"{chave:<65} {t0:>10.4f}s {t1:>10.4f}s {razao:>6.2f}x{marcador}")
+
+    sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Benchmarks das etapas principais do monitor.
+
+Exemplos:
+    python -m benchmarks.executar --rapido
+    python -m benchmarks.executar --saida benchmarks/resultados/$(git rev-parse --short HEAD).json
+    python -m benchmarks.comparar antes.json depois.json
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from src.config import AppConfig, load_config
+from src.dashboard_html import gerar_dashboard_html
+from src.disponibilidade import calcular_disponibilidade, interpretar_janelas
+from src.monitor import carregar_produtos_csv, comparar_com_estado_anterior
+from src.registros import ProdutoRegistro
+from src.relatorio_excel import gerar_relatorio_excel
+from src.state import atualizar_historico
+from src.validacao import validar_produtos
+
+from .geradores import (
+    gerar_catalogo_csv,
+    gerar_estado_anterior,
+    gerar_historico,
+    gerar_produtos,
+)
+
+
+TAMANHOS_CATALOGO = [10, 1_000, 10_000, 100_000]
+TAMANHOS_HISTORICO = [10_000, 100_000, 1_000_000]
+
+TAMANHOS_CATALOGO_RAPIDO = [10, 1_000]
+TAMANHOS_HISTORICO_RAPIDO = [10_000]
+
+
+def _medir(
+    funcao: Callable[[], Any],
+    repeticoes: int,
+    preparar: Callable[[], Any] | None = None,
+) -> dict[str, float]:
+    """Executa `funcao` várias vezes e devolve min/mediana/média em segundos."""
+    tempos: list[float] = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    return {
+        "min_s": round(min(tempos), 6),
+        "mediana_s": round(statistics.median(tempos), 6),
+        "media_s": round(statistics.fmean(tempos), 6),
+    }
+
+
+def _cfg_temporaria(base: AppConfig, pasta: Path) -> AppConfig:
+    """Config apontando todas as saídas para uma pasta temporária, sem integrações."""
+    cfg = dataclasses.replace(
+        base,
+        data_path=pasta / "produtos.csv",
+        estado_path=pasta / "estado_produtos.json",
+        historico_path=pasta / "historico_status.json",
+        impressao_path=pasta / "estado_produtos.fingerprint.json",
+        dashboard_output=pasta / "index.html",
+        excel_output=pasta / "produtos_ifood.xlsx",
+        log_path=pasta / "monitoramento_log.txt",
+        metricas_path=pasta / "metricas_execucao.json",
+        historico_execucoes_path=pasta / "historico_execucoes.json",
+        prometheus_path=None,
+    )
+    cfg.github = dataclasses.replace(cfg.github, token="", repository="")
+    cfg.telegram = dataclasses.replace(cfg.telegram, token="", chat_id="")
+    return cfg
+
+
+def bench_catalogo(cfg: AppConfig, n_produtos: int, repeticoes: int) -> list[dict[str, Any]]:
+    """Benchmarks que escalam com o tamanho do catálogo."""
+    resultados: list[dict[str, Any]] = []
+    parametros = {"produtos": n_produtos}
+
+    gerar_catalogo_csv(cfg.data_path, n_produtos)
+
+    resultados.append(
+        {
+            "benchmark": "carregar_produtos_csv",
+            "parametros": parametros,
+            **_medir(lambda: carregar_produtos_csv(cfg), repeticoes),
+        }
+    )
+
+    produtos = carregar_produtos_csv(cfg)
+
+    resultados.append(
+        {
+            "benchmark": "validar_produtos",
+            "parametros": parametros,
+            **_medir(lambda: validar_produtos(produtos), repeticoes),
+        }
+    )
+
+    estado_anterior = gerar_estado_anterior(gerar_produtos(n_produtos))
+    ts = "2025-01-01 12:00:00"
+
+    resultados.append(
+        {
+            "benchmark": "comparar_com_estado_anterior",
+            "parametros": parametros,
+            **_medir(
+                lambda: comparar_com_estado_anterior(produtos, estado_anterior, ts),
+                repeticoes,
+            ),
+        }
+    )
+
+    _, desaparecidos = comparar_com_estado_anterior(produtos, estado_anterior, ts)
+
+    resultados.append(
+        {
+            "benchmark": "gerar_relatorio_excel",
+            "parametros": parametros,
+            **_medir(
+                lambda: gerar_relatorio_excel(produtos, desaparecidos, cfg.excel_output),
+                repeticoes,
+            ),
+        }
+    )
+
+    return resultados
+
+
+def bench_historico(cfg: AppConfig, n_registros: int, repeticoes: int) -> list[dict[str, Any]]:
+    """Benchmarks que escalam com o tamanho do histórico."""
+    resultados: list[dict[str, Any]] = []
+    parametros = {"registros_historico": n_registros}
+
+    historico_base = gerar_historico(n_registros)
+    produtos = [
+        ProdutoRegistro.de_dict(r) for r in historico_base if r["tipo"] == "ATUAL"
+    ][:500]
+
+    # atualizar_historico anexa na lista recebida: cada repetição parte de uma cópia
+    copia: list[list[dict]] = []
+
+    def preparar() -> None:
+        copia[:] = [list(historico_base)]
+
+    resultados.append(
+        {
+            "benchmark": "atualizar_historico",
+            "parametros": parametros,
+            **_medir(
+                lambda: atualizar_historico(cfg.historico_path, copia[0], produtos, []),
+                repeticoes,
+                preparar,
+            ),
+        }
+    )
+
+    janelas = interpretar_janelas(cfg.janelas_disponibilidade)
+    resultados.append(
+        {
+            "benchmark": "calcular_disponibilidade",
+            "parametros": parametros,
+            **_medir(lambda: calcular_disponibilidade(historico_base, janelas), repeticoes),
+        }
+    )
+
+    resultados.append(
+        {
+            "benchmark": "gerar_dashboard_html",
+            "parametros": parametros,
+            **_medir(lambda: gerar_dashboard_html(historico_base, cfg), repeticoes),
+        }
+    )
+
+    return resultados
+
+
+def _commit_atual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def executar(
+    tamanhos_catalogo: list[int],
+    tamanhos_historico: list[int],
+    repeticoes: int,
+) -> dict[str, Any]:
+    resultados: list[dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(prefix="bench_ifood_") as tmp:
+        cfg = _cfg_temporaria(load_config(), Path(tmp))
+
+        for n in tamanhos_catalogo:
+            print(f"Catálogo com {n} produtos...", file=sys.stderr)
+            resultados.extend(bench_catalogo(cfg, n, repeticoes))
+
+        for n in tamanhos_historico:
+            print(f"Histórico com {n} registros...", file=sys.stderr)
+            resultados.extend(bench_historico(cfg, n, repeticoes))
+
+    return {
+        "meta": {
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "repeticoes": repeticoes,
+        },
+        "resultados": resultados,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks do monitor iFood.")
+    parser.add_argument(
+        "--catalogo",
+        type=int,
+        nargs="*",
+        help=f"Tamanhos de catálogo (padrão: {TAMANHOS_CATALOGO}).",
+    )
+    parser.add_argument(
+        "--historico",
+        type=int,
+        nargs="*",
+        help=f"Tamanhos de histórico (padrão: {TAMANHOS_HISTORICO}).",
+    )
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument(
+        "--rapido",
+        action="store_true",
+        help="Usa só os tamanhos pequenos (para rodar em segundos).",
+    )
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON de resultados.")
+    args = parser.parse_args()
+
+    # Os benchmarks chamam as funções reais: silencia os logs de INFO delas
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.rapido:
+        catalogo, historico = TAMANHOS_CATALOGO_RAPIDO, TAMANHOS_HISTORICO_RAPIDO
+    else:
+        catalogo, historico = TAMANHOS_CATALOGO, TAMANHOS_HISTORICO
+
+    if args.catalogo is not None:
+        catalogo = args.catalogo
+    if args.historico is not None:
+        historico = args.historico
+
+    relatorio = executar(catalogo, historico, args.repeticoes)
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+
+    if args.saida:
+        args.saida.parent.mkdir(parents=True, exist_ok=True)
+        args.saida.write_text(texto, encoding="utf-8")
+        print(f"Resultados salvos em {args.saida}", file=sys.stderr)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import random
+from pathlib import Path
+from typing import Any
+
+from src.utils import horario_brasil
+
+
+_PREFIXOS = ["Cumbuca", "Wrap", "Açaí", "Suchá", "Combo", "Mini", "Promoção", "Salada"]
+_SABORES = ["Frango", "Carne", "Veggie", "Low Carb", "Clássica", "Especial", "Picante"]
+
+
+def gerar_produtos(
+    n_produtos: int,
+    n_secoes: int | None = None,
+    taxa_off: float = 0.2,
+    seed: int = 42,
+) -> list[dict[str, Any]]:
+    """
+    Gera um catálogo sintético no mesmo formato de dict usado pelo monitor
+    (secao, nome, preco, descricao, status).
+    """
+    rnd = random.Random(seed)
+    n_secoes = n_secoes or max(1, min(200, n_produtos // 20))
+    secoes = [f"Seção {i:03d}" for i in range(n_secoes)]
+
+    produtos: list[dict[str, Any]] = []
+    for i in range(n_produtos):
+        preco = rnd.randint(290, 25990)
+        if rnd.random() < 0.15:
+            original = preco + rnd.randint(100, 5000)
+            preco_str = f"De R${original // 100},{original % 100:02d} por R${preco // 100},{preco % 100:02d}"
+        else:
+            preco_str = f"R$ {preco // 100},{preco % 100:02d}"
+
+        produtos.append(
+            {
+                "secao": secoes[i % n_secoes],
+                "nome": f"{rnd.choice(_PREFIXOS)} {rnd.choice(_SABORES)} #{i}",
+                "preco": preco_str,
+                "descricao": f"Descrição sintética do produto {i}.",
+                "status": "OFF" if rnd.random() < taxa_off else "ON",
+            }
+        )
+
+    return produtos
+
+
+def gerar_catalogo_csv(
+    path: str | Path,
+    n_produtos: int,
+    n_secoes: int | None = None,
+    taxa_off: float = 0.2,
+    seed: int = 42,
+) -> Path:
+    """Grava um CSV sintético com as mesmas colunas de `produtos_ifood_demo.csv`."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+
+    with p.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Secao", "Produto", "Preco", "Descricao", "Status"])
+        for prod in gerar_produtos(n_produtos, n_secoes, taxa_off, seed):
+            writer.writerow(
+                [prod["secao"], prod["nome"], prod["preco"], prod["descricao"], prod["status"]]
+            )
+
+    return p
+
+
+def gerar_estado_anterior(
+    produtos: list[dict[str, Any]],
+    taxa_removidos: float = 0.05,
+    seed: int = 7,
+) -> dict[str, dict[str, Any]]:
+    """
+    Monta um estado anterior no formato de `estado_produtos.json`, incluindo
+    uma fração de produtos que não existem no catálogo atual (desaparecidos).
+    """
+    rnd = random.Random(seed)
+    ts = str(horario_brasil())
+    estado: dict[str, dict[str, Any]] = {}
+
+    for prod in produtos:
+        estado[f"{prod['secao']}|{prod['nome']}"] = {
+            "Seção": prod["secao"],
+            "Produto": prod["nome"],
+            "Preço": prod["preco"],
+            "Descrição": prod["descricao"],
+            "Status": "ON" if rnd.random() < 0.9 else "OFF",
+            "Última verificação": ts,
+        }
+
+    n_removidos = int(len(produtos) * taxa_removidos)
+    for i in range(n_removidos):
+        estado[f"Seção Antiga|Produto Removido #{i}"] = {
+            "Seção": "Seção Antiga",
+            "Produto": f"Produto Removido #{i}",
+            "Preço": "R$ 10,00",
+            "Descrição": "",
+            "Status": "ON",
+            "Última verificação": ts,
+        }
+
+    return estado
+
+
+def gerar_historico(
+    n_registros: int,
+    n_produtos: int = 500,
+    n_secoes: int | None = None,
+    seed: int = 42,
+) -> list[dict[str, Any]]:
+    """
+    Gera um histórico sintético no formato novo (lista de registros planos com
+    timestamp, secao, nome, preco, descricao, status, tipo), simulando uma
+    execução por hora com `n_produtos` produtos em cada uma.
+    """
+    rnd = random.Random(seed)
+    produtos = gerar_produtos(n_produtos, n_secoes, seed=seed)
+    inicio = horario_brasil().replace(minute=0, second=0, microsecond=0)
+
+    historico: list[dict[str, Any]] = []
+    execucao = 0
+    while len(historico) < n_registros:
+        ts = str(inicio - dt.timedelta(hours=n_registros // n_produtos - execucao))
+        for prod in produtos:
+            if len(historico) >= n_registros:
+                break
+            desapareceu = rnd.random() < 0.01
+            historico.append(
+                {
+                    "timestamp": ts,
+                    "secao": prod["secao"],
+                    "nome": prod["nome"],
+                    "preco": prod["preco"],
+                    "descricao": prod["descricao"],
+                    "status": "OFF (Desapareceu)" if desapareceu
+                    else ("OFF" if rnd.random() < 0.2 else "ON"),
+                    "tipo": "DESAPARECIDO" if desapareceu else "ATUAL",
+                }
+            )
+        execucao += 1
+
+    return historico
+
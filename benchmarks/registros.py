@@ -0,0 +1,156 @@
+"""
+Compara o fluxo antigo (DataFrame → dict por produto → resultado validado
+pelo Pydantic) com o fluxo com `ProdutoRegistro`, em memória e CPU.
+
+    python -m benchmarks.registros --produtos 100000
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from src.config import AppConfig, load_config
+from src.models import Produto, ResultadoMonitoramento
+from src.monitor import carregar_produtos_csv, comparar_com_estado_anterior
+
+from .geradores import gerar_catalogo_csv, gerar_estado_anterior, gerar_produtos
+
+
+def pipeline_dicts(cfg: AppConfig, estado_anterior: dict) -> list[dict[str, Any]]:
+    """Fluxo antigo: pandas + iterrows, dicts por produto, resultado validado."""
+    import pandas as pd
+
+    df = pd.read_csv(cfg.data_path)
+    df.columns = [c.strip().lower() for c in df.columns]
+    df = df.rename(columns={"produto": "nome"})
+
+    produtos = [
+        {
+            "secao": row["secao"],
+            "nome": row["nome"],
+            "preco": row["preco"],
+            "descricao": row.get("descricao", ""),
+            "status": row["status"],
+        }
+        for _, row in df.iterrows()
+    ]
+
+    atuais = {f"{p['secao']}|{p['nome']}": p for p in produtos}
+    off = [
+        {
+            "secao": p["secao"],
+            "nome": p["nome"],
+            "preco": p.get("preco", ""),
+            "descricao": p.get("descricao", ""),
+            "status": p.get("status", "DESCONHECIDO"),
+        }
+        for p in atuais.values()
+        if str(p.get("status", "")).upper() != "ON"
+    ]
+    desaparecidos = [
+        {
+            "secao": chave.split("|", 1)[0],
+            "nome": chave.split("|", 1)[1],
+            "preco": info.get("Preço", "N/A"),
+            "descricao": info.get("Descrição", ""),
+            "status": "OFF (Desapareceu)",
+        }
+        for chave, info in estado_anterior.items()
+        if chave not in atuais
+    ]
+
+    ResultadoMonitoramento(
+        total_produtos=len(produtos),
+        produtos_off=off,
+        produtos_desaparecidos=desaparecidos,
+        total_produtos_ativos=len(produtos) - len(off) - len(desaparecidos),
+        timestamp="",
+    )
+    return produtos
+
+
+def pipeline_registros(cfg: AppConfig, estado_anterior: dict) -> list[Any]:
+    """Fluxo novo: csv → `ProdutoRegistro`, resultado montado sem revalidar."""
+    produtos = carregar_produtos_csv(cfg)
+    off, desaparecidos = comparar_com_estado_anterior(produtos, estado_anterior, "")
+
+    ResultadoMonitoramento.model_construct(
+        total_produtos=len(produtos),
+        produtos_off=[Produto.model_construct(**p.como_dict()) for p in off],
+        produtos_desaparecidos=[
+            Produto.model_construct(**p.como_dict()) for p in desaparecidos
+        ],
+        total_produtos_ativos=len(produtos) - len(off) - len(desaparecidos),
+        timestamp="",
+    )
+    return produtos
+
+
+def _medir(
+    funcao: Callable[[AppConfig, dict], Any],
+    cfg: AppConfig,
+    estado_anterior: dict,
+) -> dict[str, float]:
+    # Aquecimento (imports do pandas/pydantic não entram na conta)
+    funcao(cfg, estado_anterior)
+
+    # CPU sem tracemalloc (ele deixa tudo bem mais lento)
+    gc.collect()
+    inicio = time.perf_counter()
+    funcao(cfg, estado_anterior)
+    cpu_s = time.perf_counter() - inicio
+
+    # Memória retida pela lista de produtos (o que atravessa o pipeline todo)
+    gc.collect()
+    tracemalloc.start()
+    produtos = funcao(cfg, estado_anterior)
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del produtos
+
+    return {
+        "cpu_s": round(cpu_s, 4),
+        "memoria_retida_mb": round(retido / 1024 / 1024, 2),
+        "memoria_pico_mb": round(pico / 1024 / 1024, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dicts vs ProdutoRegistro.")
+    parser.add_argument("--produtos", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_registros_") as tmp:
+        cfg = dataclasses.replace(load_config(), data_path=Path(tmp) / "produtos.csv")
+        gerar_catalogo_csv(cfg.data_path, args.produtos)
+        estado_anterior = gerar_estado_anterior(gerar_produtos(args.produtos))
+
+        dicts = _medir(pipeline_dicts, cfg, estado_anterior)
+        registros = _medir(pipeline_registros, cfg, estado_anterior)
+
+    print(
+        json.dumps(
+            {
+                "produtos": args.produtos,
+                "dicts": dicts,
+                "registros": registros,
+                "reducao_memoria": round(
+                    1 - registros["memoria_retida_mb"] / dicts["memoria_retida_mb"], 3
+                ),
+                "reducao_cpu": round(1 - registros["cpu_s"] / dicts["cpu_s"], 3),
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Orçamento de inicialização do `src.monitor`.
+
+Mede, em subprocessos novos:
+  - o tempo cumulativo de `import src.monitor` via `python -X importtime`
+  - o tempo total (wall clock) dos modos rápidos (`status`, `drenar_outbox`)
+
+    python -m benchmarks.startup --orcamento-ms 100
+
+Sai com código 1 se algum item passar do orçamento.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+_LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+# Módulos que não podem aparecer no import de `src.monitor`
+PESADOS = ("pandas", "numpy", "openpyxl", "pydantic", "requests")
+
+
+def medir_importtime(modulo: str = "src.monitor") -> dict:
+    """Roda `python -X importtime -c 'import <modulo>'` e devolve os tempos em ms."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulativo_us = 0
+    importados: dict[str, int] = {}
+    for linha in proc.stderr.splitlines():
+        m = _LINHA_IMPORTTIME.search(linha)
+        if not m:
+            continue
+        nome = m.group(4)
+        importados[nome] = int(m.group(2))
+        if nome == modulo:
+            cumulativo_us = int(m.group(2))
+
+    # Só os módulos importados por nós (o site/.pth do Python fica de fora)
+    mais_pesados = sorted(
+        ((n, us) for n, us in importados.items() if n.startswith("src.")),
+        key=lambda x: x[1],
+        reverse=True,
+    )[:5]
+
+    return {
+        "import_ms": round(cumulativo_us / 1000, 2),
+        "pesados_importados": sorted(
+            n for n in importados if n.split(".")[0] in PESADOS
+        ),
+        "mais_pesados": [(n, round(us / 1000, 2)) for n, us in mais_pesados],
+    }
+
+
+def medir_modo(modo: str, repeticoes: int = 5) -> float:
+    """Tempo total (ms, mediana) de `python -m src.monitor --modo <modo>`."""
+    # Sem token do Telegram: drenar_outbox nunca envia nada de verdade
+    env = {**os.environ, "TELEGRAM_TOKEN": "", "GITHUB_TOKEN": ""}
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "src.monitor", "--modo", modo],
+            cwd=RAIZ,
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    return round(statistics.median(tempos), 2)
+
+
+def _tempo_interpretador(repeticoes: int = 5) -> float:
+    """Tempo de subir um Python vazio: descontado do tempo dos modos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Orçamento de startup do src.monitor.")
+    parser.add_argument("--orcamento-ms", type=float, default=100.0)
+    parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON.")
+    args = parser.parse_args()
+
+    resultado = medir_importtime()
+    base = _tempo_interpretador()
+    resultado["interpretador_ms"] = round(base, 2)
+    resultado["modos_ms"] = {
+        modo: round(medir_modo(modo) - base, 2) for modo in ("status", "drenar_outbox")
+    }
+
+    estouros = []
+    if resultado["import_ms"] > args.orcamento_ms:
+        estouros.append(f"import src.monitor: {resultado['import_ms']}ms")
+    for modo, ms in resultado["modos_ms"].items():
+        if ms > args.orcamento_ms:
+            estouros.append(f"--modo {modo}: {ms}ms")
+    if resultado["pesados_importados"]:
+        estouros.append(f"dependências pesadas no import: {resultado['pesados_importados']}")
+
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    else:
+        print(f"import src.monitor: {resultado['import_ms']}ms")
+        for modo, ms in resultado["modos_ms"].items():
+            print(f"--modo {modo}: {ms}ms (descontando {resultado['interpretador_ms']}ms do interpretador)")
+        for nome, ms in resultado["mais_pesados"]:
+            print(f"  {nome}: {ms}ms")
+
+    if estouros:
+        print("Orçamento estourado: " + "; ".join(estouros), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    import requests
+
+    from .config import GithubConfig
+
+
+logger = logging.getLogger(__name__)
+
+# Prioridades (menor = mais importante). Com o orçamento da API baixo, as
+# cosméticas (dashboard, Excel, métricas) são puladas e o estado passa na frente.
+PRIORIDADE_ESTADO = 0
+PRIORIDADE_NORMAL = 1
+PRIORIDADE_COSMETICA = 2
+
+# Espera máxima por um limite (Retry-After / reset); acima disso desiste
+ESPERA_MAXIMA_S = 90.0
+
+# Limite secundário sem Retry-After: a documentação pede ao menos 1 minuto
+ESPERA_LIMITE_SECUNDARIO_S = 60.0
+
+TENTATIVAS = 4
+
+
+class OrcamentoEsgotado(RuntimeError):
+    """Requisição de baixa prioridade recusada por falta de orçamento na API."""
+
+
+class BaldeDeFichas:
+    """Token bucket: `capacidade` requisições em rajada, repostas a `taxa` por segundo."""
+
+    def __init__(
+        self,
+        taxa: float,
+        capacidade: float,
+        relogio: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = capacidade
+        self._relogio = relogio
+        self._ultima = relogio()
+
+    def _repor(self) -> None:
+        agora = self._relogio()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self._ultima) * self.taxa)
+        self._ultima = agora
+
+    def espera(self) -> float:
+        """Segundos até existir uma ficha (0 se já existe)."""
+        self._repor()
+        return 0.0 if self.fichas >= 1 else (1 - self.fichas) / self.taxa
+
+    def consumir(self) -> None:
+        self._repor()
+        self.fichas -= 1
+
+
+class AgendadorGithub:
+    """
+    Ponto único por onde passam as requisições à API do GitHub (todas as
+    threads do processo):
+
+    - ritmo controlado por um token bucket
+    - fila por prioridade quando não há ficha ou a API pediu pausa
+    - lê `X-RateLimit-Remaining`/`X-RateLimit-Reset` a cada resposta e, com
+      o orçamento abaixo de `reserva`, recusa as requisições cosméticas
+    - 403/429 com `Retry-After` (ou orçamento zerado) pausa todas as threads
+      até a liberação e repete a requisição; 5xx repete com backoff
+    """
+
+    def __init__(
+        self,
+        taxa: float = 1.0,
+        capacidade: float = 10,
+        reserva: int = 100,
+        espera_maxima_s: float = ESPERA_MAXIMA_S,
+        tentativas: int = TENTATIVAS,
+        relogio: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.balde = BaldeDeFichas(taxa, capacidade, relogio)
+        self.reserva = reserva
+        self.espera_maxima_s = espera_maxima_s
+        self.tentativas = tentativas
+        self._relogio = relogio
+
+        self.restantes: int | None = None  # X-RateLimit-Remaining mais recente
+        self._pausado_ate = 0.0  # relógio monotônico
+        self._cond = threading.Condition()
+        self._fila: list[tuple[int, int]] = []
+        self._ordem = itertools.count()
+
+    @property
+    def orcamento_baixo(self) -> bool:
+        return self.restantes is not None and self.restantes < self.reserva
+
+    def _aguardar_vez(self, prioridade: int) -> None:
+        vez = (prioridade, next(self._ordem))
+        with self._cond:
+            heapq.heappush(self._fila, vez)
+            while True:
+                if self._fila[0] == vez:
+                    espera = max(self._pausado_ate - self._relogio(), self.balde.espera())
+                    if espera <= 0:
+                        heapq.heappop(self._fila)
+                        self.balde.consumir()
+                        self._cond.notify_all()
+                        return
+                    self._cond.wait(espera)
+                else:
+                    self._cond.wait()
+
+    def _pausar(self, segundos: float) -> None:
+        with self._cond:
+            self._pausado_ate = max(self._pausado_ate, self._relogio() + segundos)
+            self._cond.notify_all()
+
+    def _registrar_cabecalhos(self, resp: requests.Response) -> None:
+        restantes = resp.headers.get("X-RateLimit-Remaining")
+        if restantes is not None and restantes.isdigit():
+            self.restantes = int(restantes)
+
+    def _espera_pedida(self, resp: requests.Response, tentativa: int) -> float | None:
+        """Quanto esperar antes de repetir (None = resposta final)."""
+        if resp.status_code in (403, 429):
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return max(0.0, float(retry_after))
+                except ValueError:
+                    return ESPERA_LIMITE_SECUNDARIO_S
+            if resp.headers.get("X-RateLimit-Remaining") == "0":
+                reset = resp.headers.get("X-RateLimit-Reset", "")
+                if reset.isdigit():
+                    return max(0.0, int(reset) - time.time()) + 1
+            if "secondary rate limit" in resp.text.lower():
+                return ESPERA_LIMITE_SECUNDARIO_S
+            return None
+
+        if resp.status_code in (500, 502, 503, 504):
+            return float(2**tentativa)
+        return None
+
+    def requisitar(
+        self,
+        metodo: str,
+        url: str,
+        prioridade: int = PRIORIDADE_NORMAL,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        `requests.request` com ritmo, prioridade e repetição nos limites.
+        Levanta `OrcamentoEsgotado` para requisições cosméticas com o
+        orçamento da API baixo.
+        """
+        import requests
+
+        for tentativa in range(1, self.tentativas + 1):
+            if prioridade >= PRIORIDADE_COSMETICA and self.orcamento_baixo:
+                raise OrcamentoEsgotado(
+                    f"{self.restantes} requisições restantes (reserva {self.reserva})"
+                )
+
+            self._aguardar_vez(prioridade)
+            resp = requests.request(metodo, url, **kwargs)
+            self._registrar_cabecalhos(resp)
+
+            espera = self._espera_pedida(resp, tentativa)
+            if espera is None or tentativa == self.tentativas:
+                return resp
+            if espera > self.espera_maxima_s:
+                logger.error(
+                    "GitHub pediu %.0fs de espera (%s %s, status %s). Desistindo.",
+                    espera,
+                    metodo,
+                    url,
+                    resp.status_code,
+                )
+                return resp
+
+            logger.warning(
+                "Limite da API do GitHub (status %s). Pausando %.1fs (tentativa %d).",
+                resp.status_code,
+                espera,
+                tentativa,
+            )
+            resp.close()
+            self._pausar(espera)
+
+        return resp
+
+
+_agendador: AgendadorGithub | None = None
+_agendador_lock = threading.Lock()
+
+
+def obter_agendador(cfg: GithubConfig) -> AgendadorGithub:
+    """Agendador compartilhado pelo processo (criado no primeiro uso)."""
+    global _agendador
+    with _agendador_lock:
+        if _agendador is None:
+            _agendador = AgendadorGithub(
+                taxa=cfg.taxa_req_s,
+                capacidade=cfg.rajada,
+                reserva=cfg.reserva,
+            )
+        return _agendador
@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .config import AppConfig
+from .identidade import id_do_estado, id_produto
+from .state import carregar_estado_anterior, carregar_historico
+from .telegram_client import url_api_telegram
+
+
+logger = logging.getLogger(__name__)
+
+# Telegram corta mensagens acima de 4096 caracteres
+LIMITE_MENSAGEM = 4000
+MAX_LISTAR = 40
+MAX_EVENTOS_HISTORICO = 10
+
+AJUDA = (
+    "Comandos disponíveis:\n"
+    "/status – resumo ON/OFF por seção\n"
+    "/secao <nome> – produtos de uma seção\n"
+    "/off – produtos OFF no momento\n"
+    "/historico <produto> – mudanças de status/preço do produto"
+)
+
+
+def _normalizar(texto: Any) -> str:
+    """Minúsculo, sem acentos e sem espaços nas pontas (para buscas)."""
+    texto = unicodedata.normalize("NFKD", str(texto or "")).casefold().strip()
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _icone(status: str) -> str:
+    return "🟢" if status.upper() == "ON" else "🔴"
+
+
+def _limitar(linhas: list[str]) -> str:
+    texto = "\n".join(linhas)
+    if len(texto) <= LIMITE_MENSAGEM:
+        return texto
+    return texto[: LIMITE_MENSAGEM - 2].rsplit("\n", 1)[0] + "\n…"
+
+
+# -------------------------------
+# ÍNDICE EM MEMÓRIA
+# -------------------------------
+
+@dataclass(slots=True)
+class EventoProduto:
+    """Mudança de status ou de preço de um produto no histórico."""
+
+    timestamp: str
+    status: str
+    preco: str
+
+
+class IndiceProdutos:
+    """
+    Índice do estado atual e do histórico para responder comandos sem reler
+    os JSONs: produtos por seção, por nome e por status, e a linha do tempo
+    (só mudanças de status/preço) de cada produto, pelo ID estável
+    (src/identidade.py): um item renomeado mantém os eventos do nome antigo.
+
+    `sincronizar` é chamado a cada execução do monitoramento; o histórico é
+    indexado de forma incremental (só os registros novos da lista). No
+    daemon, `atualizar` recebe direto os registros novos de cada rodada.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.estado: dict[str, dict[str, Any]] = {}
+        self.por_secao: dict[str, list[str]] = {}
+        self.nomes_secao: dict[str, str] = {}
+        self.por_status: dict[str, list[str]] = {}
+        self.por_nome: dict[str, list[str]] = {}
+        self.eventos: dict[str, list[EventoProduto]] = {}
+        self.ultima_verificacao = ""
+        self._historico: list[dict] | None = None
+        self._historico_indexado = 0
+
+    # ---- atualização ----
+
+    def sincronizar(self, estado: dict[str, dict[str, Any]], historico: list[dict]) -> None:
+        with self._lock:
+            self._trocar_estado(estado)
+
+            # Mesma lista só cresceu: indexa só o final
+            if historico is not self._historico or len(historico) < self._historico_indexado:
+                self.eventos = {}
+                self._historico_indexado = 0
+            self._historico = historico
+            for registro in historico[self._historico_indexado :]:
+                self._indexar_registro(registro)
+            self._historico_indexado = len(historico)
+
+    def atualizar(self, estado: dict[str, dict[str, Any]], novos: Iterable[dict]) -> None:
+        """
+        Estado novo + só os registros novos do histórico (daemon: o histórico
+        inteiro não fica em memória, ver EstadoEmMemoria).
+        """
+        with self._lock:
+            self._trocar_estado(estado)
+            for registro in novos:
+                self._indexar_registro(registro)
+
+    def _trocar_estado(self, estado: dict[str, dict[str, Any]]) -> None:
+        por_secao: dict[str, list[str]] = {}
+        nomes_secao: dict[str, str] = {}
+        por_status: dict[str, list[str]] = {}
+        por_nome: dict[str, list[str]] = {}
+        ultima = ""
+
+        for chave, info in estado.items():
+            secao = str(info.get("Seção", "") or "(sem seção)")
+            nome = str(info.get("Produto", ""))
+            status = "ON" if str(info.get("Status", "")).upper() == "ON" else "OFF"
+
+            por_secao.setdefault(_normalizar(secao), []).append(chave)
+            nomes_secao.setdefault(_normalizar(secao), secao)
+            por_status.setdefault(status, []).append(chave)
+            por_nome.setdefault(_normalizar(nome), []).append(chave)
+            ultima = max(ultima, str(info.get("Última verificação", "")))
+
+        self.estado = estado
+        self.por_secao = por_secao
+        self.nomes_secao = nomes_secao
+        self.por_status = por_status
+        self.por_nome = por_nome
+        self.ultima_verificacao = ultima
+
+    def _indexar_registro(self, registro: dict) -> None:
+        # Formato antigo: um item por produto com a lista "historico" aninhada
+        if isinstance(registro.get("historico"), list):
+            for evento in registro["historico"]:
+                self._indexar_registro(
+                    {**evento, "secao": registro.get("secao"), "nome": registro.get("nome")}
+                )
+            return
+
+        # Registros anteriores aos IDs: o ID derivado da chave (id_do_estado)
+        id_ = registro.get("id_produto") or id_produto(
+            str(registro.get("secao", "")), str(registro.get("nome", ""))
+        )
+        evento = EventoProduto(
+            timestamp=str(registro.get("timestamp", ""))[:16],
+            status=str(registro.get("status", "")),
+            preco=str(registro.get("preco", "")),
+        )
+
+        eventos = self.eventos.setdefault(id_, [])
+        if eventos and (eventos[-1].status, eventos[-1].preco) == (evento.status, evento.preco):
+            return
+        eventos.append(evento)
+
+    # ---- consultas ----
+
+    def resumo_status(self) -> str:
+        with self._lock:
+            if not self.estado:
+                return "Ainda não há estado salvo."
+
+            contagem: dict[str, Counter[str]] = {}
+            for secao_norm, chaves in self.por_secao.items():
+                contagem[self.nomes_secao[secao_norm]] = Counter(
+                    "ON" if str(self.estado[c].get("Status", "")).upper() == "ON" else "OFF"
+                    for c in chaves
+                )
+
+            linhas = [
+                f"📊 Última verificação: {self.ultima_verificacao[:16] or '-'}",
+                f"Produtos: {len(self.estado)} | 🟢 {len(self.por_status.get('ON', []))} ON"
+                f" | 🔴 {len(self.por_status.get('OFF', []))} OFF",
+                "",
+            ]
+            for secao in sorted(contagem):
+                c = contagem[secao]
+                linhas.append(f"- {secao}: 🟢 {c['ON']} | 🔴 {c['OFF']}")
+
+        return _limitar(linhas)
+
+    def produtos_da_secao(self, busca: str) -> str:
+        with self._lock:
+            if not busca.strip():
+                return _limitar(["Seções:"] + [f"- {s}" for s in sorted(self.nomes_secao.values())])
+
+            alvo = _normalizar(busca)
+            if alvo not in self.por_secao:
+                candidatas = [s for s in self.por_secao if alvo in s]
+                if len(candidatas) != 1:
+                    sugestoes = [self.nomes_secao[s] for s in candidatas] or sorted(
+                        self.nomes_secao.values()
+                    )
+                    return _limitar(
+                        [f"Seção \"{busca}\" não encontrada. Opções:"]
+                        + [f"- {s}" for s in sugestoes]
+                    )
+                alvo = candidatas[0]
+
+            chaves = self.por_secao[alvo]
+            linhas = [f"📂 {self.nomes_secao[alvo]} ({len(chaves)} produtos)"]
+            for chave in chaves[:MAX_LISTAR]:
+                info = self.estado[chave]
+                status = str(info.get("Status", ""))
+                linhas.append(f"{_icone(status)} {info.get('Produto', '')} – {info.get('Preço', '')}")
+            if len(chaves) > MAX_LISTAR:
+                linhas.append(f"... e mais {len(chaves) - MAX_LISTAR} produtos")
+
+        return _limitar(linhas)
+
+    def produtos_off(self) -> str:
+        with self._lock:
+            chaves = self.por_status.get("OFF", [])
+            if not chaves:
+                return "✅ Nenhum produto OFF."
+
+            linhas = [f"🔴 {len(chaves)} produtos OFF:"]
+            for chave in chaves[:MAX_LISTAR]:
+                info = self.estado[chave]
+                linhas.append(
+                    f"- {info.get('Seção', '')} – {info.get('Produto', '')} ({info.get('Status', '')})"
+                )
+            if len(chaves) > MAX_LISTAR:
+                linhas.append(f"... e mais {len(chaves) - MAX_LISTAR} produtos")
+
+        return _limitar(linhas)
+
+    def historico_produto(self, busca: str) -> str:
+        if not busca.strip():
+            return "Uso: /historico <produto>"
+
+        with self._lock:
+            alvo = _normalizar(busca)
+            chaves = self.por_nome.get(alvo)
+            if chaves is None:
+                nomes = [n for n in self.por_nome if alvo in n]
+                if not nomes:
+                    return f"Produto \"{busca}\" não encontrado."
+                if len(nomes) > 1:
+                    exemplos = [
+                        str(self.estado[self.por_nome[n][0]].get("Produto", "")) for n in nomes[:10]
+                    ]
+                    return _limitar(
+                        [f"{len(nomes)} produtos contêm \"{busca}\":"]
+                        + [f"- {e}" for e in exemplos]
+                    )
+                chaves = self.por_nome[nomes[0]]
+
+            linhas: list[str] = []
+            for chave in chaves:
+                info = self.estado.get(chave, {})
+                eventos = self.eventos.get(id_do_estado(chave, info), [])
+                linhas.append(
+                    f"🕘 {info.get('Seção', '')} – {info.get('Produto', '')} "
+                    f"(agora: {_icone(str(info.get('Status', '')))} {info.get('Status', '')})"
+                )
+                if not eventos:
+                    linhas.append("  sem registros no histórico")
+                for e in eventos[-MAX_EVENTOS_HISTORICO:]:
+                    linhas.append(f"  {e.timestamp} – {e.status} – {e.preco}")
+                if len(eventos) > MAX_EVENTOS_HISTORICO:
+                    linhas.append(f"  ({len(eventos) - MAX_EVENTOS_HISTORICO} mudanças anteriores)")
+
+        return _limitar(linhas)
+
+    def responder(self, texto: str) -> str | None:
+        """Resposta para um comando ("/status", "/secao Bebidas"...) ou None."""
+        if not texto.startswith("/"):
+            return None
+
+        comando, _, argumento = texto.partition(" ")
+        # "/status@MeuBot" em grupos
+        comando = comando.split("@", 1)[0].lower()
+
+        if comando == "/status":
+            return self.resumo_status()
+        if comando == "/secao":
+            return self.produtos_da_secao(argumento)
+        if comando == "/off":
+            return self.produtos_off()
+        if comando == "/historico":
+            return self.historico_produto(argumento)
+        if comando in ("/start", "/ajuda", "/help"):
+            return AJUDA
+        return None
+
+
+# -------------------------------
+# SERVIDOR DE COMANDOS (long polling)
+# -------------------------------
+
+class ServidorComandos:
+    """
+    Atende comandos do grupo via `getUpdates` (long polling), usando o
+    `TelegramConfig` do projeto. Só responde no chat configurado.
+    """
+
+    def __init__(
+        self,
+        cfg: AppConfig,
+        indice: IndiceProdutos,
+        timeout_polling: int = 25,
+    ) -> None:
+        self.cfg = cfg
+        self.indice = indice
+        self.timeout_polling = timeout_polling
+        self.offset = 0
+
+    def _chamar(self, metodo: str, params: dict[str, Any], timeout: float) -> Any:
+        import requests
+
+        resp = requests.post(url_api_telegram(self.cfg, metodo), json=params, timeout=timeout)
+        resp.raise_for_status()
+        dados = resp.json()
+        if not dados.get("ok"):
+            raise RuntimeError(f"{metodo}: {dados.get('description')}")
+        return dados.get("result")
+
+    def processar_update(self, update: dict[str, Any]) -> bool:
+        """Responde um update, se for um comando do chat configurado."""
+        self.offset = max(self.offset, int(update.get("update_id", 0)) + 1)
+
+        mensagem = update.get("message") or {}
+        texto = str(mensagem.get("text", "")).strip()
+        chat_id = (mensagem.get("chat") or {}).get("id")
+
+        if chat_id is None or str(chat_id) != str(self.cfg.telegram.chat_id):
+            return False
+
+        resposta = self.indice.responder(texto)
+        if resposta is None:
+            return False
+
+        self._chamar(
+            "sendMessage",
+            {
+                "chat_id": chat_id,
+                "text": resposta,
+                "reply_to_message_id": mensagem.get("message_id"),
+            },
+            timeout=20,
+        )
+        logger.info("Comando %s respondido.", texto.split(" ", 1)[0])
+        return True
+
+    def executar(
+        self,
+        parar: threading.Event,
+        antes_de_cada: Callable[[], None] | None = None,
+    ) -> None:
+        """Loop de long polling até `parar` ser acionado."""
+        if not self.cfg.telegram.token or not self.cfg.telegram.chat_id:
+            logger.warning("TELEGRAM_TOKEN ou TELEGRAM_CHAT_ID não configurados. Bot não iniciado.")
+            return
+
+        logger.info("Bot de comandos iniciado (long polling de %ds).", self.timeout_polling)
+        while not parar.is_set():
+            if antes_de_cada is not None:
+                antes_de_cada()
+
+            try:
+                updates = self._chamar(
+                    "getUpdates",
+                    {
+                        "offset": self.offset,
+                        "timeout": self.timeout_polling,
+                        "allowed_updates": ["message"],
+                    },
+                    timeout=self.timeout_polling + 10,
+                )
+            except Exception as e:
+                logger.warning("Erro no getUpdates: %s", e)
+                parar.wait(5)
+                continue
+
+            for update in updates or []:
+                try:
+                    self.processar_update(update)
+                except Exception as e:
+                    logger.exception("Erro ao responder comando: %s", e)
+
+        logger.info("Bot de comandos encerrado.")
+
+
+def _sincronizar_com_arquivos(cfg: AppConfig, indice: IndiceProdutos) -> Callable[[], None]:
+    """
+    Recarrega o índice só quando o estado/histórico em disco mudar (outra
+    execução do monitor gravou), comparando o mtime dos arquivos.
+    """
+    vistos: dict[Path, int] = {}
+
+    def sincronizar() -> None:
+        mtimes = {
+            p: p.stat().st_mtime_ns if p.exists() else 0
+            for p in (Path(cfg.estado_path), Path(cfg.historico_path))
+        }
+        if mtimes == vistos:
+            return
+        vistos.clear()
+        vistos.update(mtimes)
+        indice.sincronizar(
+            carregar_estado_anterior(cfg.estado_path),
+            carregar_historico(cfg.historico_path),
+        )
+        logger.info("Índice do bot atualizado (%d produtos).", len(indice.estado))
+
+    return sincronizar
+
+
+def rodar_bot(cfg: AppConfig) -> None:
+    """Modo `--modo bot`: só o servidor de comandos, lendo os arquivos locais."""
+    indice = IndiceProdutos()
+    parar = threading.Event()
+    try:
+        ServidorComandos(cfg, indice).executar(parar, _sincronizar_com_arquivos(cfg, indice))
+    except KeyboardInterrupt:
+        parar.set()
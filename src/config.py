@@ -1,21 +1,77 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
+# Valores aceitos em RENDERIZACAO (o primeiro é o padrão)
+MODOS_RENDERIZACAO = ("threads", "sequencial")
+
+
 @dataclass
 class GithubConfig:
     token: str
     repository: str
     actor: str
+    # Base da API (o Actions define GITHUB_API_URL; trocar por um stub em testes)
+    api_base: str = "https://api.github.com"
+    # Ritmo das requisições (token bucket) e orçamento mínimo reservado ao
+    # estado: abaixo dele, uploads cosméticos são pulados (src/agendador_github.py)
+    taxa_req_s: float = 1.0
+    rajada: int = 10
+    reserva: int = 100
 
 
 @dataclass
 class TelegramConfig:
     token: str
     chat_id: str
+    # Base da Bot API (trocar por um servidor local/fake em testes)
+    api_base: str = "https://api.telegram.org"
+    # "mensagens" (um alerta completo por execução) ou "painel" (mensagem
+    # fixada editada no lugar + alertas só para novas ocorrências)
+    modo: str = "mensagens"
+
+
+@dataclass
+class LogConfig:
+    nivel: str = "INFO"
+    # "texto" ou "json" (uma linha JSON por registro)
+    formato: str = "texto"
+    # "tamanho" (max_bytes por arquivo) ou "diaria" (à meia-noite)
+    rotacao: str = "tamanho"
+    max_bytes: int = 5_000_000
+    backups: int = 5
+    # Nível mínimo por etapa do pipeline, ex.: {"historico": "WARNING"}
+    niveis_etapas: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class IngestaoConfig:
+    # Endpoint HTTP que recebe cardápios/eventos empurrados (--modo ingestao)
+    host: str = "127.0.0.1"
+    porta: int = 8787
+    # Pushes que chegam dentro da janela viram uma única rodada do pipeline
+    debounce_s: float = 2.0
+    # ...mas uma rajada contínua não adia a rodada mais que isso
+    espera_maxima_s: float = 10.0
+    # Se definido, exige "Authorization: Bearer <token>"
+    token: str = ""
+    max_bytes: int = 20_000_000
+
+
+@dataclass
+class FilaConfig:
+    # Fila de execuções por loja (SQLite) para workers em várias máquinas
+    # com a mesma pasta compartilhada (--modo worker, src/fila.py)
+    path: Path
+    # Um worker "aluga" a loja por lease_s segundos e renova enquanto roda;
+    # lease vencido (worker morto) volta para a fila
+    lease_s: float = 300.0
+    tentativas: int = 3
+    # Intervalo entre consultas quando a fila está vazia
+    espera_s: float = 5.0
 
 
 @dataclass
@@ -25,18 +81,69 @@ class AppConfig:
     # Caminho do CSV de entrada (demo)
     data_path: Path
 
+    # Fonte do cardápio (vazio = data_path). Ver src/fontes.py:criar_fonte
+    fonte: str
+    cache_fontes_dir: Path
+
+    # Validação em lote da entrada (desligar só para fontes confiáveis)
+    validar_entrada: bool
+
     # Arquivos de estado / histórico em JSON
     estado_path: Path
     historico_path: Path
 
+    # Impressão digital da última entrada processada (atalho "nada mudou")
+    impressao_path: Path
+
+    # Média móvel (EWMA) da fração OFF por seção, para detectar quedas em massa
+    estatisticas_off_path: Path
+
+    # Janelas da análise de disponibilidade (ver src/disponibilidade.py)
+    janelas_disponibilidade: str
+
+    # Pontos por série nos gráficos ON/OFF do dashboard (seções: 1/4 disso)
+    series_max_pontos: int
+
+    # Como gerar dashboard/Excel/Telegram: "threads" ou "sequencial"
+    # (ver MODOS_RENDERIZACAO)
+    renderizacao: str
+
+    # Daemon/ingestão: intervalo mínimo entre rodadas que geram os artefatos
+    # (dashboard, Excel, séries, upload do histórico); as demais são leves
+    artefatos_intervalo_s: float
+
     # Saídas
     dashboard_output: Path
     excel_output: Path
+
+    # Site publicado no GitHub Pages (ver src/publicacao.py) e JSONs incluídos
+    site_dir: Path
+    site_dados: list[Path]
     log_path: Path
+    log: LogConfig
+
+    # Métricas por execução (tempo de cada etapa)
+    metricas_path: Path
+    historico_execucoes_path: Path
+    prometheus_path: Path | None
+
+    # Alertas do Telegram que falharam e ficam para reenviar depois
+    outbox_path: Path
+
+    # message_id e conteúdo da mensagem fixada de status (TELEGRAM_MODO=painel)
+    painel_path: Path
+
+    # Várias lojas: nome desta loja, resumo pequeno gravado a cada execução e
+    # pasta compartilhada com a visão geral (None = só grava o resumo)
+    loja: str
+    resumo_loja_path: Path
+    lojas_dir: Path | None
 
     # Integrações
     github: GithubConfig
     telegram: TelegramConfig
+    ingestao: IngestaoConfig
+    fila: FilaConfig
 
 
 def load_config() -> AppConfig:
@@ -55,14 +162,90 @@ def load_config() -> AppConfig:
 
     data_path = data_dir / "produtos_ifood_demo.csv"
 
+    # FONTE_CARDAPIO: "csv:<arquivo>", "dir:<pasta>" ou "http:<url1>,<url2>"
+    fonte = os.getenv("FONTE_CARDAPIO", "")
+    cache_fontes_dir = project_root / ".cache" / "fontes"
+
+    # VALIDAR_ENTRADA=0 pula a validação (caminho rápido para fontes confiáveis)
+    validar_entrada = os.getenv("VALIDAR_ENTRADA", "1").strip().lower() not in (
+        "0",
+        "false",
+        "nao",
+        "não",
+    )
+
     # arquivos de estado / histórico
     estado_path = project_root / "estado_produtos.json"
     historico_path = project_root / "historico_status.json"
+    impressao_path = project_root / "estado_produtos.fingerprint.json"
+
+    estatisticas_off_path = project_root / "estatisticas_off.json"
+
+    # JANELAS_DISPONIBILIDADE: "7d" = últimos 7 dias, "7d@18-23" = só 18h-23h
+    janelas_disponibilidade = os.getenv("JANELAS_DISPONIBILIDADE", "7d,7d@18-23,30d")
+
+    # SERIES_MAX_PONTOS: orçamento fixo de pontos das séries temporais
+    series_max_pontos = int(os.getenv("SERIES_MAX_PONTOS", "240"))
+
+    # RENDERIZACAO=sequencial gera dashboard, Excel e Telegram um depois do
+    # outro. O padrão (threads) sobrepõe os uploads e o Telegram ao Excel;
+    # sem rede configurada, sequencial é mais rápido (o Excel disputa o GIL)
+    renderizacao = os.getenv("RENDERIZACAO", MODOS_RENDERIZACAO[0]).strip().lower()
+    if renderizacao not in MODOS_RENDERIZACAO:
+        raise ValueError(
+            f"RENDERIZACAO inválida: {renderizacao!r} (use {' ou '.join(MODOS_RENDERIZACAO)})."
+        )
+
+    # ARTEFATOS_INTERVALO_S: no daemon/ingestão, rodadas mais próximas que
+    # isso da última com artefatos só fazem comparação, estado e alerta
+    artefatos_intervalo_s = float(os.getenv("ARTEFATOS_INTERVALO_S", "21600"))
 
     # saídas
     dashboard_output = project_root / "index.html"
     excel_output = project_root / "produtos_ifood.xlsx"
-    log_path = project_root / "monitoramento_log.txt"
+    log_path = project_root / "logs" / "monitoramento.log"
+
+    # SITE_DADOS: arquivos do projeto publicados junto com o dashboard (JSONs
+    # compactados e comprimidos; o resto, como o Excel, copiado como está)
+    site_dir = Path(os.getenv("SITE_DIR", str(project_root / "site")))
+    site_dados = [
+        project_root / nome.strip()
+        for nome in os.getenv("SITE_DADOS", "estado_produtos.json,produtos_ifood.xlsx").split(",")
+        if nome.strip()
+    ]
+
+    # LOG_NIVEIS_ETAPAS="historico=WARNING,dashboard=ERROR"
+    niveis_etapas = dict(
+        item.split("=", 1)
+        for item in os.getenv("LOG_NIVEIS_ETAPAS", "").replace(" ", "").split(",")
+        if "=" in item
+    )
+    log_cfg = LogConfig(
+        nivel=os.getenv("LOG_NIVEL", "INFO"),
+        formato=os.getenv("LOG_FORMATO", "texto").lower(),
+        rotacao=os.getenv("LOG_ROTACAO", "tamanho").lower(),
+        max_bytes=int(os.getenv("LOG_MAX_BYTES", "5000000")),
+        backups=int(os.getenv("LOG_BACKUPS", "5")),
+        niveis_etapas=niveis_etapas,
+    )
+
+    # métricas: JSON da última execução + histórico curto de durações
+    metricas_path = project_root / "metricas_execucao.json"
+    historico_execucoes_path = project_root / "historico_execucoes.json"
+
+    # textfile do Prometheus é opcional (ex.: diretório do node_exporter)
+    prometheus_env = os.getenv("METRICAS_PROMETHEUS_PATH", "")
+    prometheus_path = Path(prometheus_env) if prometheus_env else None
+
+    outbox_path = project_root / "outbox_telegram.json"
+    painel_path = project_root / "painel_telegram.json"
+
+    # LOJAS_DIR: pasta compartilhada por todas as lojas (<slug>/index.html +
+    # <slug>/resumo_loja.json) onde fica a visão geral (src/visao_lojas.py)
+    loja = os.getenv("LOJA", "Demo")
+    resumo_loja_path = project_root / "resumo_loja.json"
+    lojas_env = os.getenv("LOJAS_DIR", "")
+    lojas_dir = Path(lojas_env) if lojas_env else None
 
     # === GitHub ===
     github_token = os.getenv("GITHUB_TOKEN", "")
@@ -73,6 +256,10 @@ def load_config() -> AppConfig:
         token=github_token,
         repository=github_repo,
         actor=github_actor,
+        api_base=os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/"),
+        taxa_req_s=float(os.getenv("GITHUB_TAXA_REQ_S", "1")),
+        rajada=int(os.getenv("GITHUB_RAJADA", "10")),
+        reserva=int(os.getenv("GITHUB_RESERVA", "100")),
     )
 
     # === Telegram ===
@@ -89,16 +276,58 @@ def load_config() -> AppConfig:
     telegram_cfg = TelegramConfig(
         token=telegram_token,
         chat_id=telegram_chat_id,
+        api_base=os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/"),
+        modo=os.getenv("TELEGRAM_MODO", "mensagens").strip().lower(),
+    )
+
+    # === Ingestão por push ===
+    ingestao_cfg = IngestaoConfig(
+        host=os.getenv("INGESTAO_HOST", "127.0.0.1"),
+        porta=int(os.getenv("INGESTAO_PORTA", "8787")),
+        debounce_s=float(os.getenv("INGESTAO_DEBOUNCE", "2")),
+        espera_maxima_s=float(os.getenv("INGESTAO_ESPERA_MAXIMA", "10")),
+        token=os.getenv("INGESTAO_TOKEN", ""),
+        max_bytes=int(os.getenv("INGESTAO_MAX_BYTES", "20000000")),
+    )
+
+    # === Fila de lojas (workers) ===
+    fila_cfg = FilaConfig(
+        path=Path(os.getenv("FILA_PATH", str(project_root / "fila_lojas.sqlite3"))),
+        lease_s=float(os.getenv("FILA_LEASE_S", "300")),
+        tentativas=int(os.getenv("FILA_TENTATIVAS", "3")),
+        espera_s=float(os.getenv("FILA_ESPERA_S", "5")),
     )
 
     return AppConfig(
         project_root=project_root,
         data_path=data_path,
+        fonte=fonte,
+        cache_fontes_dir=cache_fontes_dir,
+        validar_entrada=validar_entrada,
         estado_path=estado_path,
         historico_path=historico_path,
+        impressao_path=impressao_path,
+        estatisticas_off_path=estatisticas_off_path,
+        janelas_disponibilidade=janelas_disponibilidade,
+        series_max_pontos=series_max_pontos,
+        renderizacao=renderizacao,
+        artefatos_intervalo_s=artefatos_intervalo_s,
         dashboard_output=dashboard_output,
         excel_output=excel_output,
+        site_dir=site_dir,
+        site_dados=site_dados,
         log_path=log_path,
+        log=log_cfg,
+        metricas_path=metricas_path,
+        historico_execucoes_path=historico_execucoes_path,
+        prometheus_path=prometheus_path,
+        outbox_path=outbox_path,
+        painel_path=painel_path,
+        loja=loja,
+        resumo_loja_path=resumo_loja_path,
+        lojas_dir=lojas_dir,
         github=github_cfg,
         telegram=telegram_cfg,
+        ingestao=ingestao_cfg,
+        fila=fila_cfg,
     )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import signal
+import threading
+from typing import TYPE_CHECKING, Iterable
+
+from .config import AppConfig
+from .github_integration import baixar_conteudo_github
+from .resumo import AgregadosHistorico
+from .state import EstadoEmMemoria, carregar_estado_anterior, carregar_historico
+from .utils import horario_brasil
+
+if TYPE_CHECKING:
+    from .bot_comandos import IndiceProdutos
+
+
+logger = logging.getLogger(__name__)
+
+# Mesmas janelas do monitoramento.yml: de hora em hora, das 11h às 23h (BRT)
+HORAS_EXECUCAO = tuple(range(11, 24))
+
+
+def proximo_horario(
+    agora: dt.datetime,
+    horas: Iterable[int] = HORAS_EXECUCAO,
+) -> dt.datetime:
+    """Próximo horário cheio (minuto 0) cuja hora está em `horas`."""
+    horas = sorted(set(horas))
+    candidato = agora.replace(minute=0, second=0, microsecond=0) + dt.timedelta(hours=1)
+
+    for _ in range(24 * 8):
+        if candidato.hour in horas:
+            return candidato
+        candidato += dt.timedelta(hours=1)
+
+    raise ValueError(f"Nenhuma hora válida em {horas}")
+
+
+def carregar_memoria(cfg: AppConfig) -> EstadoEmMemoria:
+    """
+    Baixa (se configurado) e carrega estado + histórico uma única vez. Do
+    histórico ficam em memória só os agregados (e os registros, até o índice
+    do bot consumi-los).
+    """
+    conteudo_estado = baixar_conteudo_github(
+        cfg.github, cfg.estado_path.name, cache=cfg.estado_path
+    )
+    conteudo_historico = baixar_conteudo_github(
+        cfg.github, cfg.historico_path.name, cache=cfg.historico_path
+    )
+    historico = carregar_historico(cfg.historico_path, conteudo_historico)
+
+    return EstadoEmMemoria(
+        estado=carregar_estado_anterior(cfg.estado_path, conteudo_estado),
+        agregados=AgregadosHistorico.de_historico(historico),
+        registros_novos=historico,
+    )
+
+
+async def executar_daemon(
+    cfg: AppConfig,
+    horas: Iterable[int] = HORAS_EXECUCAO,
+    imediato: bool = False,
+    parar: asyncio.Event | None = None,
+    indice: IndiceProdutos | None = None,
+) -> EstadoEmMemoria:
+    """
+    Mantém estado e histórico em memória e roda o pipeline nos horários
+    agendados, até receber SIGTERM/SIGINT (ou `parar` ser acionado).
+
+    Cada rodada roda numa thread, então o sinal é atendido na hora: a rodada
+    em andamento termina e é gravada antes de sair.
+
+    Dashboard, Excel, séries e o upload do histórico inteiro só rodam quando
+    a última rodada com artefatos tem mais de `cfg.artefatos_intervalo_s`;
+    as demais são leves (estado, histórico local e alerta).
+
+    Com `indice` (bot de comandos), o índice recebe os registros novos do
+    histórico depois de cada rodada.
+    """
+    from .monitor import monitorar
+
+    parar = parar or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, parar.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows / fora da thread principal: fica só com o `parar`
+            pass
+
+    memoria = await asyncio.to_thread(carregar_memoria, cfg)
+    logger.info(
+        "Daemon iniciado com %d produtos no estado e %d registros no histórico.",
+        len(memoria.estado),
+        memoria.agregados.total_registros,
+    )
+    if indice is not None:
+        indice.atualizar(memoria.estado, memoria.consumir_registros_novos())
+    else:
+        memoria.consumir_registros_novos()
+
+    executar_agora = imediato
+    while not parar.is_set():
+        if not executar_agora:
+            agora = horario_brasil()
+            proximo = proximo_horario(agora, horas)
+            espera = (proximo - agora).total_seconds()
+            logger.info("Próxima execução em %s (daqui a %.0fs).", proximo, espera)
+
+            try:
+                await asyncio.wait_for(parar.wait(), timeout=espera)
+                break  # parar foi acionado durante a espera
+            except asyncio.TimeoutError:
+                pass
+
+        executar_agora = False
+        artefatos = memoria.artefatos_vencidos(cfg.artefatos_intervalo_s)
+        try:
+            await asyncio.to_thread(monitorar, cfg, memoria, artefatos=artefatos)
+        except Exception as e:
+            # Uma rodada com erro não derruba o daemon
+            logger.exception("Erro na execução agendada: %s", e)
+
+        novos = memoria.consumir_registros_novos()
+        if indice is not None:
+            indice.atualizar(memoria.estado, novos)
+
+    logger.info("Daemon encerrado após %d execuções.", memoria.execucoes)
+    return memoria
+
+
+def rodar_daemon(cfg: AppConfig, imediato: bool = False, com_bot: bool = False) -> None:
+    if not com_bot:
+        asyncio.run(executar_daemon(cfg, imediato=imediato))
+        return
+
+    from .bot_comandos import IndiceProdutos, ServidorComandos
+
+    # Bot numa thread à parte: o long polling não atrasa a agenda
+    indice = IndiceProdutos()
+    parar_bot = threading.Event()
+    bot = threading.Thread(
+        target=ServidorComandos(cfg, indice).executar,
+        args=(parar_bot,),
+        name="bot-comandos",
+        daemon=True,
+    )
+    bot.start()
+    try:
+        asyncio.run(executar_daemon(cfg, imediato=imediato, indice=indice))
+    finally:
+        parar_bot.set()
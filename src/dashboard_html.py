@@ -1,136 +1,489 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
+import time
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Iterable
 
+from .agendador_github import PRIORIDADE_COSMETICA
 from .config import AppConfig
+from .disponibilidade import Disponibilidade
 from .github_integration import fazer_upload_github
+from .metricas import EXECUCAO_COMPLETA, carregar_historico_execucoes
+from .precos import MudancaPreco
+from .resumo import ResumoExecucao, agregar_historico
+from .series import Serie, SeriesTemporais
 from .utils import horario_brasil
 
 
-def _norm_status(value: Any) -> str:
-    """Normaliza o status para comparação (string maiúscula)."""
-    return str(value or "").strip().upper()
-
-
-def gerar_dashboard_html(historico: Iterable[dict], cfg: AppConfig) -> str:
-    # ... código anterior ...
-    
-    # Na parte da agregação (por volta da linha 58), altere:
-    for r in registros_ultimo:
-        secao = r.get("secao") or r.get("Seção") or "Desconhecida"
-        
-        # Pega o status de qualquer campo possível e normaliza
-        status_raw = r.get("status") or r.get("Status") or ""
-        status = str(status_raw).strip().upper()
-        
-        # VERIFICAÇÃO MELHORADA
-        if status == "ON":
-            total_on += 1
-            on_por_secao[secao] += 1
-        else:
-            # Considera como OFF qualquer coisa que não seja ON
-            total_off += 1
-            off_por_secao[secao] += 1
-    
-    # ... resto do código ...
-
-    if not historico:
-        ultima_atualizacao = str(horario_brasil())
-        total_registros = total_on = total_off = total_desapareceram = 0
-        on_por_secao: dict[str, int] = {}
-        off_por_secao: dict[str, int] = {}
-        desapareceu_por_secao: dict[str, int] = {}
-    else:
-        # -----------------------------
-        # Agregações
-        # -----------------------------
-        total_registros = len(historico)
-
-        # Última execução (maior timestamp)
-        try:
-            ultimo_ts = max(str(r.get("timestamp", "")) for r in historico)
-        except ValueError:
-            ultimo_ts = ""
-
-        ultima_atualizacao = ultimo_ts or str(horario_brasil())
-
-        # Registros da última execução, apenas tipo "ATUAL"
-        registros_ultimo = [
-            r
-            for r in historico
-            if str(r.get("timestamp", "")) == ultimo_ts
-            and _norm_status(r.get("tipo")) == "ATUAL"
-        ]
-
-        # Se por algum motivo não achar, cai pro histórico todo
-        if not registros_ultimo:
-            registros_ultimo = [
-                r for r in historico if _norm_status(r.get("tipo")) == "ATUAL"
-            ]
-
-        total_on = 0
-        total_off = 0
-
-        on_por_secao: dict[str, int] = defaultdict(int)
-        off_por_secao: dict[str, int] = defaultdict(int)
-
-        # Agregação por seção na última execução
-        for r in registros_ultimo:
-            secao = r.get("secao") or r.get("Seção") or "Desconhecida"
-
-            status = (
-                _norm_status(r.get("status"))
-                or _norm_status(r.get("Status"))
-            )
-
-            if status == "ON":
-                total_on += 1
-                on_por_secao[secao] += 1
-            else:
-                total_off += 1
-                off_por_secao[secao] += 1
-
-        # Produtos que já desapareceram alguma vez (qualquer execução)
-        desaparecidos_uma_vez: set[tuple[str, str]] = set()
-        for r in historico:
-            tipo = _norm_status(r.get("tipo"))
-            if "DESAPARECIDO" in tipo or "DESAPARECEU" in tipo:
-                secao = r.get("secao") or r.get("Seção") or ""
-                nome = r.get("nome") or r.get("Produto") or ""
-                desaparecidos_uma_vez.add((secao, nome))
-
-        total_desapareceram = len(desaparecidos_uma_vez)
-
-        desapareceu_por_secao: dict[str, int] = defaultdict(int)
-        for secao, _ in desaparecidos_uma_vez:
-            if secao:
-                desapareceu_por_secao[secao] += 1
+# CSS do dashboard (também usado pela visão geral das lojas, src/visao_lojas.py)
+ESTILO_PAINEL = """
+:root {
+    --bg: #050816;
+    --bg-card: #0b1020;
+    --bg-card-alt: #111827;
+    --accent: #22c55e;
+    --accent-red: #ef4444;
+    --accent-yellow: #eab308;
+    --text-main: #f9fafb;
+    --text-muted: #9ca3af;
+    --border-subtle: #1f2937;
+}
+
+* {
+    box-sizing: border-box;
+}
+
+body {
+    margin: 0;
+    padding: 0;
+    font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
+    background: radial-gradient(circle at top, #111827 0, #020617 40%, #000 80%);
+    color: var(--text-main);
+}
+
+.page {
+    max-width: 1200px;
+    margin: 32px auto;
+    padding: 0 16px 32px;
+}
+
+h1 {
+    font-size: 28px;
+    margin: 0 0 4px;
+}
+
+.subtitle {
+    font-size: 14px;
+    color: var(--text-muted);
+}
+
+.cards {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+    gap: 16px;
+    margin: 24px 0;
+}
+
+.card {
+    background: linear-gradient(135deg, var(--bg-card) 0%, var(--bg-card-alt) 100%);
+    border-radius: 14px;
+    padding: 16px 18px;
+    border: 1px solid var(--border-subtle);
+    box-shadow: 0 18px 35px rgba(15,23,42,0.7);
+}
+
+.card-label {
+    font-size: 13px;
+    color: var(--text-muted);
+    margin-bottom: 4px;
+}
+
+.card-value {
+    font-size: 26px;
+    font-weight: 600;
+}
+
+.card-value.on {
+    color: var(--accent);
+}
+
+.card-value.off {
+    color: var(--accent-red);
+}
+
+.card-value.warn {
+    color: var(--accent-yellow);
+}
+
+.table-wrapper {
+    margin-top: 24px;
+    background: rgba(15,23,42,0.9);
+    border-radius: 14px;
+    border: 1px solid var(--border-subtle);
+    overflow: hidden;
+}
+
+table {
+    width: 100%;
+    border-collapse: collapse;
+}
+
+thead {
+    background: rgba(15,23,42,0.95);
+}
+
+th, td {
+    padding: 10px 14px;
+    text-align: left;
+    font-size: 13px;
+}
+
+th {
+    font-weight: 500;
+    color: var(--text-muted);
+    border-bottom: 1px solid #1f2937;
+}
+
+tbody tr:nth-child(even) {
+    background: rgba(15,23,42,0.85);
+}
+
+tbody tr:nth-child(odd) {
+    background: rgba(15,23,42,0.7);
+}
+
+tbody td:nth-child(3) {
+    color: var(--accent);
+}
+
+tbody td:nth-child(4) {
+    color: var(--accent-red);
+}
+
+.chart {
+    margin-top: 24px;
+    background: rgba(15,23,42,0.9);
+    border-radius: 14px;
+    border: 1px solid var(--border-subtle);
+    padding: 16px 18px;
+}
+
+.chart h2 {
+    font-size: 15px;
+    font-weight: 500;
+    margin: 0 0 8px;
+}
+
+.chart svg {
+    width: 100%;
+    height: 140px;
+}
+
+.chart .legenda {
+    font-size: 12px;
+    color: var(--text-muted);
+}
+
+.series {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(220px, 1fr));
+    gap: 12px;
+}
+
+.series h3 {
+    font-size: 12px;
+    font-weight: 500;
+    margin: 0;
+    color: var(--text-muted);
+}
+
+.chart .series svg {
+    height: 48px;
+}
+
+.footer {
+    margin-top: 16px;
+    font-size: 12px;
+    color: var(--text-muted);
+}
+"""
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+def _montar_painel_duracao(execucoes: list[dict], max_pontos: int = 120) -> str:
+    """
+    Gera o painel "Duração das execuções" como um SVG inline
+    (uma linha com a duração total de cada execução completa, em segundos).
+
+    Execuções do atalho "nada mudou" e rodadas leves do daemon duram bem
+    menos: ficam fora da linha e do p50/p95 (senão escondem lentidões reais)
+    e aparecem só na contagem.
+    """
+    recentes = [e for e in execucoes if "duracao_total_s" in e][-max_pontos:]
+    execucoes = [e for e in recentes if e.get("tipo", EXECUCAO_COMPLETA) == EXECUCAO_COMPLETA]
+    sem_artefatos = len(recentes) - len(execucoes)
+    if not execucoes:
+        return ""
+
+    largura, altura = 600, 120
+    duracoes = [float(e["duracao_total_s"]) for e in execucoes]
+    maior = max(duracoes) or 1.0
+    passo = largura / max(len(duracoes) - 1, 1)
+
+    pontos = " ".join(
+        f"{i * passo:.1f},{altura - (d / maior) * (altura - 10):.1f}"
+        for i, d in enumerate(duracoes)
+    )
+
+    ultima = execucoes[-1]
+    etapas = ultima.get("etapas") or {}
+    mais_lenta = max(etapas, key=etapas.get) if etapas else "-"
+
+    return f"""
+        <section class="chart">
+            <h2>Duração das execuções completas (últimas {len(duracoes)})</h2>
+            <svg viewBox="0 0 {largura} {altura}" preserveAspectRatio="none">
+                <polyline fill="none" stroke="#22c55e" stroke-width="2" points="{pontos}" />
+            </svg>
+            <div class="legenda">
+                Última: {duracoes[-1]:.2f}s em {ultima.get("timestamp", "")}
+                | p50: {_percentil(duracoes, 0.5):.2f}s
+                | p95: {_percentil(duracoes, 0.95):.2f}s
+                | Máxima: {maior:.2f}s
+                | Etapa mais lenta na última execução: {mais_lenta}
+                | {sem_artefatos} execuções sem artefatos (atalho ou rodada leve) fora do gráfico
+            </div>
+        </section>
+    """
+
+
+def _pontos_svg(
+    serie: Serie, inicio: int, fim: int, maior: float, largura: int, altura: int
+) -> str:
+    """Coordenadas do <polyline>: x pelo horário da execução, y pela contagem."""
+    duracao = max(fim - inicio, 1)
+    return " ".join(
+        f"{(t - inicio) / duracao * largura:.1f},{altura - v / maior * (altura - 4):.1f}"
+        for t, v in zip(serie.ts, serie.valores)
+    )
+
+
+def _montar_painel_series(series: SeriesTemporais | None) -> str:
+    """
+    Produtos ON (verde) e OFF (vermelho) por execução: um gráfico da loja e
+    um pequeno por seção, em SVG inline com pontos já reduzidos (o tamanho
+    não depende de quantos meses de histórico existem).
+    """
+    if series is None or series.execucoes < 2:
+        return ""
+
+    def grafico(on: Serie, off: Serie, largura: int, altura: int) -> str:
+        maior = max(max(on.valores), max(off.valores), 1)
+        return f"""
+            <svg viewBox="0 0 {largura} {altura}" preserveAspectRatio="none">
+                <polyline fill="none" stroke="#22c55e" stroke-width="2" points="{_pontos_svg(on, series.inicio, series.fim, maior, largura, altura)}" />
+                <polyline fill="none" stroke="#ef4444" stroke-width="2" points="{_pontos_svg(off, series.inicio, series.fim, maior, largura, altura)}" />
+            </svg>
+        """
+
+    secoes = "".join(
+        f"""
+            <div>
+                <h3>{s.secao} ({int(s.on.valores[-1])}/{s.total_atual} ON)</h3>
+                {grafico(s.on, s.off, 200, 48)}
+            </div>
+        """
+        for s in series.secoes
+    )
+
+    def data(ts: int) -> str:
+        return time.strftime("%d/%m/%Y %H:%M", time.gmtime(ts))
+
+    return f"""
+        <section class="chart">
+            <h2>Produtos ON/OFF por execução ({series.execucoes} execuções)</h2>
+            {grafico(series.loja_on, series.loja_off, 600, 120)}
+            <div class="legenda">
+                De {data(series.inicio)} a {data(series.fim)}
+                | <span style="color: #22c55e">ON</span>
+                | <span style="color: #ef4444">OFF (inclui desaparecidos)</span>
+                | até {len(series.loja_on.ts)} pontos por série
+            </div>
+        </section>
+
+        <section class="chart">
+            <h2>Por seção</h2>
+            <div class="series">
+                {secoes}
+            </div>
+        </section>
+    """
+
+
+def _montar_painel_precos(mudancas: list[MudancaPreco], max_linhas: int = 50) -> str:
+    """Tabela com as mudanças de preço detectadas na última execução."""
+    if not mudancas:
+        return ""
+
+    linhas = "".join(
+        f"""
+            <tr>
+                <td>{m.tipo}</td>
+                <td>{m.secao}</td>
+                <td>{m.nome}</td>
+                <td>{m.preco_anterior}</td>
+                <td>{m.preco_atual}</td>
+            </tr>
+        """
+        for m in mudancas[:max_linhas]
+    )
+
+    return f"""
+        <section class="table-wrapper">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Mudança de preço ({len(mudancas)})</th>
+                        <th>Seção</th>
+                        <th>Produto</th>
+                        <th>Antes</th>
+                        <th>Agora</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {linhas}
+                </tbody>
+            </table>
+        </section>
+    """
+
+
+def _montar_painel_disponibilidade(
+    disponibilidade: list[Disponibilidade],
+    max_produtos: int = 10,
+) -> str:
+    """
+    Tabela de disponibilidade por seção (uma coluna de % por janela, mais
+    episódios OFF / tempo médio OFF / trocas da primeira janela) e os
+    produtos menos disponíveis na primeira janela.
+    """
+    if not disponibilidade:
+        return ""
+
+    principal = disponibilidade[0]
+    pct_por_janela = [
+        dict(zip(d.por_secao["secao"], d.por_secao["disponibilidade_pct"]))
+        for d in disponibilidade
+    ]
+
+    cabecalho_janelas = "".join(
+        f"<th>% disponível ({d.janela.nome})</th>" for d in disponibilidade
+    )
+
+    linhas = ""
+    for r in principal.por_secao.itertuples(index=False):
+        colunas_pct = "".join(
+            f"<td>{pct.get(r.secao, '-')}</td>" for pct in pct_por_janela
+        )
+        linhas += f"""
+            <tr>
+                <td>{r.secao}</td>
+                <td>{r.produtos}</td>
+                {colunas_pct}
+                <td>{r.episodios_off}</td>
+                <td>{r.tempo_medio_off_h:.2f}h</td>
+                <td>{r.trocas}</td>
+            </tr>
+        """
+
+    piores = principal.por_produto.head(max_produtos)
+    linhas_produtos = "".join(
+        f"""
+            <tr>
+                <td>{r.secao}</td>
+                <td>{r.nome}</td>
+                <td>{r.disponibilidade_pct}%</td>
+                <td>{r.episodios_off}</td>
+                <td>{r.tempo_medio_off_h:.2f}h</td>
+                <td>{r.trocas}</td>
+            </tr>
+        """
+        for r in piores.itertuples(index=False)
+    )
+
+    return f"""
+        <section class="table-wrapper">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Disponibilidade por seção</th>
+                        <th>Produtos</th>
+                        {cabecalho_janelas}
+                        <th>Episódios OFF ({principal.janela.nome})</th>
+                        <th>Tempo médio OFF</th>
+                        <th>Trocas de status</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {linhas}
+                </tbody>
+            </table>
+        </section>
+
+        <section class="table-wrapper">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Menos disponíveis ({principal.janela.nome})</th>
+                        <th>Produto</th>
+                        <th>% disponível</th>
+                        <th>Episódios OFF</th>
+                        <th>Tempo médio OFF</th>
+                        <th>Trocas de status</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {linhas_produtos}
+                </tbody>
+            </table>
+        </section>
+    """
+
+
+def gerar_dashboard_html(
+    historico: Iterable[dict],
+    cfg: AppConfig,
+    mudancas_preco: list[MudancaPreco] | None = None,
+    disponibilidade: list[Disponibilidade] | None = None,
+    resumo: ResumoExecucao | None = None,
+    series: SeriesTemporais | None = None,
+) -> str:
+    arquivo_dashboard = Path(cfg.dashboard_output)
+
+    # Sem o resumo compartilhado da execução (ex.: benchmarks), agrega a
+    # partir da última execução registrada no histórico
+    if resumo is None:
+        resumo = agregar_historico(list(historico), str(horario_brasil()))
+
+    ultima_atualizacao = resumo.ultima_atualizacao
+    total_registros = resumo.total_registros_historico
+    total_on = resumo.total_on
+    total_off = resumo.total_off
+    total_desapareceram = resumo.desapareceram_alguma_vez
 
     # -----------------------------
     # Monta tabela de "Resumo por seção"
     # -----------------------------
-    secoes = sorted(
-        set(on_por_secao.keys())
-        | set(off_por_secao.keys())
-        | set(desapareceu_por_secao.keys())
-    )
-
     linhas_tabela = ""
-    for secao in secoes:
-        total_secao = on_por_secao.get(secao, 0) + off_por_secao.get(secao, 0)
+    for s in resumo.secoes:
         linhas_tabela += f"""
             <tr>
-                <td>{secao}</td>
-                <td>{total_secao}</td>
-                <td>{on_por_secao.get(secao, 0)}</td>
-                <td>{off_por_secao.get(secao, 0)}</td>
-                <td>{desapareceu_por_secao.get(secao, 0)}</td>
+                <td>{s.secao}</td>
+                <td>{s.total}</td>
+                <td>{s.on}</td>
+                <td>{s.off}</td>
+                <td>{s.desapareceu_alguma_vez}</td>
             </tr>
         """
 
+    # -----------------------------
+    # Painel de duração das execuções
+    # -----------------------------
+    painel_duracao = _montar_painel_duracao(
+        carregar_historico_execucoes(cfg.historico_execucoes_path)
+    )
+
+    painel_precos = _montar_painel_precos(mudancas_preco or [])
+
+    painel_disponibilidade = _montar_painel_disponibilidade(disponibilidade or [])
+
+    painel_series = _montar_painel_series(series)
+
     # -----------------------------
     # HTML (layout dark bonitinho)
     # -----------------------------
@@ -140,134 +493,7 @@ def gerar_dashboard_html(historico: Iterable[dict], cfg: AppConfig) -> str:
     <meta charset="UTF-8" />
     <title>Monitoramento de Produtos iFood - Demo</title>
     <style>
-        :root {{
-            --bg: #050816;
-            --bg-card: #0b1020;
-            --bg-card-alt: #111827;
-            --accent: #22c55e;
-            --accent-red: #ef4444;
-            --accent-yellow: #eab308;
-            --text-main: #f9fafb;
-            --text-muted: #9ca3af;
-            --border-subtle: #1f2937;
-        }}
-
-        * {{
-            box-sizing: border-box;
-        }}
-
-        body {{
-            margin: 0;
-            padding: 0;
-            font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
-            background: radial-gradient(circle at top, #111827 0, #020617 40%, #000 80%);
-            color: var(--text-main);
-        }}
-
-        .page {{
-            max-width: 1200px;
-            margin: 32px auto;
-            padding: 0 16px 32px;
-        }}
-
-        h1 {{
-            font-size: 28px;
-            margin: 0 0 4px;
-        }}
-
-        .subtitle {{
-            font-size: 14px;
-            color: var(--text-muted);
-        }}
-
-        .cards {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-            gap: 16px;
-            margin: 24px 0;
-        }}
-
-        .card {{
-            background: linear-gradient(135deg, var(--bg-card) 0%, var(--bg-card-alt) 100%);
-            border-radius: 14px;
-            padding: 16px 18px;
-            border: 1px solid var(--border-subtle);
-            box-shadow: 0 18px 35px rgba(15,23,42,0.7);
-        }}
-
-        .card-label {{
-            font-size: 13px;
-            color: var(--text-muted);
-            margin-bottom: 4px;
-        }}
-
-        .card-value {{
-            font-size: 26px;
-            font-weight: 600;
-        }}
-
-        .card-value.on {{
-            color: var(--accent);
-        }}
-
-        .card-value.off {{
-            color: var(--accent-red);
-        }}
-
-        .card-value.warn {{
-            color: var(--accent-yellow);
-        }}
-
-        .table-wrapper {{
-            margin-top: 24px;
-            background: rgba(15,23,42,0.9);
-            border-radius: 14px;
-            border: 1px solid var(--border-subtle);
-            overflow: hidden;
-        }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-        }}
-
-        thead {{
-            background: rgba(15,23,42,0.95);
-        }}
-
-        th, td {{
-            padding: 10px 14px;
-            text-align: left;
-            font-size: 13px;
-        }}
-
-        th {{
-            font-weight: 500;
-            color: var(--text-muted);
-            border-bottom: 1px solid #1f2937;
-        }}
-
-        tbody tr:nth-child(even) {{
-            background: rgba(15,23,42,0.85);
-        }}
-
-        tbody tr:nth-child(odd) {{
-            background: rgba(15,23,42,0.7);
-        }}
-
-        tbody td:nth-child(3) {{
-            color: var(--accent);
-        }}
-
-        tbody td:nth-child(4) {{
-            color: var(--accent-red);
-        }}
-
-        .footer {{
-            margin-top: 16px;
-            font-size: 12px;
-            color: var(--text-muted);
-        }}
+{ESTILO_PAINEL}
     </style>
 </head>
 <body>
@@ -315,6 +541,14 @@ def gerar_dashboard_html(historico: Iterable[dict], cfg: AppConfig) -> str:
             </table>
         </section>
 
+        {painel_series}
+
+        {painel_disponibilidade}
+
+        {painel_precos}
+
+        {painel_duracao}
+
         <div class="footer">
             Dashboard gerado automaticamente pelo script
             <code>python -m src.monitor --modo monitorar</code>.
@@ -332,7 +566,12 @@ def gerar_dashboard_html(historico: Iterable[dict], cfg: AppConfig) -> str:
         logging.info("Dashboard HTML gerado em %s", arquivo_dashboard)
 
         # Upload para GitHub (se configurado)
-        fazer_upload_github(cfg.github, str(arquivo_dashboard), arquivo_dashboard.name)
+        fazer_upload_github(
+            cfg.github,
+            arquivo_dashboard,
+            arquivo_dashboard.name,
+            prioridade=PRIORIDADE_COSMETICA,
+        )
 
     except Exception as e:
         logging.exception("Erro ao gerar dashboard HTML: %s", e)
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .identidade import id_produto
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class JanelaDisponibilidade:
+    """
+    Período (últimos `dias`) e, opcionalmente, faixa de horas [inicio, fim];
+    com `fim < inicio` a faixa passa da meia-noite (22-2 = 22h às 2h59).
+    """
+
+    nome: str
+    dias: int
+    horas: tuple[int, int] | None = None
+
+
+def interpretar_janelas(texto: str) -> list[JanelaDisponibilidade]:
+    """
+    Converte a especificação textual em janelas: "7d" = últimos 7 dias,
+    "7d@18-23" = últimos 7 dias, só das 18h às 23h, e "7d@22-2" = das 22h
+    às 2h. Entradas inválidas são ignoradas com aviso.
+    """
+    janelas: list[JanelaDisponibilidade] = []
+    for parte in (texto or "").split(","):
+        parte = parte.strip().lower()
+        if not parte:
+            continue
+        periodo, _, faixa = parte.partition("@")
+        try:
+            dias = int(periodo.rstrip("d"))
+            horas = None
+            if faixa:
+                inicio, _, fim = faixa.partition("-")
+                horas = (int(inicio), int(fim or inicio))
+                if not all(0 <= h <= 23 for h in horas):
+                    raise ValueError(f"horas fora de 0-23: {horas}")
+        except ValueError:
+            logger.warning("Janela de disponibilidade inválida: %r", parte)
+            continue
+        janelas.append(JanelaDisponibilidade(nome=parte, dias=dias, horas=horas))
+    return janelas
+
+
+def _registros_planos(historico: Iterable[dict]) -> Iterable[dict]:
+    # Formato antigo: um item por produto com a lista "historico" aninhada
+    for r in historico:
+        if isinstance(r.get("historico"), list):
+            for evento in r["historico"]:
+                yield {**evento, "secao": r.get("secao"), "nome": r.get("nome")}
+        else:
+            yield r
+
+
+@dataclass
+class Disponibilidade:
+    """
+    Disponibilidade calculada para uma janela:
+
+    - por_produto: Seção, Produto, Verificações, % disponível (ponderada
+      pelo tempo), Episódios OFF, Tempo médio OFF (h), Trocas de status
+    - por_secao: mesmas métricas somadas por seção
+    """
+
+    janela: JanelaDisponibilidade
+    por_produto: "pd.DataFrame"
+    por_secao: "pd.DataFrame"
+
+
+@dataclass
+class ColunasHistorico:
+    """Histórico em arrays NumPy, com textos codificados (factorize)."""
+
+    produto: Any  # código por produto (seção + nome)
+    secao: Any  # código da seção
+    nome: Any  # código do nome
+    ts: Any  # segundos desde a época (int64)
+    on: Any  # bool
+    secoes: Any  # código → texto
+    nomes: Any
+
+
+def colunas_historico(historico: Iterable[dict]) -> ColunasHistorico | None:
+    """
+    Extrai só as colunas usadas e codifica os textos com `pd.factorize`.
+    Timestamps e status se repetem muito (um por execução), então só os
+    valores distintos são convertidos. Também usado pelas séries temporais
+    do dashboard (src/series.py).
+    """
+    import numpy as np
+    import pandas as pd
+
+    registros = list(_registros_planos(historico))
+    if not registros:
+        return None
+
+    secao, secoes = pd.factorize(
+        np.array([str(r.get("secao") or "") for r in registros], dtype=object)
+    )
+    nome, nomes = pd.factorize(
+        np.array([str(r.get("nome") or "") for r in registros], dtype=object)
+    )
+    ts_cod, ts_unicos = pd.factorize(
+        np.array([str(r.get("timestamp") or "")[:19] for r in registros], dtype=object)
+    )
+    st_cod, st_unicos = pd.factorize(
+        np.array([str(r.get("status") or "") for r in registros], dtype=object)
+    )
+    ids = np.array([str(r.get("id_produto") or "") for r in registros], dtype=object)
+
+    ts_valores = pd.to_datetime(
+        pd.Index(ts_unicos), format="%Y-%m-%d %H:%M:%S", errors="coerce"
+    )
+    validos = ~np.asarray(ts_valores.isna())[ts_cod]
+    ts = ts_valores.to_numpy(dtype="datetime64[s]").astype(np.int64)[ts_cod]
+    on = np.array([s.strip().upper() == "ON" for s in st_unicos], dtype=bool)[st_cod]
+
+    # Produto = ID estável (src/identidade.py): um item renomeado ou movido
+    # de seção continua a mesma série. Registros anteriores aos IDs usam o ID
+    # derivado da chave, o mesmo que `id_do_estado` dá aos estados antigos
+    sem_id = ids == ""
+    if sem_id.any():
+        pares, inverso = np.unique(
+            secao[sem_id].astype(np.int64) * len(nomes) + nome[sem_id], return_inverse=True
+        )
+        derivados = np.array(
+            [id_produto(str(secoes[c // len(nomes)]), str(nomes[c % len(nomes)])) for c in pares],
+            dtype=object,
+        )
+        ids[sem_id] = derivados[inverso]
+    produto, _ = pd.factorize(ids)
+
+    return ColunasHistorico(
+        produto=produto[validos],
+        secao=secao[validos],
+        nome=nome[validos],
+        ts=ts[validos],
+        on=on[validos],
+        secoes=secoes,
+        nomes=nomes,
+    )
+
+
+def _intervalos_faixa(faixa: tuple[int, int]) -> list[tuple[int, int]]:
+    """Faixa inclusiva em horas → intervalos [de, ate) do dia (dois se passa da meia-noite)."""
+    inicio, fim = faixa
+    if inicio <= fim:
+        return [(inicio, fim + 1)]
+    return [(inicio, 24), (0, fim + 1)]
+
+
+def _na_faixa(horas_do_dia: Any, faixa: tuple[int, int]) -> Any:
+    """Máscara das horas do dia (0-23) dentro de `faixa`."""
+    inicio, fim = faixa
+    if inicio <= fim:
+        return (horas_do_dia >= inicio) & (horas_do_dia <= fim)
+    return (horas_do_dia >= inicio) | (horas_do_dia <= fim)
+
+
+def _tempo_na_faixa(ts: Any, faixa: tuple[int, int] | None) -> Any:
+    """
+    Segundos desde a época contando só as horas do dia em `faixa` (inclusive):
+    a diferença entre dois valores é o tempo dentro da faixa entre eles.
+    """
+    if faixa is None:
+        return ts
+
+    import numpy as np
+
+    total = 0
+    for de, ate in _intervalos_faixa(faixa):
+        por_dia = (ate - de) * 3600
+        total = total + (ts // 86400) * por_dia + np.clip(ts % 86400 - de * 3600, 0, por_dia)
+    return total
+
+
+def _run_lengths(
+    c: ColunasHistorico,
+    filtro: Any,
+    ate: int,
+    faixa: tuple[int, int] | None = None,
+) -> "pd.DataFrame":
+    """
+    Codifica o status de cada produto em sequências (run-length): uma linha
+    por trecho contínuo ON ou OFF, com duração e número de verificações.
+    Seção e nome são os do último registro do trecho.
+
+    O trecho dura do seu primeiro registro até o primeiro registro do trecho
+    seguinte (ou até a última verificação do produto, se for o último).
+    `horas` é o tempo em que o status do trecho valeu: até o próximo trecho
+    do produto ou, no último, até `ate` (a verificação mais recente da
+    janela), contando só as horas dentro de `faixa`. É a base da % disponível.
+    """
+    import numpy as np
+    import pandas as pd
+
+    produto, ts, on = c.produto[filtro], c.ts[filtro], c.on[filtro]
+    secao, nome = c.secao[filtro], c.nome[filtro]
+
+    ordem = np.lexsort((ts, produto))
+    produto, ts, on = produto[ordem], ts[ordem], on[ordem]
+    secao, nome = secao[ordem], nome[ordem]
+
+    n = len(produto)
+    novo_produto = np.ones(n, dtype=bool)
+    novo_produto[1:] = produto[1:] != produto[:-1]
+    inicio_trecho = novo_produto.copy()
+    inicio_trecho[1:] |= on[1:] != on[:-1]
+
+    inicios = np.flatnonzero(inicio_trecho)
+    fins_idx = np.append(inicios[1:], n) - 1  # último registro de cada trecho
+
+    # Fim = início do próximo trecho do mesmo produto; senão, último registro
+    proximo_mesmo_produto = np.append(~novo_produto[inicios[1:]], False)
+    fim_ts = np.where(
+        proximo_mesmo_produto,
+        ts[np.minimum(fins_idx + 1, n - 1)],
+        ts[fins_idx],
+    )
+
+    return pd.DataFrame(
+        {
+            "produto": produto[inicios],
+            "secao": secao[fins_idx],
+            "nome": nome[fins_idx],
+            "on": on[inicios],
+            "verificacoes": fins_idx - inicios + 1,
+            "duracao_h": (fim_ts - ts[inicios]) / 3600.0,
+            "horas": (
+                _tempo_na_faixa(np.where(proximo_mesmo_produto, fim_ts, ate), faixa)
+                - _tempo_na_faixa(ts[inicios], faixa)
+            )
+            / 3600.0,
+            # Primeiro trecho do produto não é "troca" de status
+            "troca": ~novo_produto[inicios],
+        }
+    )
+
+
+def pct_disponivel(horas_on: Any, horas: Any, verificacoes_on: Any, verificacoes: Any) -> Any:
+    """
+    % do tempo ON (horas ON / horas verificadas). Sem tempo medido (uma única
+    verificação), cai para verificações ON / verificações.
+    """
+    import numpy as np
+
+    horas = np.asarray(horas, dtype=float)
+    por_tempo = np.divide(
+        100.0 * np.asarray(horas_on, dtype=float),
+        horas,
+        out=np.zeros(horas.shape),
+        where=horas > 0,
+    )
+    por_verificacao = 100.0 * np.asarray(verificacoes_on) / np.asarray(verificacoes)
+    return np.where(horas > 0, por_tempo, por_verificacao)
+
+
+def _agregar(trechos: "pd.DataFrame", chaves: list[str], **extras: Any) -> "pd.DataFrame":
+    import numpy as np
+
+    trechos = trechos.assign(
+        verificacoes_on=np.where(trechos["on"], trechos["verificacoes"], 0),
+        horas_on=np.where(trechos["on"], trechos["horas"], 0.0),
+        episodio_off=~trechos["on"],
+        horas_off=np.where(trechos["on"], 0.0, trechos["duracao_h"]),
+    )
+    g = trechos.groupby(chaves, sort=False).agg(
+        verificacoes=("verificacoes", "sum"),
+        verificacoes_on=("verificacoes_on", "sum"),
+        horas=("horas", "sum"),
+        horas_on=("horas_on", "sum"),
+        episodios_off=("episodio_off", "sum"),
+        horas_off=("horas_off", "sum"),
+        trocas=("troca", "sum"),
+        produtos=("produto", "nunique"),
+        **extras,
+    )
+
+    resultado = g.reset_index()
+    resultado["disponibilidade_pct"] = pct_disponivel(
+        g["horas_on"].to_numpy(),
+        g["horas"].to_numpy(),
+        g["verificacoes_on"].to_numpy(),
+        g["verificacoes"].to_numpy(),
+    ).round(1)
+    resultado["tempo_medio_off_h"] = np.divide(
+        g["horas_off"].to_numpy(),
+        g["episodios_off"].to_numpy(),
+        out=np.zeros(len(g)),
+        where=g["episodios_off"].to_numpy() > 0,
+    ).round(2)
+    return resultado
+
+
+def calcular_disponibilidade(
+    historico: Iterable[dict],
+    janelas: list[JanelaDisponibilidade],
+) -> list[Disponibilidade]:
+    """
+    Disponibilidade por produto e por seção em cada janela, a partir do
+    histórico (vetorizado com NumPy/pandas: um único passe de run-length por
+    janela, sem loop por produto).
+
+    As janelas são relativas ao registro mais recente do histórico.
+    """
+    if not janelas:
+        return []
+
+    colunas = colunas_historico(historico)
+    if colunas is None or not len(colunas.ts):
+        return []
+
+    referencia = int(colunas.ts.max())
+    horas_do_dia = (colunas.ts // 3600) % 24
+    resultados: list[Disponibilidade] = []
+
+    for janela in janelas:
+        filtro = colunas.ts > referencia - janela.dias * 86400
+        if janela.horas is not None:
+            filtro &= _na_faixa(horas_do_dia, janela.horas)
+
+        if not filtro.any():
+            continue
+
+        trechos = _run_lengths(colunas, filtro, referencia, janela.horas)
+
+        # Um item por ID, com a seção e o nome mais recentes
+        por_produto = _agregar(
+            trechos, ["produto"], secao=("secao", "last"), nome=("nome", "last")
+        ).drop(columns=["produto", "produtos"])
+        por_produto = por_produto[
+            ["secao", "nome"] + [c for c in por_produto.columns if c not in ("secao", "nome")]
+        ]
+        por_produto["secao"] = colunas.secoes[por_produto["secao"].to_numpy()]
+        por_produto["nome"] = colunas.nomes[por_produto["nome"].to_numpy()]
+
+        por_secao = _agregar(trechos, ["secao"])
+        por_secao["secao"] = colunas.secoes[por_secao["secao"].to_numpy()]
+
+        resultados.append(
+            Disponibilidade(
+                janela=janela,
+                por_produto=por_produto.sort_values(
+                    ["disponibilidade_pct", "secao", "nome"], kind="stable"
+                ).reset_index(drop=True),
+                por_secao=por_secao.sort_values("secao").reset_index(drop=True),
+            )
+        )
+
+    return resultados
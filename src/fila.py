@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import csv
+import dataclasses
+import fcntl
+import json
+import logging
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from .config import AppConfig
+from .visao_lojas import slug_loja
+
+
+logger = logging.getLogger(__name__)
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+
+NOME_TRAVA = ".trava"
+
+_SQL_CRIAR = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    loja TEXT NOT NULL,
+    fonte TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_ate REAL,
+    criada_em REAL NOT NULL,
+    concluida_em REAL,
+    erro TEXT
+);
+CREATE INDEX IF NOT EXISTS tarefas_status ON tarefas (status, id);
+"""
+
+
+class LojaOcupada(RuntimeError):
+    """Outro processo está com a trava dos arquivos da loja."""
+
+
+class ColisaoDeSlug(ValueError):
+    """Outra loja da fila já usa a mesma pasta (`slug_loja`) em LOJAS_DIR."""
+
+
+@dataclass(frozen=True, slots=True)
+class Tarefa:
+    id: int
+    loja: str
+    fonte: str
+    tentativa: int
+
+
+class FilaLojas:
+    """
+    Fila de execuções por loja num arquivo SQLite compartilhado pelos workers.
+
+    - `reivindicar` entrega a tarefa pendente mais antiga com um lease de
+      `lease_s` segundos; o worker renova o lease (`renovar`) enquanto roda
+    - lease vencido (worker morto ou travado) volta a pendente no próximo
+      `reivindicar`, ou falha de vez depois de `tentativas`
+    - toda mudança de status confere o worker dono do lease: quem perdeu o
+      lease não conclui uma tarefa que já foi entregue a outro
+
+    Cada operação abre a sua conexão (seguro entre threads e processos) e
+    as que leem-e-gravam usam `BEGIN IMMEDIATE`. Sem WAL: o journal padrão
+    é o que funciona com o arquivo numa pasta de rede.
+    """
+
+    def __init__(self, path: str | Path, lease_s: float = 300.0, tentativas: int = 3) -> None:
+        self.path = Path(path)
+        self.lease_s = lease_s
+        self.tentativas = tentativas
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as con:
+            con.executescript(_SQL_CRIAR)
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield con
+        finally:
+            con.close()
+
+    @contextmanager
+    def _transacao(self) -> Iterator[sqlite3.Connection]:
+        with self._conectar() as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+
+    def enfileirar(self, loja: str, fonte: str = "") -> int | None:
+        """
+        Nova tarefa da loja (None se ela já está pendente ou em execução).
+
+        Levanta `ColisaoDeSlug` se outro nome já enfileirado cai na mesma
+        pasta ("Loja A" e "loja-a"): as duas lojas gravariam os mesmos
+        arquivos.
+        """
+        slug = slug_loja(loja)
+        with self._transacao() as con:
+            con.create_function("slug_loja", 1, slug_loja, deterministic=True)
+            outra = con.execute(
+                "SELECT loja FROM tarefas WHERE loja != ? AND slug_loja(loja) = ? LIMIT 1",
+                (loja, slug),
+            ).fetchone()
+            if outra is not None:
+                raise ColisaoDeSlug(f"{loja!r} usaria a pasta {slug!r} de {outra[0]!r}")
+
+            existente = con.execute(
+                "SELECT id FROM tarefas WHERE loja = ? AND status IN (?, ?)",
+                (loja, PENDENTE, EXECUTANDO),
+            ).fetchone()
+            if existente is not None:
+                return None
+            cursor = con.execute(
+                "INSERT INTO tarefas (loja, fonte, criada_em) VALUES (?, ?, ?)",
+                (loja, fonte, time.time()),
+            )
+            return cursor.lastrowid
+
+    def _liberar_vencidas(self, con: sqlite3.Connection, agora: float) -> None:
+        vencidas = con.execute(
+            "SELECT id, loja, worker FROM tarefas WHERE status = ? AND lease_ate < ?",
+            (EXECUTANDO, agora),
+        ).fetchall()
+        for id_, loja, worker in vencidas:
+            logger.warning("Lease vencido: %s (tarefa %d, worker %s).", loja, id_, worker)
+        con.execute(
+            """
+            UPDATE tarefas
+            SET status = CASE WHEN tentativas >= ? THEN ? ELSE ? END,
+                erro = 'lease vencido (worker ' || worker || ')',
+                worker = NULL,
+                lease_ate = NULL
+            WHERE status = ? AND lease_ate < ?
+            """,
+            (self.tentativas, FALHOU, PENDENTE, EXECUTANDO, agora),
+        )
+
+    def reivindicar(self, worker: str) -> Tarefa | None:
+        """Pega a tarefa pendente mais antiga (None se a fila está vazia)."""
+        agora = time.time()
+        with self._transacao() as con:
+            self._liberar_vencidas(con, agora)
+            linha = con.execute(
+                "SELECT id, loja, fonte, tentativas FROM tarefas "
+                "WHERE status = ? ORDER BY id LIMIT 1",
+                (PENDENTE,),
+            ).fetchone()
+            if linha is None:
+                return None
+            id_, loja, fonte, tentativas = linha
+            con.execute(
+                "UPDATE tarefas SET status = ?, worker = ?, lease_ate = ?, "
+                "tentativas = tentativas + 1 WHERE id = ?",
+                (EXECUTANDO, worker, agora + self.lease_s, id_),
+            )
+        return Tarefa(id_, loja, fonte, tentativas + 1)
+
+    def _atualizar(self, tarefa: Tarefa, worker: str, sql: str, parametros: tuple) -> bool:
+        """Aplica `sql` só se `worker` ainda é o dono do lease da tarefa."""
+        with self._conectar() as con:
+            cursor = con.execute(
+                f"UPDATE tarefas SET {sql} WHERE id = ? AND worker = ? AND status = ?",
+                (*parametros, tarefa.id, worker, EXECUTANDO),
+            )
+            return cursor.rowcount == 1
+
+    def renovar(self, tarefa: Tarefa, worker: str) -> bool:
+        """Heartbeat: estende o lease (False = o lease foi perdido)."""
+        return self._atualizar(tarefa, worker, "lease_ate = ?", (time.time() + self.lease_s,))
+
+    def concluir(self, tarefa: Tarefa, worker: str) -> bool:
+        return self._atualizar(
+            tarefa,
+            worker,
+            "status = ?, concluida_em = ?, lease_ate = NULL, erro = NULL",
+            (CONCLUIDA, time.time()),
+        )
+
+    def falhar(self, tarefa: Tarefa, worker: str, erro: str) -> bool:
+        """Volta para a fila, ou falha de vez depois de `tentativas`."""
+        return self._atualizar(
+            tarefa,
+            worker,
+            "status = CASE WHEN tentativas >= ? THEN ? ELSE ? END, "
+            "worker = NULL, lease_ate = NULL, erro = ?",
+            (self.tentativas, FALHOU, PENDENTE, erro),
+        )
+
+    def devolver(self, tarefa: Tarefa, worker: str) -> bool:
+        """Devolve à fila sem contar tentativa (ex.: loja travada por outro processo)."""
+        return self._atualizar(
+            tarefa,
+            worker,
+            "status = ?, worker = NULL, lease_ate = NULL, tentativas = tentativas - 1",
+            (PENDENTE,),
+        )
+
+    def contagens(self) -> dict[str, int]:
+        with self._conectar() as con:
+            return dict(
+                con.execute("SELECT status, COUNT(*) FROM tarefas GROUP BY status").fetchall()
+            )
+
+
+@contextmanager
+def trava_loja(pasta: str | Path) -> Iterator[None]:
+    """
+    Trava exclusiva (flock) dos arquivos da loja durante a execução: dois
+    processos nunca gravam o mesmo `estado_produtos.json` ao mesmo tempo,
+    mesmo que a fila entregue a loja duas vezes (ex.: lease vencido de um
+    worker que ainda estava rodando).
+    """
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    with (pasta / NOME_TRAVA).open("a") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise LojaOcupada(str(pasta)) from None
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def config_da_loja(cfg: AppConfig, loja: str, fonte: str = "") -> AppConfig:
+    """
+    Configuração de uma loja com os arquivos em `LOJAS_DIR/<slug>/` (o mesmo
+    layout da visão geral em src/visao_lojas.py).
+
+    Sem GitHub: os arquivos de todas as lojas teriam os mesmos nomes no
+    repositório; o estado de cada uma fica só na pasta compartilhada.
+    """
+    if cfg.lojas_dir is None:
+        raise ValueError("A fila de lojas exige LOJAS_DIR.")
+
+    pasta = cfg.lojas_dir / slug_loja(loja)
+    return dataclasses.replace(
+        cfg,
+        loja=loja,
+        fonte=fonte or cfg.fonte,
+        estado_path=pasta / cfg.estado_path.name,
+        historico_path=pasta / cfg.historico_path.name,
+        impressao_path=pasta / cfg.impressao_path.name,
+        estatisticas_off_path=pasta / cfg.estatisticas_off_path.name,
+        dashboard_output=pasta / cfg.dashboard_output.name,
+        excel_output=pasta / cfg.excel_output.name,
+        site_dir=pasta / "site",
+        site_dados=[pasta / p.name for p in cfg.site_dados],
+        metricas_path=pasta / cfg.metricas_path.name,
+        historico_execucoes_path=pasta / cfg.historico_execucoes_path.name,
+        prometheus_path=None,
+        outbox_path=pasta / cfg.outbox_path.name,
+        painel_path=pasta / cfg.painel_path.name,
+        resumo_loja_path=pasta / cfg.resumo_loja_path.name,
+        github=dataclasses.replace(cfg.github, token=""),
+    )
+
+
+def ler_lojas(arquivo: str | Path) -> list[tuple[str, str]]:
+    """
+    Lista de (loja, fonte) de um JSON (`[{"loja": ..., "fonte": ...}]`) ou
+    CSV com as colunas `loja` e `fonte` (fonte vazia = FONTE_CARDAPIO).
+    """
+    arquivo = Path(arquivo)
+    with arquivo.open("r", encoding="utf-8", newline="") as f:
+        if arquivo.suffix.lower() == ".json":
+            linhas = json.load(f)
+        else:
+            linhas = list(csv.DictReader(f))
+    return [
+        (str(linha["loja"]).strip(), str(linha.get("fonte") or "").strip())
+        for linha in linhas
+        if str(linha.get("loja") or "").strip()
+    ]
+
+
+def enfileirar_lojas(cfg: AppConfig, arquivo: str | Path) -> int:
+    fila = FilaLojas(cfg.fila.path, cfg.fila.lease_s, cfg.fila.tentativas)
+    novas = 0
+    for loja, fonte in ler_lojas(arquivo):
+        try:
+            novas += fila.enfileirar(loja, fonte) is not None
+        except ColisaoDeSlug as e:
+            logger.error("Loja recusada: %s. Renomeie uma das duas.", e)
+    logger.info("%d lojas enfileiradas (fila: %s).", novas, fila.contagens())
+    return novas
+
+
+@contextmanager
+def _lease_renovado(fila: FilaLojas, tarefa: Tarefa, worker: str) -> Iterator[None]:
+    """Renova o lease a cada 1/3 do prazo enquanto o bloco roda."""
+    fim = threading.Event()
+
+    def renovar() -> None:
+        while not fim.wait(fila.lease_s / 3):
+            if not fila.renovar(tarefa, worker):
+                logger.warning("Lease de %s perdido durante a execução.", tarefa.loja)
+                return
+
+    thread = threading.Thread(target=renovar, name=f"lease-{tarefa.id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        fim.set()
+        thread.join()
+
+
+def executar_worker(
+    cfg: AppConfig,
+    worker: str | None = None,
+    ate_esvaziar: bool = False,
+    parar: threading.Event | None = None,
+) -> int:
+    """
+    Consome a fila até `parar` (ou, com `ate_esvaziar`, até não haver tarefa
+    pendente nem em execução). Devolve quantas lojas foram processadas.
+    """
+    from .monitor import monitorar
+
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    parar = parar or threading.Event()
+    fila = FilaLojas(cfg.fila.path, cfg.fila.lease_s, cfg.fila.tentativas)
+    processadas = 0
+    logger.info("Worker %s consumindo %s.", worker, fila.path)
+
+    while not parar.is_set():
+        tarefa = fila.reivindicar(worker)
+        if tarefa is None:
+            # Tarefas em execução podem voltar à fila se o lease vencer
+            if ate_esvaziar and not fila.contagens().get(EXECUTANDO):
+                break
+            parar.wait(cfg.fila.espera_s)
+            continue
+
+        cfg_loja = config_da_loja(cfg, tarefa.loja, tarefa.fonte)
+        logger.info("Loja %s (tarefa %d, tentativa %d).", tarefa.loja, tarefa.id, tarefa.tentativa)
+        try:
+            with trava_loja(cfg_loja.estado_path.parent), _lease_renovado(fila, tarefa, worker):
+                monitorar(cfg_loja)
+        except LojaOcupada:
+            logger.info("Loja %s ocupada por outro processo. Devolvida à fila.", tarefa.loja)
+            fila.devolver(tarefa, worker)
+            parar.wait(cfg.fila.espera_s)
+            continue
+        except Exception as e:
+            logger.exception("Erro na loja %s: %s", tarefa.loja, e)
+            fila.falhar(tarefa, worker, f"{type(e).__name__}: {e}")
+            continue
+
+        processadas += 1
+        if not fila.concluir(tarefa, worker):
+            logger.warning("Loja %s concluída, mas o lease já era de outro worker.", tarefa.loja)
+
+    logger.info("Worker %s encerrado após %d lojas.", worker, processadas)
+    return processadas
+
+
+def rodar_worker(cfg: AppConfig, ate_esvaziar: bool = False) -> None:
+    parar = threading.Event()
+    # SIGTERM/SIGINT: termina a loja em andamento e sai
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: parar.set())
+    executar_worker(cfg, ate_esvaziar=ate_esvaziar, parar=parar)
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from sys import intern
+from typing import TYPE_CHECKING, Any, Sequence
+from urllib.parse import urlsplit
+
+from .registros import ProdutoRegistro, normalizar_status, novo_registro
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------
+# LEITURA DE CSV
+# -------------------------------
+
+def ler_produtos_csv(path: str | Path) -> list[ProdutoRegistro]:
+    """
+    Lê um CSV de produtos direto para `ProdutoRegistro` com o módulo `csv`
+    (sem DataFrame nem dict intermediário por linha).
+    """
+    # utf-8-sig tolera BOM de export do Excel
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        cabecalho = next(reader, [])
+
+        # Normaliza nomes de colunas para minúsculo e sem espaços extras
+        colunas = [c.strip().lower() for c in cabecalho]
+
+        # Mapeia nomes antigos para o padrão novo
+        if "produto" in colunas and "nome" not in colunas:
+            colunas[colunas.index("produto")] = "nome"
+
+        if "seção" in colunas and "secao" not in colunas:
+            colunas[colunas.index("seção")] = "secao"
+
+        colunas_esperadas = {"secao", "nome", "preco", "descricao", "status"}
+        faltando = colunas_esperadas - set(colunas)
+
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes no CSV: {faltando}")
+
+        i_secao, i_nome, i_preco, i_desc, i_status = (
+            colunas.index(c) for c in ("secao", "nome", "preco", "descricao", "status")
+        )
+
+        # O csv já entrega str: cria o registro direto, só internando seção/status
+        try:
+            return [
+                ProdutoRegistro(
+                    intern(row[i_secao]),
+                    row[i_nome],
+                    row[i_preco],
+                    row[i_desc],
+                    intern(normalizar_status(row[i_status])),
+                )
+                for row in reader
+                if row
+            ]
+        except IndexError:
+            # Linha curta (vírgula faltando, linha cortada): aponta onde está
+            raise ValueError(
+                f"Linha {reader.line_num} de {path} tem menos colunas que o "
+                f"cabeçalho ({len(cabecalho)})."
+            ) from None
+
+
+def interpretar_payload(payload: Any, prefixo_secao: str = "") -> list[ProdutoRegistro]:
+    """
+    Converte o JSON de cardápio em registros. Formatos aceitos:
+
+    - lista de itens: [{"secao", "nome", "preco", "descricao", "status"}, ...]
+    - {"produtos": [itens...]}
+    - {"secoes": [{"nome": "Bebidas", "itens": [itens sem "secao"...]}, ...]}
+
+    Nos itens, "produto" vale como "nome" e "seção" como "secao".
+    Com `prefixo_secao`, as seções viram "<prefixo> / <seção>".
+    """
+    if isinstance(payload, dict) and "secoes" in payload:
+        itens = [
+            {**item, "secao": item.get("secao") or secao.get("nome", "")}
+            for secao in payload["secoes"]
+            for item in secao.get("itens", [])
+        ]
+    elif isinstance(payload, dict) and "produtos" in payload:
+        itens = payload["produtos"]
+    elif isinstance(payload, list):
+        itens = payload
+    else:
+        raise ValueError("Payload de cardápio em formato desconhecido.")
+
+    prefixo = f"{prefixo_secao} / " if prefixo_secao else ""
+    return [
+        novo_registro(
+            prefixo + item.get("secao", item.get("seção", "")),
+            item.get("nome", item.get("produto", "")),
+            item.get("preco", item.get("preço", "")),
+            item.get("descricao", item.get("descrição", "")),
+            item.get("status", ""),
+        )
+        for item in itens
+    ]
+
+
+# -------------------------------
+# ADAPTADORES DE FONTE
+# -------------------------------
+
+class FonteCardapio(ABC):
+    """Origem dos produtos de uma execução (CSV, pasta de CSVs, HTTP...)."""
+
+    @abstractmethod
+    async def carregar(self) -> list[ProdutoRegistro]:
+        """Carrega e devolve todos os produtos da fonte."""
+
+    def descricao(self) -> str:
+        return type(self).__name__
+
+
+class FonteCSV(FonteCardapio):
+    """Um único arquivo CSV (o modo demo)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    async def carregar(self) -> list[ProdutoRegistro]:
+        import asyncio
+
+        return await asyncio.to_thread(ler_produtos_csv, self.path)
+
+    def descricao(self) -> str:
+        return f"CSV {self.path}"
+
+
+class FonteDiretorioCSV(FonteCardapio):
+    """Todos os `*.csv` de uma pasta (ex.: um export por loja ou por seção)."""
+
+    def __init__(self, pasta: str | Path, padrao: str = "*.csv") -> None:
+        self.pasta = Path(pasta)
+        self.padrao = padrao
+
+    async def carregar(self) -> list[ProdutoRegistro]:
+        import asyncio
+
+        arquivos = sorted(self.pasta.glob(self.padrao))
+        if not arquivos:
+            logger.warning("Nenhum CSV encontrado em %s (%s).", self.pasta, self.padrao)
+            return []
+
+        partes = await asyncio.gather(
+            *(asyncio.to_thread(ler_produtos_csv, a) for a in arquivos)
+        )
+        return [p for parte in partes for p in parte]
+
+    def descricao(self) -> str:
+        return f"pasta {self.pasta}/{self.padrao}"
+
+
+class FonteHTTPJSON(FonteCardapio):
+    """
+    Cardápios em JSON servidos por HTTP (um endpoint por loja), buscados em
+    paralelo com `httpx`:
+
+    - semáforo limita quantas requisições ficam em voo ao mesmo tempo
+    - um cliente por host, reaproveitando conexões (keep-alive)
+    - timeout por requisição
+    - cache em disco com ETag/Last-Modified: resposta 304 usa o corpo salvo
+    - as seções levam o nome da loja (campo "loja" do payload, ou
+      host/caminho da URL), com uma URL ou várias: a chave `secao|nome` de
+      produtos iguais em lojas diferentes não colide, e acrescentar uma URL
+      não muda as chaves das lojas que já estavam no estado
+    - uma URL com erro (rede, HTTP, JSON inválido) usa o último corpo em
+      cache; sem cache a execução para (`RuntimeError`), porque seguir sem a
+      loja marcaria todos os produtos dela como desaparecidos
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        concorrencia: int = 8,
+        timeout: float = 15.0,
+        cache_dir: str | Path | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.urls = list(urls)
+        self.concorrencia = max(1, concorrencia)
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.headers = headers or {}
+
+    # ---- cache em disco ----
+
+    def _arquivos_cache(self, url: str) -> tuple[Path, Path] | None:
+        if self.cache_dir is None:
+            return None
+        nome = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{nome}.json", self.cache_dir / f"{nome}.meta.json"
+
+    def _ler_cache(self, url: str) -> tuple[bytes, dict[str, str]] | None:
+        arquivos = self._arquivos_cache(url)
+        if arquivos is None or not arquivos[0].exists() or not arquivos[1].exists():
+            return None
+        try:
+            meta = json.loads(arquivos[1].read_text(encoding="utf-8"))
+            return arquivos[0].read_bytes(), meta
+        except Exception as e:
+            logger.warning("Cache inválido para %s: %s", url, e)
+            return None
+
+    def _gravar_cache(self, url: str, corpo: bytes, meta: dict[str, str]) -> None:
+        # Grava mesmo sem ETag/Last-Modified: o corpo serve de reserva se a
+        # URL falhar numa execução futura
+        arquivos = self._arquivos_cache(url)
+        if arquivos is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        arquivos[0].write_bytes(corpo)
+        arquivos[1].write_text(json.dumps(meta), encoding="utf-8")
+
+    # ---- busca ----
+
+    async def _buscar(self, cliente: Any, semaforo: asyncio.Semaphore, url: str) -> bytes:
+        headers = dict(self.headers)
+        cache = self._ler_cache(url)
+        if cache is not None:
+            if cache[1].get("etag"):
+                headers["If-None-Match"] = cache[1]["etag"]
+            if cache[1].get("last_modified"):
+                headers["If-Modified-Since"] = cache[1]["last_modified"]
+
+        async with semaforo:
+            resp = await cliente.get(url, headers=headers)
+
+        if resp.status_code == 304 and cache is not None:
+            logger.info("Cardápio %s não mudou (304), usando cache.", url)
+            return cache[0]
+
+        resp.raise_for_status()
+        corpo = resp.content
+
+        meta = {}
+        if resp.headers.get("etag"):
+            meta["etag"] = resp.headers["etag"]
+        if resp.headers.get("last-modified"):
+            meta["last_modified"] = resp.headers["last-modified"]
+        self._gravar_cache(url, corpo, meta)
+
+        return corpo
+
+    async def carregar_por_url(self) -> dict[str, list[ProdutoRegistro]]:
+        """Busca todas as URLs em paralelo e devolve os produtos de cada uma."""
+        import asyncio
+
+        import httpx
+
+        semaforo = asyncio.Semaphore(self.concorrencia)
+        timeout = httpx.Timeout(self.timeout)
+        limites = httpx.Limits(
+            max_connections=self.concorrencia,
+            max_keepalive_connections=self.concorrencia,
+        )
+
+        # Um cliente (pool de conexões) por host
+        hosts = {urlsplit(u).netloc for u in self.urls}
+        clientes = {
+            h: httpx.AsyncClient(timeout=timeout, limits=limites, follow_redirects=True)
+            for h in hosts
+        }
+
+        try:
+            corpos = await asyncio.gather(
+                *(
+                    self._buscar(clientes[urlsplit(u).netloc], semaforo, u)
+                    for u in self.urls
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            await asyncio.gather(*(c.aclose() for c in clientes.values()))
+
+        por_url: dict[str, list[ProdutoRegistro]] = {}
+        faltando: list[str] = []
+        for url, corpo in zip(self.urls, corpos):
+            try:
+                if isinstance(corpo, BaseException):
+                    raise corpo
+                por_url[url] = self._interpretar(url, corpo)
+            except Exception as e:
+                cache = self._ler_cache(url)
+                if cache is None:
+                    logger.error("Cardápio %s indisponível e sem cache: %s", url, e)
+                    faltando.append(url)
+                    continue
+                logger.warning("Cardápio %s indisponível (%s), usando o último em cache.", url, e)
+                try:
+                    por_url[url] = self._interpretar(url, cache[0])
+                except Exception as e_cache:
+                    logger.error("Cache do cardápio %s também inválido: %s", url, e_cache)
+                    faltando.append(url)
+
+        if faltando:
+            raise RuntimeError(
+                f"{len(faltando)} de {len(self.urls)} cardápios sem resposta nem cache: "
+                + ", ".join(faltando)
+            )
+        return por_url
+
+    def _interpretar(self, url: str, corpo: bytes) -> list[ProdutoRegistro]:
+        payload = json.loads(corpo)
+        # A seção identifica a loja (mesmo com uma URL só, para as chaves não
+        # mudarem quando outra loja entra na lista)
+        loja = payload.get("loja") if isinstance(payload, dict) else None
+        if not loja:
+            partes = urlsplit(url)
+            loja = f"{partes.netloc}{partes.path}".rstrip("/")
+        return interpretar_payload(payload, prefixo_secao=str(loja))
+
+    async def carregar(self) -> list[ProdutoRegistro]:
+        por_url = await self.carregar_por_url()
+        return [p for produtos in por_url.values() for p in produtos]
+
+    def descricao(self) -> str:
+        return f"HTTP JSON ({len(self.urls)} URLs)"
+
+
+def criar_fonte(
+    especificacao: str,
+    padrao_csv: str | Path,
+    cache_dir: str | Path | None = None,
+) -> FonteCardapio:
+    """
+    Cria a fonte a partir de uma especificação textual (env FONTE_CARDAPIO):
+
+    - ""                        → CSV padrão (`padrao_csv`)
+    - "csv:<arquivo>"           → um CSV
+    - "dir:<pasta>"             → todos os CSVs da pasta
+    - "http:<url1>,<url2>,..."  → endpoints JSON (um por loja)
+    """
+    especificacao = (especificacao or "").strip()
+    if not especificacao:
+        return FonteCSV(padrao_csv)
+
+    tipo, _, alvo = especificacao.partition(":")
+    tipo = tipo.lower()
+
+    if tipo == "csv":
+        return FonteCSV(alvo)
+    if tipo == "dir":
+        return FonteDiretorioCSV(alvo)
+    if tipo == "http":
+        urls = [u.strip() for u in alvo.split(",") if u.strip()]
+        return FonteHTTPJSON(urls, cache_dir=cache_dir)
+
+    raise ValueError(f"Fonte de cardápio desconhecida: {especificacao!r}")
+
+
+def carregar_fonte(fonte: FonteCardapio) -> list[ProdutoRegistro]:
+    """Executa `fonte.carregar()` de forma síncrona (pipeline do monitor)."""
+    import asyncio
+
+    return asyncio.run(fonte.carregar())
+
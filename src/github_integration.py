@@ -3,13 +3,21 @@ from __future__ import annotations
 import base64
 import json
 import logging
+import os
+from contextlib import nullcontext
 from pathlib import Path
 
-import requests
-
+from .agendador_github import (
+    PRIORIDADE_ESTADO,
+    OrcamentoEsgotado,
+    obter_agendador,
+)
 from .config import GithubConfig
 from .utils import horario_brasil
 
+# Tentativas do PUT quando o SHA mudou entre o GET e o PUT (409)
+TENTATIVAS_CONFLITO = 3
+
 
 def _build_headers(cfg: GithubConfig) -> dict:
     return {
@@ -18,38 +26,97 @@ def _build_headers(cfg: GithubConfig) -> dict:
     }
 
 
-def baixar_arquivo_github(cfg: GithubConfig, nome_arquivo: str) -> bool:
-    """Baixa arquivo do GitHub se as configs estiverem completas."""
+def _url_conteudo(cfg: GithubConfig, nome_remoto: str) -> str:
+    return f"{cfg.api_base}/repos/{cfg.repository}/contents/{nome_remoto}"
+
+
+def baixar_conteudo_github(
+    cfg: GithubConfig,
+    nome_remoto: str,
+    cache: str | Path | None = None,
+    tamanho_bloco: int = 1 << 20,
+    prioridade: int = PRIORIDADE_ESTADO,
+) -> bytes | None:
+    """
+    Baixa um arquivo do repositório e devolve os bytes direto para quem vai
+    interpretá-los (sem gravar e reler do disco).
+
+    - pede o conteúdo bruto (`application/vnd.github.v3.raw`): sem JSON nem
+      base64 no meio, e funciona para arquivos acima de 1 MB
+    - recebe em streaming, em blocos de `tamanho_bloco`
+    - com `cache`, cada bloco também é gravado no disco conforme chega
+      (write-through), trocando o arquivo só no fim do download
+
+    Devolve None se o GitHub não estiver configurado ou o arquivo não existir.
+    """
     if not cfg.token or not cfg.repository:
         logging.warning(
             "Configurações do GitHub incompletas. Não foi possível baixar %s.",
-            nome_arquivo,
+            nome_remoto,
         )
-        return False
+        return None
 
-    url = f"https://api.github.com/repos/{cfg.repository}/contents/{nome_arquivo}"
-    response = requests.get(url, headers=_build_headers(cfg), timeout=30)
+    url = _url_conteudo(cfg, nome_remoto)
+    headers = {**_build_headers(cfg), "Accept": "application/vnd.github.v3.raw"}
 
-    if response.status_code != 200:
-        logging.warning(
-            "Arquivo %s não encontrado no GitHub (status %s).",
-            nome_arquivo,
-            response.status_code,
+    try:
+        response = obter_agendador(cfg).requisitar(
+            "GET", url, prioridade, headers=headers, timeout=30, stream=True
         )
-        return False
-
-    conteudo_base64 = response.json()["content"]
-    conteudo = base64.b64decode(conteudo_base64).decode("utf-8")
-
-    Path(nome_arquivo).write_text(conteudo, encoding="utf-8")
-    logging.info("Arquivo %s baixado do GitHub.", nome_arquivo)
-    return True
-
-
-def fazer_upload_github(cfg: GithubConfig,
-                        arquivo_local: str,
-                        nome_remoto: str | None = None) -> bool:
-    """Envia arquivo para o GitHub (cria ou atualiza)."""
+    except OrcamentoEsgotado as e:
+        logging.warning("Download de %s adiado: %s.", nome_remoto, e)
+        return None
+
+    with response:
+        if response.status_code != 200:
+            logging.warning(
+                "Arquivo %s não encontrado no GitHub (status %s).",
+                nome_remoto,
+                response.status_code,
+            )
+            return None
+
+        blocos: list[bytes] = []
+        parcial = Path(f"{cache}.part") if cache is not None else None
+        try:
+            with parcial.open("wb") if parcial is not None else nullcontext() as f:
+                for bloco in response.iter_content(chunk_size=tamanho_bloco):
+                    blocos.append(bloco)
+                    if f is not None:
+                        f.write(bloco)
+        except BaseException:
+            # Download cortado no meio: não deixa o .part para trás
+            if parcial is not None:
+                parcial.unlink(missing_ok=True)
+            raise
+
+    if parcial is not None:
+        os.replace(parcial, cache)
+
+    conteudo = b"".join(blocos)
+    logging.info("Arquivo %s baixado do GitHub (%d bytes).", nome_remoto, len(conteudo))
+    return conteudo
+
+
+def baixar_arquivo_github(cfg: GithubConfig, arquivo_local: str | Path) -> bool:
+    """Baixa um arquivo do GitHub para `arquivo_local` (mesmo nome na raiz do repo)."""
+    destino = Path(arquivo_local)
+    return baixar_conteudo_github(cfg, destino.name, cache=destino) is not None
+
+
+def fazer_upload_github(
+    cfg: GithubConfig,
+    arquivo_local: str | Path,
+    nome_remoto: str | None = None,
+    prioridade: int = PRIORIDADE_ESTADO,
+) -> bool:
+    """
+    Envia arquivo para o GitHub (cria ou atualiza).
+
+    As requisições passam pelo agendador compartilhado (ritmo e limites da
+    API). Se o arquivo mudou no repositório entre o GET e o PUT (409, SHA
+    desatualizado), o SHA é buscado de novo e o PUT repetido.
+    """
     if not cfg.token or not cfg.repository:
         logging.warning(
             "Configurações do GitHub incompletas. Não foi possível fazer upload de %s.",
@@ -57,39 +124,59 @@ def fazer_upload_github(cfg: GithubConfig,
         )
         return False
 
-    nome_remoto = nome_remoto or arquivo_local
     path = Path(arquivo_local)
+    # Arquivos ficam na raiz do repositório: o caminho local não vai para a URL
+    nome_remoto = Path(nome_remoto).name if nome_remoto else path.name
     if not path.exists():
         logging.warning("Arquivo local %s não existe.", path)
         return False
 
-    conteudo = path.read_text(encoding="utf-8")
-    conteudo_base64 = base64.b64encode(conteudo.encode("utf-8")).decode("utf-8")
+    conteudo_base64 = base64.b64encode(path.read_bytes()).decode("ascii")
 
-    url = f"https://api.github.com/repos/{cfg.repository}/contents/{nome_remoto}"
+    url = _url_conteudo(cfg, nome_remoto)
     headers = _build_headers(cfg)
+    agendador = obter_agendador(cfg)
+
+    try:
+        for tentativa in range(1, TENTATIVAS_CONFLITO + 1):
+            # Verifica se existe (e pega o SHA atual)
+            r_get = agendador.requisitar("GET", url, prioridade, headers=headers, timeout=30)
+            if r_get.status_code == 200:
+                payload = {
+                    "message": f"Atualizar {nome_remoto} - {horario_brasil()}",
+                    "content": conteudo_base64,
+                    "sha": r_get.json()["sha"],
+                }
+            else:
+                payload = {
+                    "message": f"Adicionar {nome_remoto} - {horario_brasil()}",
+                    "content": conteudo_base64,
+                }
+
+            r_put = agendador.requisitar(
+                "PUT", url, prioridade, headers=headers, data=json.dumps(payload), timeout=30
+            )
+            if r_put.status_code != 409 or tentativa == TENTATIVAS_CONFLITO:
+                break
+            logging.warning(
+                "Conflito de SHA ao enviar %s (tentativa %d). Buscando o SHA de novo.",
+                nome_remoto,
+                tentativa,
+            )
+    except OrcamentoEsgotado as e:
+        logging.warning("Upload de %s pulado: %s.", nome_remoto, e)
+        return False
 
-    # Verifica se existe
-    r_get = requests.get(url, headers=headers, timeout=30)
-    if r_get.status_code == 200:
-        sha = r_get.json()["sha"]
-        payload = {
-            "message": f"Atualizar {nome_remoto} - {horario_brasil()}",
-            "content": conteudo_base64,
-            "sha": sha,
-        }
-    else:
-        payload = {
-            "message": f"Adicionar {nome_remoto} - {horario_brasil()}",
-            "content": conteudo_base64,
-        }
-
-    r_put = requests.put(url, headers=headers, data=json.dumps(payload), timeout=30)
     ok = r_put.status_code in (200, 201)
 
     if ok:
         logging.info("Arquivo %s enviado para GitHub (%s).", nome_remoto, r_put.status_code)
     else:
-        logging.error("Erro ao enviar %s para GitHub: %s", nome_remoto, r_put.text)
+        logging.error(
+            "Erro ao enviar %s para GitHub (status %s): %s",
+            nome_remoto,
+            r_put.status_code,
+            r_put.text,
+        )
 
-    return ok
\ No newline at end of file
+    return ok
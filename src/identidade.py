@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import difflib
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+
+from .registros import ProdutoRegistro
+
+
+# Tamanho dos n-gramas de caracteres do índice invertido
+N_GRAMA = 3
+
+# N-gramas presentes em mais nomes que isso não discriminam ("de ", "ml ")
+# e ficam fora da busca de candidatos (a não ser que só existam eles)
+MAX_POSTAGENS = 200
+
+# Candidatos (mais n-gramas em comum) pontuados por produto novo
+MAX_CANDIDATOS = 5
+
+# Fração mínima dos n-gramas do nome novo presente no antigo
+MIN_NGRAMAS_COMUNS = 0.3
+
+# Similaridade mínima (0-100) para considerar o mesmo produto: renomeado na
+# mesma seção ou movido para outra seção (exige nome quase idêntico)
+LIMIAR_MESMA_SECAO = 85.0
+LIMIAR_OUTRA_SECAO = 92.0
+
+# Unidades que acompanham números nos nomes ("2L", "350 ml", "6 un"), na
+# grafia canônica. Outras palavras depois do número não contam como unidade
+_UNIDADES = {
+    "ml": "ml",
+    "l": "l",
+    "lt": "l",
+    "litro": "l",
+    "litros": "l",
+    "g": "g",
+    "gr": "g",
+    "kg": "kg",
+    "un": "un",
+    "und": "un",
+    "unid": "un",
+    "unidade": "un",
+    "unidades": "un",
+    "cm": "cm",
+}
+_QUANTIDADE = re.compile(r"(\d+(?:[.,]\d+)?)\s*([a-z]*)")
+
+
+def id_produto(secao: str, nome: str, visto_em: str = "") -> str:
+    """
+    ID estável do produto: hash da chave "Seção|Produto" em que foi visto
+    pela 1ª vez. `visto_em` entra no hash quando a chave foi aposentada (ver
+    `_atribuir_ids_novos`).
+    """
+    base = f"{secao}|{nome}" + (f"@{visto_em}" if visto_em else "")
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12]
+
+
+def id_do_estado(chave: str, info: dict[str, Any]) -> str:
+    """ID gravado no estado (ou derivado da chave, em estados antigos sem ID)."""
+    if info.get("ID"):
+        return str(info["ID"])
+    secao, _, nome = chave.partition("|")
+    return id_produto(secao, nome)
+
+
+def _normalizar(texto: str) -> str:
+    """Minúsculo, sem acentos e pontuação, espaços simples."""
+    texto = unicodedata.normalize("NFKD", texto).casefold()
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", texto).split())
+
+
+def _quantidades(nome: str) -> tuple[tuple[str, str], ...]:
+    """
+    "Coca-Cola 1,5 Litros" → (("1.5", "l"),). Variantes de tamanho têm nomes
+    quase iguais ("Coca-Cola 2L" e "Coca-Cola 1L" pontuam ~92): só nomes com
+    os mesmos números e unidades podem ser o mesmo produto.
+    """
+    texto = unicodedata.normalize("NFKD", nome).casefold()
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return tuple(
+        sorted(
+            (f"{float(numero.replace(',', '.')):g}", _UNIDADES.get(unidade, ""))
+            for numero, unidade in _QUANTIDADE.findall(texto)
+        )
+    )
+
+
+def _ngramas(texto: str) -> set[str]:
+    texto = f" {texto} "
+    return {texto[i : i + N_GRAMA] for i in range(max(1, len(texto) - N_GRAMA + 1))}
+
+
+@lru_cache(maxsize=1)
+def _pontuador() -> Callable[[str, str], float]:
+    """`rapidfuzz.fuzz.token_sort_ratio` se instalado; senão difflib equivalente."""
+    try:
+        from rapidfuzz import fuzz
+
+        return fuzz.token_sort_ratio
+    except ImportError:
+
+        def token_sort_ratio(a: str, b: str) -> float:
+            a, b = " ".join(sorted(a.split())), " ".join(sorted(b.split()))
+            return 100.0 * difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+        return token_sort_ratio
+
+
+@dataclass(frozen=True, slots=True)
+class Correspondencia:
+    """Produto antigo sem par exato reconhecido num produto novo."""
+
+    chave_anterior: str
+    chave_atual: str
+    id_produto: str
+    similaridade: float
+
+
+def reconciliar_produtos(
+    produtos_atual: list[ProdutoRegistro],
+    estado_anterior: dict[str, dict[str, Any]],
+    visto_em: str,
+) -> tuple[dict[str, dict[str, Any]], list[Correspondencia]]:
+    """
+    Preenche `id_produto` de todos os produtos atuais e reconhece produtos
+    renomeados ou movidos de seção ("Destaques" → "Promoções"). `visto_em`
+    (timestamp da execução) desambigua o ID de produtos novos que reusam uma
+    chave aposentada.
+
+    Nomes com números/unidades diferentes ("2L" e "1L") nunca casam: são
+    variantes, não renomeações.
+
+    Só os itens sem par exato entram na busca: os nomes antigos que sumiram
+    vão para um índice invertido de n-gramas de caracteres e cada nome novo
+    só é pontuado contra os poucos candidatos com mais n-gramas em comum
+    (custo quase linear, sem comparar todos contra todos).
+
+    Devolve o estado anterior realinhado (itens reconhecidos passam para a
+    chave nova, então não viram "desaparecidos" + "novos") e a lista de
+    correspondências. `estado_anterior` não é alterado.
+    """
+    novos: list[ProdutoRegistro] = []
+    for p in produtos_atual:
+        info = estado_anterior.get(p.chave)
+        if info is not None:
+            p.id_produto = id_do_estado(p.chave, info)
+        else:
+            novos.append(p)
+
+    atuais = {p.chave for p in produtos_atual}
+    sobras = [chave for chave in estado_anterior if chave not in atuais]
+    if not novos or not sobras:
+        _atribuir_ids_novos(novos, estado_anterior, visto_em)
+        return estado_anterior, []
+
+    # Índice invertido: n-grama → posições dos nomes antigos sem par
+    nomes_antigos: list[str] = []
+    secoes_antigas: list[str] = []
+    quantidades_antigas: list[tuple[tuple[str, str], ...]] = []
+    indice: dict[str, list[int]] = {}
+    for i, chave in enumerate(sobras):
+        secao, _, nome = chave.partition("|")
+        nome_norm = _normalizar(nome)
+        nomes_antigos.append(nome_norm)
+        secoes_antigas.append(secao)
+        quantidades_antigas.append(_quantidades(nome))
+        for g in _ngramas(nome_norm):
+            indice.setdefault(g, []).append(i)
+
+    pontuar = _pontuador()
+    pares: list[tuple[float, int, int]] = []
+    for j, p in enumerate(novos):
+        nome_norm = _normalizar(p.nome)
+        quantidades = _quantidades(p.nome)
+        gramas = _ngramas(nome_norm)
+        # Mais raros primeiro; os muito comuns só entram se não houver outros
+        postagens = sorted((indice[g] for g in gramas if g in indice), key=len)
+        usadas = [ps for ps in postagens if len(ps) <= MAX_POSTAGENS] or postagens[:N_GRAMA]
+        comuns: Counter[int] = Counter()
+        for ps in usadas:
+            comuns.update(ps)
+
+        minimo = MIN_NGRAMAS_COMUNS * len(usadas)
+        for i, n in comuns.most_common(MAX_CANDIDATOS):
+            if n < minimo:
+                break
+            if quantidades_antigas[i] != quantidades:
+                continue
+            limiar = LIMIAR_MESMA_SECAO if secoes_antigas[i] == p.secao else LIMIAR_OUTRA_SECAO
+            nota = float(pontuar(nome_norm, nomes_antigos[i]))
+            if nota >= limiar:
+                pares.append((nota, j, i))
+
+    # Atribuição gulosa pela maior similaridade (cada item casa uma vez só)
+    estado_alinhado = dict(estado_anterior)
+    correspondencias: list[Correspondencia] = []
+    usados_novos: set[int] = set()
+    usados_antigos: set[int] = set()
+    for nota, j, i in sorted(pares, key=lambda par: -par[0]):
+        if j in usados_novos or i in usados_antigos:
+            continue
+        usados_novos.add(j)
+        usados_antigos.add(i)
+
+        p, chave_anterior = novos[j], sobras[i]
+        info = estado_alinhado.pop(chave_anterior)
+        p.id_produto = id_do_estado(chave_anterior, info)
+        estado_alinhado[p.chave] = info
+        correspondencias.append(
+            Correspondencia(chave_anterior, p.chave, p.id_produto, round(nota, 1))
+        )
+
+    _atribuir_ids_novos(
+        [p for j, p in enumerate(novos) if j not in usados_novos], estado_alinhado, visto_em
+    )
+    return estado_alinhado, correspondencias
+
+
+def _atribuir_ids_novos(
+    novos: list[ProdutoRegistro],
+    estado: dict[str, dict[str, Any]],
+    visto_em: str,
+) -> None:
+    """
+    ID dos produtos realmente novos: o derivado da chave, a não ser que ele já
+    seja de outro produto. É o caso da chave aposentada por uma renomeação
+    ("Coca" → "Coca-Cola 350ml" leva o ID de "Coca"): um produto novo que
+    surja com o nome antigo ganha um ID com `visto_em` em vez de herdar o
+    histórico do renomeado.
+    """
+    if not novos:
+        return
+
+    em_uso = {id_do_estado(chave, info) for chave, info in estado.items()}
+    for p in novos:
+        novo_id = id_produto(p.secao, p.nome)
+        if novo_id in em_uso:
+            novo_id = id_produto(p.secao, p.nome, visto_em)
+        em_uso.add(novo_id)
+        p.id_produto = novo_id
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import signal
+from typing import Any, get_args
+
+from .config import AppConfig
+from .fontes import criar_fonte, interpretar_payload
+from .models import StatusType
+from .precos import interpretar_preco
+from .registros import ProdutoRegistro, normalizar_status, novo_registro
+from .state import EstadoEmMemoria, registros_do_estado
+
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo para receber cabeçalhos + corpo de uma requisição
+TIMEOUT_REQUISICAO_S = 15.0
+
+_MOTIVOS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    411: "Length Required",
+    413: "Payload Too Large",
+}
+
+STATUS_VALIDOS = frozenset(get_args(StatusType))
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, status: int, mensagem: str) -> None:
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _resposta(status: int, dados: dict[str, Any]) -> bytes:
+    corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+    cabecalho = (
+        f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(corpo)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return cabecalho.encode("ascii") + corpo
+
+
+class ServidorIngestao:
+    """
+    Recebe o cardápio por push (HTTP, só stdlib/asyncio) em vez de esperar o
+    próximo horário agendado:
+
+    - `POST /cardapio`: cardápio completo (mesmos formatos de
+      `fontes.interpretar_payload`), substitui o catálogo em memória
+    - `POST /eventos`: um evento ou lista de eventos de item
+      (`{"secao", "nome", "status"}`, opcionalmente `preco`/`descricao`;
+      `"removido": true` tira o item do cardápio)
+    - `GET /saude`: contagens do catálogo e das rodadas
+
+    O catálogo fica indexado por "Seção|Produto", então cada evento custa
+    O(1). Pushes que chegam dentro da janela de debounce são agrupados numa
+    única rodada do pipeline (`monitorar` com a memória do daemon), que faz
+    o diff com o estado e dispara os alertas (leve, ver
+    `processar_pendencias`).
+    """
+
+    def __init__(
+        self,
+        cfg: AppConfig,
+        memoria: EstadoEmMemoria,
+        catalogo: list[ProdutoRegistro] | None = None,
+    ) -> None:
+        self.cfg = cfg
+        self.memoria = memoria
+        self.catalogo: dict[str, ProdutoRegistro] = {p.chave: p for p in catalogo or []}
+        self.pendentes = 0  # pushes ainda não processados
+        self.rodadas = 0
+        self._primeiro_push = 0.0
+        self._ultimo_push = 0.0
+        self._tem_pendencia = asyncio.Event()
+
+    # ---- aplicação dos pushes ----
+
+    def _marcar_pendencia(self) -> None:
+        agora = asyncio.get_running_loop().time()
+        if not self.pendentes:
+            self._primeiro_push = agora
+        self._ultimo_push = agora
+        self.pendentes += 1
+        self._tem_pendencia.set()
+
+    def aplicar_cardapio(self, payload: Any) -> int:
+        produtos = interpretar_payload(payload)
+        self.catalogo = {p.chave: p for p in produtos}
+        self._marcar_pendencia()
+        return len(produtos)
+
+    def _validar_evento(self, evento: Any) -> tuple[str, ProdutoRegistro | None]:
+        """Chave do item e o registro resultante (None = remover) de um evento."""
+        if not isinstance(evento, dict):
+            raise ValueError("Evento deve ser um objeto JSON.")
+        secao = evento.get("secao", evento.get("seção", ""))
+        nome = evento.get("nome", evento.get("produto", ""))
+        if not nome:
+            raise ValueError("Evento sem 'nome'.")
+        chave = f"{secao}|{nome}"
+
+        if evento.get("removido"):
+            return chave, None
+
+        anterior = self.catalogo.get(chave)
+        status = evento.get("status")
+        if isinstance(status, str):
+            status = normalizar_status(status)
+        if status is None and anterior is None:
+            raise ValueError(f"Evento sem 'status' para item novo: {chave}")
+        if status is not None and status not in STATUS_VALIDOS:
+            validos = ", ".join(sorted(STATUS_VALIDOS))
+            raise ValueError(f"Status inválido para {chave}: {status!r} (use {validos}).")
+
+        preco = evento.get("preco")
+        if preco is not None and (
+            not isinstance(preco, str) or (preco and interpretar_preco(preco)[0] is None)
+        ):
+            raise ValueError(f"Preço inválido para {chave}: {preco!r} (ex.: \"R$ 19,90\").")
+
+        # Campos ausentes no evento mantêm o valor atual do item
+        return chave, novo_registro(
+            secao,
+            nome,
+            preco if preco is not None else (anterior.preco if anterior else ""),
+            evento.get("descricao", anterior.descricao if anterior else ""),
+            status if status is not None else anterior.status,
+        )
+
+    def aplicar_eventos(self, payload: Any) -> int:
+        """
+        Valida todos os eventos antes de aplicar: um evento inválido recusa o
+        lote inteiro (400) sem mexer no catálogo.
+        """
+        eventos = payload if isinstance(payload, list) else [payload]
+        alteracoes = [self._validar_evento(evento) for evento in eventos]
+        for chave, registro in alteracoes:
+            if registro is None:
+                self.catalogo.pop(chave, None)
+            else:
+                self.catalogo[chave] = registro
+
+        if eventos:
+            self._marcar_pendencia()
+        return len(eventos)
+
+    # ---- HTTP ----
+
+    async def _ler_requisicao(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[str, str, dict[str, str], bytes]:
+        linha = (await reader.readline()).decode("latin-1").strip()
+        try:
+            metodo, caminho, _ = linha.split(" ", 2)
+        except ValueError:
+            raise ErroRequisicao(400, "Linha de requisição inválida.") from None
+
+        cabecalhos: dict[str, str] = {}
+        while True:
+            linha = (await reader.readline()).decode("latin-1").strip()
+            if not linha:
+                break
+            nome, _, valor = linha.partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        if "transfer-encoding" in cabecalhos:
+            raise ErroRequisicao(411, "Envie o corpo com Content-Length.")
+        try:
+            tamanho = int(cabecalhos.get("content-length") or 0)
+        except ValueError:
+            raise ErroRequisicao(400, "Content-Length inválido.") from None
+        if tamanho < 0:
+            raise ErroRequisicao(400, "Content-Length inválido.")
+        if tamanho > self.cfg.ingestao.max_bytes:
+            raise ErroRequisicao(413, f"Corpo acima de {self.cfg.ingestao.max_bytes} bytes.")
+        corpo = await reader.readexactly(tamanho) if tamanho else b""
+        return metodo.upper(), caminho.split("?", 1)[0], cabecalhos, corpo
+
+    def _rotear(
+        self, metodo: str, caminho: str, cabecalhos: dict[str, str], corpo: bytes
+    ) -> tuple[int, dict[str, Any]]:
+        if caminho == "/saude":
+            if metodo != "GET":
+                raise ErroRequisicao(405, "Use GET.")
+            return 200, {
+                "ok": True,
+                "produtos": len(self.catalogo),
+                "pendentes": self.pendentes,
+                "rodadas": self.rodadas,
+            }
+
+        if caminho not in ("/cardapio", "/eventos"):
+            raise ErroRequisicao(404, f"Caminho desconhecido: {caminho}")
+        if metodo != "POST":
+            raise ErroRequisicao(405, "Use POST.")
+
+        token = self.cfg.ingestao.token
+        if token and cabecalhos.get("authorization") != f"Bearer {token}":
+            raise ErroRequisicao(401, "Token inválido.")
+
+        try:
+            payload = json.loads(corpo or b"null")
+            if caminho == "/cardapio":
+                n = self.aplicar_cardapio(payload)
+            else:
+                n = self.aplicar_eventos(payload)
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ErroRequisicao(400, str(e)) from None
+
+        return 202, {"ok": True, "aplicados": n, "pendentes": self.pendentes}
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                requisicao = await asyncio.wait_for(
+                    self._ler_requisicao(reader), timeout=TIMEOUT_REQUISICAO_S
+                )
+                status, dados = self._rotear(*requisicao)
+            except ErroRequisicao as e:
+                status, dados = e.status, {"ok": False, "erro": str(e)}
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                status, dados = 408, {"ok": False, "erro": "Requisição incompleta."}
+
+            writer.write(_resposta(status, dados))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # ---- rodadas do pipeline ----
+
+    async def _esperar_debounce(self, parar: asyncio.Event) -> None:
+        """Espera a rajada acalmar (ou o limite de espera) antes de processar."""
+        loop = asyncio.get_running_loop()
+        ingestao = self.cfg.ingestao
+        while not parar.is_set():
+            limite = min(
+                self._ultimo_push + ingestao.debounce_s,
+                self._primeiro_push + ingestao.espera_maxima_s,
+            )
+            espera = limite - loop.time()
+            if espera <= 0:
+                return
+            try:
+                await asyncio.wait_for(parar.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    async def processar_pendencias(self) -> None:
+        """
+        Roda o pipeline uma vez com o catálogo atual (todas as pendências). Como
+        no daemon, a rodada é leve (diff, alertas e estado) até vencer
+        `artefatos_intervalo_s`: dashboard, Excel e site não são refeitos a
+        cada lote de pushes.
+        """
+        from .monitor import monitorar
+
+        lote, self.pendentes = self.pendentes, 0
+        self._tem_pendencia.clear()
+        produtos = list(self.catalogo.values())
+        artefatos = self.memoria.artefatos_vencidos(self.cfg.artefatos_intervalo_s)
+
+        logger.info(
+            "Processando %d push(es) com %d produtos (rodada %s).",
+            lote,
+            len(produtos),
+            "completa" if artefatos else "leve",
+        )
+        try:
+            await asyncio.to_thread(
+                monitorar, self.cfg, self.memoria, produtos=produtos, artefatos=artefatos
+            )
+        except Exception as e:
+            # Uma rodada com erro não derruba o servidor
+            logger.exception("Erro ao processar pushes: %s", e)
+        # Sem bot para indexar: os registros já foram anexados ao histórico
+        self.memoria.consumir_registros_novos()
+        self.rodadas += 1
+
+    async def executar(self, parar: asyncio.Event) -> None:
+        servidor = await asyncio.start_server(
+            self._atender, self.cfg.ingestao.host, self.cfg.ingestao.porta
+        )
+        enderecos = ", ".join(str(s.getsockname()) for s in servidor.sockets)
+        logger.info("Ingestão escutando em %s.", enderecos)
+
+        async with servidor:
+            while not parar.is_set():
+                espera_pendencia = asyncio.ensure_future(self._tem_pendencia.wait())
+                espera_parar = asyncio.ensure_future(parar.wait())
+                await asyncio.wait(
+                    (espera_pendencia, espera_parar), return_when=asyncio.FIRST_COMPLETED
+                )
+                espera_pendencia.cancel()
+                espera_parar.cancel()
+
+                if self.pendentes:
+                    await self._esperar_debounce(parar)
+                    await self.processar_pendencias()
+
+        # Pushes aceitos não se perdem no encerramento
+        if self.pendentes:
+            await self.processar_pendencias()
+        logger.info("Ingestão encerrada após %d rodadas.", self.rodadas)
+
+
+async def carregar_catalogo_inicial(
+    cfg: AppConfig, memoria: EstadoEmMemoria
+) -> list[ProdutoRegistro]:
+    """
+    Cardápio de partida, sobre o qual os eventos de item se aplicam: o da
+    fonte configurada ou, com ela fora do ar, o do último estado. Começar
+    vazio faria o primeiro evento rodar o pipeline só com os itens
+    empurrados, e o resto do estado viraria "desaparecido".
+    """
+    fonte = criar_fonte(cfg.fonte, cfg.data_path, cfg.cache_fontes_dir)
+    try:
+        return await fonte.carregar()
+    except Exception as e:
+        catalogo = registros_do_estado(memoria.estado)
+        logger.warning(
+            "Cardápio inicial indisponível (%s): partindo do último estado (%d itens).",
+            e,
+            len(catalogo),
+        )
+        return catalogo
+
+
+async def executar_ingestao(cfg: AppConfig, parar: asyncio.Event | None = None) -> ServidorIngestao:
+    """
+    Carrega estado/histórico (como o daemon) e o cardápio inicial da fonte
+    configurada, e atende pushes até SIGTERM/SIGINT (ou `parar`).
+    """
+    from .daemon import carregar_memoria
+
+    parar = parar or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, parar.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    memoria = await asyncio.to_thread(carregar_memoria, cfg)
+    memoria.consumir_registros_novos()
+
+    servidor = ServidorIngestao(cfg, memoria, await carregar_catalogo_inicial(cfg, memoria))
+    await servidor.executar(parar)
+    return servidor
+
+
+def rodar_ingestao(cfg: AppConfig) -> None:
+    asyncio.run(executar_ingestao(cfg))
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from .config import LogConfig
+
+
+# Etapa do pipeline em andamento (ver MetricasExecucao.etapa)
+ETAPA_ATUAL: contextvars.ContextVar[str] = contextvars.ContextVar("etapa_atual", default="")
+
+# Mensagens maiores que isso são cortadas antes de ir para a fila
+MAX_CARACTERES_MENSAGEM = 2000
+
+FORMATO_TEXTO = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener: logging.handlers.QueueListener | None = None
+_listener_ativo = False
+_handler_fila: logging.handlers.QueueHandler | None = None
+
+
+@contextmanager
+def etapa_de_log(nome: str) -> Iterator[None]:
+    """Marca os logs emitidos dentro do bloco com a etapa `nome`."""
+    token = ETAPA_ATUAL.set(nome)
+    try:
+        yield
+    finally:
+        ETAPA_ATUAL.reset(token)
+
+
+class FiltroEtapa(logging.Filter):
+    """
+    Anota cada registro com a etapa atual, aplica o nível mínimo configurado
+    para a etapa e resume mensagens grandes (o custo do log não cresce com o
+    tamanho do catálogo).
+    """
+
+    def __init__(self, niveis_etapas: dict[str, int], max_caracteres: int) -> None:
+        super().__init__()
+        self.niveis_etapas = niveis_etapas
+        self.max_caracteres = max_caracteres
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        etapa = ETAPA_ATUAL.get()
+        record.etapa = etapa
+        if record.levelno < self.niveis_etapas.get(etapa, logging.NOTSET):
+            return False
+
+        mensagem = record.getMessage()
+        if len(mensagem) > self.max_caracteres:
+            record.msg = (
+                f"{mensagem[: self.max_caracteres]}… "
+                f"(+{len(mensagem) - self.max_caracteres} caracteres)"
+            )
+            record.args = None
+        return True
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro (JSON lines)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "ts": self.formatTime(record),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "etapa": getattr(record, "etapa", ""),
+            "mensagem": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados["exc"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False)
+
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """
+    `QueueHandler` que preserva a exceção: o `prepare` padrão junta o
+    traceback à mensagem e apaga `exc_info`, então o formatador do outro
+    lado da fila nunca veria a exceção separada (o campo "exc" do JSON).
+    Aqui a mensagem vai só com os argumentos aplicados e o traceback segue
+    já formatado em `exc_text`.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _handler_arquivo(log_path: Path, cfg: LogConfig) -> logging.Handler:
+    if cfg.rotacao == "diaria":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_path, when="midnight", backupCount=cfg.backups, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        log_path, maxBytes=cfg.max_bytes, backupCount=cfg.backups, encoding="utf-8"
+    )
+
+
+def configurar_logging(log_path: str | Path, cfg: LogConfig) -> logging.handlers.QueueListener:
+    """
+    Logging sem bloquear o pipeline: o logger raiz só põe os registros numa
+    fila (`QueueHandler`) e uma thread (`QueueListener`) grava no arquivo
+    com rotação e no console.
+    """
+    global _listener, _listener_ativo, _handler_fila
+
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    formatador: logging.Formatter = (
+        FormatadorJSON() if cfg.formato == "json" else logging.Formatter(FORMATO_TEXTO)
+    )
+    arquivo = _handler_arquivo(log_path, cfg)
+    console = logging.StreamHandler()
+    for handler in (arquivo, console):
+        handler.setFormatter(formatador)
+
+    niveis = {
+        etapa: logging.getLevelName(nivel.upper())
+        for etapa, nivel in cfg.niveis_etapas.items()
+    }
+    niveis = {etapa: nivel for etapa, nivel in niveis.items() if isinstance(nivel, int)}
+
+    fila: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler_fila = HandlerFila(fila)
+    handler_fila.addFilter(FiltroEtapa(niveis, MAX_CARACTERES_MENSAGEM))
+
+    raiz = logging.getLogger()
+    if _listener is not None:
+        # Reconfiguração: termina de gravar a fila anterior e a substitui
+        _parar_listener()
+        raiz.removeHandler(_handler_fila)
+    raiz.setLevel(logging.getLevelName(cfg.nivel.upper()))
+    raiz.addHandler(handler_fila)
+
+    if _listener is None:
+        atexit.register(_parar_listener)
+    _listener = logging.handlers.QueueListener(fila, arquivo, console)
+    _listener.start()
+    _listener_ativo = True
+    _handler_fila = handler_fila
+
+    return _listener
+
+
+def _parar_listener() -> None:
+    # Esvazia a fila antes de sair do processo
+    global _listener_ativo
+
+    if _listener is not None and _listener_ativo:
+        _listener_ativo = False
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
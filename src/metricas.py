@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from .logs import etapa_de_log
+
+
+logger = logging.getLogger(__name__)
+
+# Quantas execuções manter no histórico de métricas (alimenta o painel do dashboard)
+LIMITE_HISTORICO_EXECUCOES = 500
+
+# Tipo da execução no histórico de métricas: as do atalho "nada mudou" e as
+# rodadas leves do daemon (sem artefatos) duram bem menos e ficam fora das
+# estatísticas de duração do dashboard
+EXECUCAO_COMPLETA = "completa"
+EXECUCAO_ATALHO = "atalho"
+EXECUCAO_LEVE = "leve"
+
+
+class MetricasExecucao:
+    """
+    Coleta tempos por etapa de uma execução do monitoramento.
+
+    Uso:
+        metricas = MetricasExecucao(timestamp)
+        with metricas.etapa("csv") as m:
+            produtos = carregar_produtos_csv(cfg)
+            m["registros"] = len(produtos)
+
+    Cada etapa vira um dict com "etapa", "duracao_s" e os extras
+    (tamanhos em bytes, quantidade de registros, etc.).
+    """
+
+    def __init__(self, timestamp: str) -> None:
+        self.timestamp = timestamp
+        self.etapas: list[dict[str, Any]] = []
+        self.totais: dict[str, Any] = {}
+        self._inicio = time.perf_counter()
+        self._duracao_total: float | None = None
+
+    @contextmanager
+    def etapa(self, nome: str, **extras: Any) -> Iterator[dict[str, Any]]:
+        info: dict[str, Any] = {"etapa": nome, **extras}
+        inicio = time.perf_counter()
+        try:
+            with etapa_de_log(nome):
+                yield info
+        finally:
+            info["duracao_s"] = round(time.perf_counter() - inicio, 6)
+            self.etapas.append(info)
+            logger.debug("Etapa %s concluída em %.3fs", nome, info["duracao_s"])
+
+    def registrar(self, **valores: Any) -> None:
+        """Registra contadores gerais da execução (total de produtos, etc.)."""
+        self.totais.update(valores)
+
+    def finalizar(self) -> dict[str, Any]:
+        """Fecha o cronômetro geral e devolve o resumo serializável."""
+        if self._duracao_total is None:
+            self._duracao_total = round(time.perf_counter() - self._inicio, 6)
+
+        return {
+            "timestamp": self.timestamp,
+            "duracao_total_s": self._duracao_total,
+            "totais": dict(self.totais),
+            "etapas": list(self.etapas),
+        }
+
+
+def tamanho_arquivo(path: str | Path) -> int:
+    """Tamanho do arquivo em bytes (0 se não existir)."""
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return 0
+
+
+def _gravar_atomico(path: Path, conteudo: str) -> None:
+    # Escreve num temporário e troca, para nenhum leitor ver arquivo pela metade
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(conteudo, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def salvar_metricas_json(resumo: dict[str, Any], path: str | Path) -> None:
+    """Grava as métricas da execução atual em JSON."""
+    try:
+        _gravar_atomico(Path(path), json.dumps(resumo, ensure_ascii=False, indent=2))
+        logger.info("Métricas da execução salvas em %s", path)
+    except Exception as e:
+        logger.exception("Erro ao salvar métricas em JSON: %s", e)
+
+
+def _escapar_label(valor: Any) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formatar_prometheus(resumo: dict[str, Any]) -> str:
+    """Converte o resumo da execução para o formato textfile do Prometheus."""
+    linhas = [
+        "# HELP ifood_monitor_execucao_duracao_segundos Duração total da execução.",
+        "# TYPE ifood_monitor_execucao_duracao_segundos gauge",
+        f"ifood_monitor_execucao_duracao_segundos {resumo['duracao_total_s']}",
+        "# HELP ifood_monitor_etapa_duracao_segundos Duração de cada etapa.",
+        "# TYPE ifood_monitor_etapa_duracao_segundos gauge",
+    ]
+
+    for etapa in resumo["etapas"]:
+        nome = _escapar_label(etapa["etapa"])
+        linhas.append(
+            f'ifood_monitor_etapa_duracao_segundos{{etapa="{nome}"}} {etapa["duracao_s"]}'
+        )
+
+    numericos = [
+        (etapa, chave, valor)
+        for etapa in resumo["etapas"]
+        for chave, valor in etapa.items()
+        if chave not in ("etapa", "duracao_s")
+        and isinstance(valor, (int, float))
+        and not isinstance(valor, bool)
+    ]
+    if numericos:
+        linhas.append("# HELP ifood_monitor_etapa_valor Tamanhos e contagens por etapa.")
+        linhas.append("# TYPE ifood_monitor_etapa_valor gauge")
+        for etapa, chave, valor in numericos:
+            linhas.append(
+                f'ifood_monitor_etapa_valor{{etapa="{_escapar_label(etapa["etapa"])}",'
+                f'medida="{_escapar_label(chave)}"}} {valor}'
+            )
+
+    for chave, valor in resumo["totais"].items():
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            linhas.append(f"# TYPE ifood_monitor_{chave} gauge")
+            linhas.append(f"ifood_monitor_{chave} {valor}")
+
+    return "\n".join(linhas) + "\n"
+
+
+def salvar_metricas_prometheus(resumo: dict[str, Any], path: str | Path) -> None:
+    """Grava as métricas no formato textfile (node_exporter)."""
+    try:
+        _gravar_atomico(Path(path), formatar_prometheus(resumo))
+        logger.info("Métricas Prometheus salvas em %s", path)
+    except Exception as e:
+        logger.exception("Erro ao salvar métricas Prometheus: %s", e)
+
+
+def carregar_historico_execucoes(path: str | Path) -> list[dict[str, Any]]:
+    """Carrega a lista de execuções anteriores (timestamp + duração por etapa)."""
+    p = Path(path)
+    if not p.exists():
+        return []
+
+    try:
+        with p.open(encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        logger.exception("Erro ao carregar histórico de execuções: %s", e)
+        return []
+
+
+def registrar_execucao(
+    path: str | Path,
+    resumo: dict[str, Any],
+    limite: int = LIMITE_HISTORICO_EXECUCOES,
+) -> list[dict[str, Any]]:
+    """
+    Acrescenta a execução atual ao histórico de execuções, guardando só as
+    durações (sem os extras) e mantendo no máximo `limite` entradas.
+    """
+    execucoes = carregar_historico_execucoes(path)
+    execucoes.append(
+        {
+            "timestamp": resumo["timestamp"],
+            "duracao_total_s": resumo["duracao_total_s"],
+            "tipo": resumo["totais"].get("tipo_execucao", EXECUCAO_COMPLETA),
+            "etapas": {e["etapa"]: e["duracao_s"] for e in resumo["etapas"]},
+        }
+    )
+    execucoes = execucoes[-limite:]
+
+    try:
+        _gravar_atomico(Path(path), json.dumps(execucoes, ensure_ascii=False, indent=2))
+    except Exception as e:
+        logger.exception("Erro ao salvar histórico de execuções: %s", e)
+
+    return execucoes
@@ -2,61 +2,66 @@ from __future__ import annotations
 
 import argparse
 import logging
+import time
+from collections import Counter
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
-
+from .agendador_github import PRIORIDADE_COSMETICA
 from .config import AppConfig, load_config
-from .dashboard_html import gerar_dashboard_html
-from .github_integration import baixar_arquivo_github, fazer_upload_github
-from .models import Produto, ResultadoMonitoramento
-from .relatorio_excel import gerar_relatorio_excel
+from .github_integration import (
+    baixar_arquivo_github,
+    baixar_conteudo_github,
+    fazer_upload_github,
+)
+from .identidade import id_do_estado, reconciliar_produtos
+from .metricas import (
+    EXECUCAO_ATALHO,
+    EXECUCAO_COMPLETA,
+    EXECUCAO_LEVE,
+    MetricasExecucao,
+    registrar_execucao,
+    salvar_metricas_json,
+    salvar_metricas_prometheus,
+    tamanho_arquivo,
+)
+from .precos import detectar_mudancas_preco, normalizar_precos
+from .quedas import LOJA_FORA, carregar_estatisticas, detectar_quedas, salvar_estatisticas
+from .registros import ProdutoRegistro, novo_registro
+from .resumo import agregar_execucao
 from .state import (
+    EstadoEmMemoria,
+    anexar_execucao_historico,
     atualizar_historico,
+    calcular_impressao,
     carregar_estado_anterior,
     carregar_historico,
+    carregar_impressao,
+    registrar_heartbeat,
     salvar_estado_atual,
+    salvar_impressao,
 )
-from .telegram_client import enviar_alerta_telegram
+from .telegram_client import drenar_outbox_telegram, enviar_alerta_telegram
 from .utils import horario_brasil, setup_logging
 
+if TYPE_CHECKING:
+    from .models import ResultadoMonitoramento
+
+# pandas e pydantic pesam centenas de ms no import: são carregados só nas
+# etapas que precisam deles, para que modos rápidos (status, drenar_outbox)
+# iniciem sem esse custo. O mesmo vale para os módulos usados só pelo
+# pipeline (dashboard, séries, fontes, visão de lojas...), importados dentro
+# de `monitorar`. Orçamento medido em benchmarks/startup.py.
 
-def carregar_produtos_csv(cfg: AppConfig) -> list[dict]:
+
+def carregar_produtos_csv(cfg: AppConfig) -> list[ProdutoRegistro]:
     """Carrega os produtos a partir do CSV configurado."""
+    from .fontes import ler_produtos_csv
+
     logger = logging.getLogger(__name__)
 
     try:
-        # Caminho do CSV configurado
-        df = pd.read_csv(cfg.data_path)
-
-        # Normaliza nomes de colunas para minúsculo e sem espaços extras
-        df.columns = [c.strip().lower() for c in df.columns]
-
-        # Mapeia nomes antigos para o padrão novo
-        if "produto" in df.columns and "nome" not in df.columns:
-            df = df.rename(columns={"produto": "nome"})
-
-        if "seção" in df.columns and "secao" not in df.columns:
-            df = df.rename(columns={"seção": "secao"})
-
-        colunas_esperadas = {"secao", "nome", "preco", "descricao", "status"}
-        faltando = colunas_esperadas - set(df.columns)
-
-        if faltando:
-            raise ValueError(f"Colunas obrigatórias ausentes no CSV: {faltando}")
-
-        produtos: list[dict] = []
-        for _, row in df.iterrows():
-            produtos.append(
-                {
-                    "secao": row["secao"],
-                    "nome": row["nome"],
-                    "preco": row["preco"],
-                    "descricao": row.get("descricao", ""),
-                    "status": row["status"],
-                }
-            )
-
+        produtos = ler_produtos_csv(cfg.data_path)
         logger.info("CSV carregado com %d produtos.", len(produtos))
         return produtos
 
@@ -65,77 +70,226 @@ def carregar_produtos_csv(cfg: AppConfig) -> list[dict]:
         raise
 
 
+def carregar_produtos(cfg: AppConfig) -> list[ProdutoRegistro]:
+    """
+    Carrega os produtos da fonte configurada (FONTE_CARDAPIO). Sem fonte
+    configurada, lê o CSV padrão direto.
+    """
+    if not cfg.fonte:
+        return carregar_produtos_csv(cfg)
+
+    from .fontes import carregar_fonte, criar_fonte
+
+    logger = logging.getLogger(__name__)
+    fonte = criar_fonte(cfg.fonte, cfg.data_path, cfg.cache_fontes_dir)
+
+    try:
+        produtos = carregar_fonte(fonte)
+        logger.info("%s carregado com %d produtos.", fonte.descricao(), len(produtos))
+        return produtos
+
+    except Exception as e:
+        logger.exception("Erro ao carregar produtos de %s: %s", fonte.descricao(), e)
+        raise
+
+
 def comparar_com_estado_anterior(
-    produtos_atual: list[dict],
+    produtos_atual: list[ProdutoRegistro],
     estado_anterior: dict,
     timestamp_atual: str,
-):
+) -> tuple[list[ProdutoRegistro], list[ProdutoRegistro]]:
     """
-    Compara o estado atual (lista de dicts) com o estado anterior (dict carregado do JSON).
+    Compara o estado atual (lista de registros) com o estado anterior (dict carregado do JSON).
 
-    - produtos_atual: lista de dicts com chaves: secao, nome, preco, descricao, status
+    - produtos_atual: lista de `ProdutoRegistro`
     - estado_anterior: dict no formato { "Seção|Produto": { ...info... } }
     """
 
-    # Mapa do estado atual: "Secao|Nome" -> dict do produto
-    atuais = {
-        f"{p['secao']}|{p['nome']}": p
-        for p in produtos_atual
-    }
-
-    produtos_off: list[dict] = []
-    produtos_desaparecidos: list[dict] = []
+    # Mapa do estado atual: "Secao|Nome" -> registro do produto
+    atuais = {p.chave: p for p in produtos_atual}
 
     # 1) Produtos OFF no estado atual (status != "ON")
-    for chave, p in atuais.items():
-        if str(p.get("status", "")).upper() != "ON":
-            produtos_off.append(
-                {
-                    "secao": p["secao"],
-                    "nome": p["nome"],
-                    "preco": p.get("preco", ""),
-                    "descricao": p.get("descricao", ""),
-                    "status": p.get("status", "DESCONHECIDO"),
-                }
-            )
+    produtos_off = [p for p in atuais.values() if p.status.upper() != "ON"]
 
     # 2) Produtos que existiam antes e não existem mais no CSV atual → "desaparecidos"
+    produtos_desaparecidos: list[ProdutoRegistro] = []
     for chave, info in estado_anterior.items():
         if chave not in atuais:
             secao, nome = chave.split("|", 1)
-            produtos_desaparecidos.append(
-                {
-                    "secao": secao,
-                    "nome": nome,
-                    "preco": info.get("Preço", "N/A"),
-                    "descricao": info.get("Descrição", ""),
-                    "status": "OFF (Desapareceu)",
-                    "ultima_verificacao": info.get("Última verificação", timestamp_atual),
-                }
+            registro = novo_registro(
+                secao,
+                nome,
+                info.get("Preço", "N/A"),
+                info.get("Descrição", ""),
+                "OFF (Desapareceu)",
+                info.get("Última verificação", timestamp_atual),
             )
+            registro.id_produto = id_do_estado(chave, info)
+            produtos_desaparecidos.append(registro)
 
     return produtos_off, produtos_desaparecidos
 
 
-def monitorar(cfg: AppConfig) -> ResultadoMonitoramento:
-    """Pipeline completo de monitoramento a partir do CSV."""
+def monitorar(
+    cfg: AppConfig,
+    memoria: EstadoEmMemoria | None = None,
+    forcar: bool = False,
+    produtos: list[ProdutoRegistro] | None = None,
+    artefatos: bool = True,
+) -> ResultadoMonitoramento:
+    """
+    Pipeline completo de monitoramento a partir do CSV.
+
+    Com `memoria` (modo daemon), o estado e os agregados do histórico vêm da
+    memória em vez de serem baixados/lidos do disco, os registros novos só
+    são anexados ao arquivo do histórico e `memoria` é atualizada ao final.
+    Com `memoria` e `artefatos=False` a rodada é leve: comparação, estado,
+    histórico local e alerta, sem reler o histórico nem gerar dashboard,
+    Excel, séries ou enviar o histórico inteiro ao GitHub.
+
+    Se a entrada for idêntica à da última execução completa (mesma impressão
+    digital), só registra um heartbeat e retorna, a menos que `forcar=True`.
+
+    Com `produtos` (modo ingestão), o cardápio já vem pronto e a fonte
+    configurada não é lida.
+    """
+    from .dashboard_html import gerar_dashboard_html
+    from .disponibilidade import calcular_disponibilidade, interpretar_janelas
+    from .models import Produto, ResultadoMonitoramento
+    from .painel_telegram import atualizar_painel_telegram
+    from .relatorio_excel import gerar_relatorio_excel
+    from .series import calcular_series
+    from .validacao import verificar_qualidade
+    from .visao_lojas import montar_resumo_loja, publicar_loja
+
+    artefatos = artefatos or memoria is None
+
     inicio = horario_brasil()
     logging.info("Iniciando monitoramento (CSV) em %s", inicio)
     timestamp_atual = inicio.strftime("%Y-%m-%d %H:%M:%S")
+    metricas = MetricasExecucao(timestamp_atual)
+
+    if memoria is None:
+        # Tenta baixar estado antigo do GitHub (o histórico só se for preciso)
+        with metricas.etapa("download_estado") as m:
+            # Estado vai direto (bytes) para o parser; o disco é só cache
+            conteudo_estado = baixar_conteudo_github(
+                cfg.github, cfg.estado_path.name, cache=cfg.estado_path
+            )
+            baixar_arquivo_github(cfg.github, cfg.impressao_path)
+            m["bytes_estado"] = (
+                len(conteudo_estado)
+                if conteudo_estado is not None
+                else tamanho_arquivo(cfg.estado_path)
+            )
+
+    with metricas.etapa("carregar_produtos") as m:
+        if produtos is not None:
+            produtos_atual = produtos
+        else:
+            produtos_atual = carregar_produtos(cfg)
+            if not cfg.fonte:
+                m["bytes"] = tamanho_arquivo(cfg.data_path)
+        m["registros"] = len(produtos_atual)
+
+    # Atalho: entrada igual à da última execução completa → só heartbeat
+    with metricas.etapa("impressao") as m:
+        impressao_anterior = carregar_impressao(cfg.impressao_path)
+        impressao = calcular_impressao(produtos_atual)
+        inalterado = (
+            impressao == impressao_anterior.get("impressao")
+            and (memoria is not None or cfg.estado_path.exists())
+            # Rodadas leves anteriores deixaram dashboard/Excel para trás
+            and not (artefatos and impressao_anterior.get("artefatos_pendentes"))
+        )
+        m["inalterado"] = inalterado
+
+    if inalterado and not forcar:
+        registrar_heartbeat(cfg.impressao_path, impressao_anterior, timestamp_atual)
+        if memoria is not None:
+            memoria.execucoes += 1
+        fazer_upload_github(cfg.github, cfg.impressao_path)
+
+        produtos_off = [p for p in produtos_atual if p.status.upper() != "ON"]
+        _publicar_site(cfg, metricas)
+        metricas.registrar(
+            tipo_execucao=EXECUCAO_ATALHO,
+            atalho_inalterado=1,
+            produtos_total=len(produtos_atual),
+            produtos_off=len(produtos_off),
+        )
+        _exportar_metricas(cfg, metricas)
+
+        return ResultadoMonitoramento.model_construct(
+            total_produtos=len(produtos_atual),
+            produtos_off=[Produto.model_construct(**p.como_dict()) for p in produtos_off],
+            produtos_desaparecidos=[],
+            total_produtos_ativos=len(produtos_atual) - len(produtos_off),
+            timestamp=timestamp_atual,
+        )
+
+    if memoria is None:
+        with metricas.etapa("carregar_estado") as m:
+            estado_anterior = carregar_estado_anterior(cfg.estado_path, conteudo_estado)
+            del conteudo_estado
+            m["registros"] = len(estado_anterior)
+    else:
+        estado_anterior = memoria.estado
+
+    # Validação em lote logo após a ingestão (para antes de gravar qualquer coisa)
+    with metricas.etapa("validar") as m:
+        qualidade = verificar_qualidade(produtos_atual, confiavel=not cfg.validar_entrada)
+        m["validado"] = qualidade.validado
+        m["sem_preco"] = len(qualidade.sem_preco)
+        m["duplicados"] = len(qualidade.duplicados)
+
+    with metricas.etapa("normalizar_precos") as m:
+        normalizar_precos(produtos_atual)
+        m["sem_valor"] = sum(1 for p in produtos_atual if p.preco_centavos is None)
+
+    # Renomeados / movidos de seção mantêm o ID e não viram "desaparecido + novo"
+    with metricas.etapa("reconciliar") as m:
+        estado_anterior, correspondencias = reconciliar_produtos(
+            produtos_atual, estado_anterior, timestamp_atual
+        )
+        m["reconciliados"] = len(correspondencias)
+
+    for c in correspondencias:
+        logging.info(
+            "Produto reconhecido: %s → %s (similaridade %.1f, ID %s)",
+            c.chave_anterior,
+            c.chave_atual,
+            c.similaridade,
+            c.id_produto,
+        )
 
-    # Tenta baixar estado / histórico antigos do GitHub
-    baixar_arquivo_github(cfg.github, cfg.estado_path)
-    baixar_arquivo_github(cfg.github, cfg.historico_path)
+    with metricas.etapa("comparar") as m:
+        produtos_off, produtos_desaparecidos = comparar_com_estado_anterior(
+            produtos_atual,
+            estado_anterior,
+            timestamp_atual,
+        )
+        m["off"] = len(produtos_off)
+        m["desaparecidos"] = len(produtos_desaparecidos)
 
-    estado_anterior = carregar_estado_anterior(cfg.estado_path)
+    with metricas.etapa("mudancas_preco") as m:
+        normalizar_precos(produtos_desaparecidos)
+        mudancas_preco = detectar_mudancas_preco(produtos_atual, estado_anterior)
+        m["mudancas"] = len(mudancas_preco)
 
-    produtos_atual = carregar_produtos_csv(cfg)
+    if mudancas_preco:
+        logging.info("%d mudanças de preço detectadas.", len(mudancas_preco))
 
-    produtos_off, produtos_desaparecidos = comparar_com_estado_anterior(
-        produtos_atual,
-        estado_anterior,
-        timestamp_atual,
-    )
+    # Queda da loja / de seções inteiras vs. itens isolados (EWMA por seção)
+    with metricas.etapa("quedas") as m:
+        if memoria is None:
+            baixar_arquivo_github(cfg.github, cfg.estatisticas_off_path)
+        estatisticas_off = carregar_estatisticas(cfg.estatisticas_off_path)
+        quedas = detectar_quedas(produtos_atual + produtos_desaparecidos, estatisticas_off)
+        m["secoes_fora"] = len(quedas.secoes)
+
+    if quedas.secoes or quedas.tipo == LOJA_FORA:
+        logging.warning("Quedas detectadas (%s): %s", quedas.tipo, quedas.alerta())
 
     if produtos_desaparecidos:
         logging.warning(
@@ -146,20 +300,71 @@ def monitorar(cfg: AppConfig) -> ResultadoMonitoramento:
         logging.info("Nenhum produto desapareceu em relação ao estado anterior.")
 
     # Salvar novo estado
-    salvar_estado_atual(cfg.estado_path, produtos_atual)
-    fazer_upload_github(cfg.github, cfg.estado_path, cfg.estado_path)
+    with metricas.etapa("salvar_estado") as m:
+        novo_estado = salvar_estado_atual(cfg.estado_path, produtos_atual)
+        m["bytes"] = tamanho_arquivo(cfg.estado_path)
+
+    with metricas.etapa("upload_estado"):
+        fazer_upload_github(cfg.github, cfg.estado_path)
 
     # Atualizar histórico
-    historico = carregar_historico(cfg.historico_path)
-    historico = atualizar_historico(
-        cfg.historico_path, historico, produtos_atual, produtos_desaparecidos
-    )
-    fazer_upload_github(cfg.github, cfg.historico_path, cfg.historico_path)
+    conteudo_historico: bytes | None = None
+    if memoria is None:
+        with metricas.etapa("download_historico") as m:
+            conteudo_historico = baixar_conteudo_github(
+                cfg.github, cfg.historico_path.name, cache=cfg.historico_path
+            )
+            m["bytes"] = (
+                len(conteudo_historico)
+                if conteudo_historico is not None
+                else tamanho_arquivo(cfg.historico_path)
+            )
 
-    # Dashboard + Excel
-    gerar_dashboard_html(historico, cfg)
-    gerar_relatorio_excel(produtos_atual, produtos_desaparecidos, cfg.excel_output)
-    fazer_upload_github(cfg.github, cfg.excel_output, cfg.excel_output)
+    historico: list[dict] = []
+    with metricas.etapa("historico") as m:
+        if memoria is None:
+            historico = carregar_historico(cfg.historico_path, conteudo_historico)
+            del conteudo_historico
+            historico = atualizar_historico(
+                cfg.historico_path, historico, produtos_atual, produtos_desaparecidos
+            )
+            total_historico = len(historico)
+        else:
+            # Só os registros novos: anexados ao arquivo e somados aos agregados
+            novos = anexar_execucao_historico(
+                cfg.historico_path, produtos_atual, produtos_desaparecidos
+            )
+            memoria.agregados.atualizar(novos)
+            memoria.registros_novos.extend(novos)
+            total_historico = memoria.agregados.total_registros
+            m["novos"] = len(novos)
+        m["registros"] = total_historico
+        m["bytes"] = tamanho_arquivo(cfg.historico_path)
+
+    disponibilidade = []
+    series = None
+    if artefatos:
+        if memoria is not None:
+            # A API de conteúdo do GitHub não anexa: o histórico inteiro vai
+            # só nas rodadas com artefatos, relido do arquivo local
+            with metricas.etapa("carregar_historico") as m:
+                historico = carregar_historico(cfg.historico_path)
+                m["registros"] = len(historico)
+
+        with metricas.etapa("upload_historico"):
+            fazer_upload_github(cfg.github, cfg.historico_path)
+
+        with metricas.etapa("disponibilidade") as m:
+            disponibilidade = calcular_disponibilidade(
+                historico, interpretar_janelas(cfg.janelas_disponibilidade)
+            )
+            m["janelas"] = len(disponibilidade)
+
+        with metricas.etapa("series") as m:
+            series = calcular_series(
+                historico, cfg.series_max_pontos, cfg.series_max_pontos // 4
+            )
+            m["execucoes"] = series.execucoes if series is not None else 0
 
     total_produtos = len(produtos_atual)
     total_off = len(produtos_off) + len(produtos_desaparecidos)
@@ -171,45 +376,325 @@ def monitorar(cfg: AppConfig) -> ResultadoMonitoramento:
     else:
         msg = "✅ Todos os produtos estão ON e nenhum desapareceu!"
 
-    enviar_alerta_telegram(
-        cfg,
-        msg,
-        produtos_off,
-        produtos_desaparecidos,
-        total_ativos,
-        produtos_atual + produtos_desaparecidos,
-    )
+    # Contagens por seção/status calculadas uma vez para os três artefatos
+    with metricas.etapa("resumo") as m:
+        resumo = agregar_execucao(
+            produtos_atual,
+            produtos_desaparecidos,
+            memoria.agregados if memoria is not None else historico,
+            timestamp_atual,
+        )
+        m["secoes"] = len(resumo.secoes)
 
-    resultado = ResultadoMonitoramento(
+    def gerar_dashboard() -> None:
+        with metricas.etapa("dashboard") as m:
+            gerar_dashboard_html(
+                historico, cfg, mudancas_preco, disponibilidade, resumo, series
+            )
+            m["bytes"] = tamanho_arquivo(cfg.dashboard_output)
+
+    def gerar_excel() -> None:
+        with metricas.etapa("excel") as m:
+            gerar_relatorio_excel(
+                produtos_atual,
+                produtos_desaparecidos,
+                cfg.excel_output,
+                disponibilidade,
+                resumo,
+            )
+            m["bytes"] = tamanho_arquivo(cfg.excel_output)
+
+        with metricas.etapa("upload_excel"):
+            fazer_upload_github(cfg.github, cfg.excel_output, prioridade=PRIORIDADE_COSMETICA)
+
+    def enviar_telegram() -> None:
+        if cfg.telegram.modo == "painel":
+            with metricas.etapa("telegram_painel"):
+                if memoria is None:
+                    baixar_arquivo_github(cfg.github, cfg.painel_path)
+                if atualizar_painel_telegram(
+                    cfg, produtos_off, produtos_desaparecidos, total_ativos, resumo, quedas
+                ):
+                    fazer_upload_github(cfg.github, cfg.painel_path)
+            return
+
+        with metricas.etapa("telegram"):
+            enviar_alerta_telegram(
+                cfg,
+                msg,
+                produtos_off,
+                produtos_desaparecidos,
+                total_ativos,
+                resumo,
+                mudancas_preco,
+                quedas,
+            )
+
+    # Dashboard, Excel e Telegram só leem dados prontos: rodam em paralelo
+    # (na rodada leve, só o Telegram)
+    with metricas.etapa("artefatos"):
+        if not artefatos:
+            enviar_telegram()
+        elif cfg.renderizacao == "sequencial":
+            gerar_dashboard()
+            gerar_excel()
+            enviar_telegram()
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                tarefas = [
+                    pool.submit(gerar_dashboard),
+                    pool.submit(gerar_excel),
+                    pool.submit(enviar_telegram),
+                ]
+                for tarefa in tarefas:
+                    tarefa.result()
+
+    if artefatos:
+        # Resumo pequeno da loja para a visão geral de várias lojas
+        with metricas.etapa("resumo_loja"):
+            publicar_loja(cfg, montar_resumo_loja(cfg.loja, resumo, quedas, disponibilidade))
+
+        _publicar_site(cfg, metricas)
+
+    # Os registros já vêm normalizados da ingestão: monta o resultado sem
+    # revalidar produto por produto
+    resultado = ResultadoMonitoramento.model_construct(
         total_produtos=total_produtos,
-        produtos_off=produtos_off,
-        produtos_desaparecidos=produtos_desaparecidos,
+        produtos_off=[Produto.model_construct(**p.como_dict()) for p in produtos_off],
+        produtos_desaparecidos=[
+            Produto.model_construct(**p.como_dict()) for p in produtos_desaparecidos
+        ],
         total_produtos_ativos=total_ativos,
         timestamp=timestamp_atual,
     )
 
-    logging.info("Monitoramento concluído: %s", resultado.model_dump())
+    metricas.registrar(
+        tipo_execucao=EXECUCAO_COMPLETA if artefatos else EXECUCAO_LEVE,
+        produtos_total=total_produtos,
+        produtos_off=len(produtos_off),
+        produtos_desaparecidos=len(produtos_desaparecidos),
+        historico_registros=total_historico,
+    )
+    _exportar_metricas(cfg, metricas)
+
+    # Estatísticas de OFF e impressão digital por último: se algo acima falhar
+    # (ou o job estourar o tempo), a próxima execução não pega o atalho e
+    # refaz histórico, artefatos e alerta, sem somar esta execução duas vezes
+    # na EWMA
+    salvar_estatisticas(cfg.estatisticas_off_path, estatisticas_off, timestamp_atual)
+    fazer_upload_github(cfg.github, cfg.estatisticas_off_path)
+    salvar_impressao(
+        cfg.impressao_path, impressao, timestamp_atual, artefatos_pendentes=not artefatos
+    )
+    fazer_upload_github(cfg.github, cfg.impressao_path)
+
+    if memoria is not None:
+        memoria.estado = novo_estado
+        memoria.execucoes += 1
+        if artefatos:
+            memoria.artefatos_em = time.monotonic()
+
+    # Só contagens: a lista de OFF já está no estado/histórico/Excel
+    logging.info(
+        "Monitoramento concluído: %d produtos, %d ativos, %d OFF, %d desaparecidos.",
+        total_produtos,
+        total_ativos,
+        len(produtos_off),
+        len(produtos_desaparecidos),
+    )
     return resultado
 
 
+def _publicar_site(cfg: AppConfig, metricas: MetricasExecucao) -> None:
+    """Atualiza a pasta do GitHub Pages (só os arquivos que mudaram)."""
+    from .publicacao import publicar_site
+
+    if not cfg.dashboard_output.exists():
+        logging.warning("Dashboard %s não existe. Site não publicado.", cfg.dashboard_output)
+        return
+
+    with metricas.etapa("publicar") as m:
+        try:
+            publicacao = publicar_site(cfg.dashboard_output, cfg.site_dir, cfg.site_dados)
+        except ValueError as e:
+            logging.error("Site não publicado: %s", e)
+            return
+        m["gravados"] = len(publicacao.gravados)
+        m["removidos"] = len(publicacao.removidos)
+
+
+def _exportar_metricas(cfg: AppConfig, metricas: MetricasExecucao) -> None:
+    """Grava as métricas da execução (JSON, histórico curto e Prometheus opcional)."""
+    resumo = metricas.finalizar()
+
+    salvar_metricas_json(resumo, cfg.metricas_path)
+    registrar_execucao(cfg.historico_execucoes_path, resumo)
+    if cfg.prometheus_path:
+        salvar_metricas_prometheus(resumo, cfg.prometheus_path)
+
+    # O histórico de execuções alimenta o painel de duração do dashboard
+    fazer_upload_github(
+        cfg.github, cfg.historico_execucoes_path, prioridade=PRIORIDADE_COSMETICA
+    )
+
+    logging.info(
+        "Execução levou %.2fs (%s)",
+        resumo["duracao_total_s"],
+        ", ".join(f"{e['etapa']}={e['duracao_s']:.2f}s" for e in resumo["etapas"]),
+    )
+
+
+def exibir_status(cfg: AppConfig) -> dict[str, int]:
+    """
+    Mostra o resumo do último estado salvo (ON/OFF por seção), sem rodar o
+    pipeline nem carregar pandas/pydantic.
+    """
+    estado = carregar_estado_anterior(cfg.estado_path)
+
+    contagem: Counter[str] = Counter()
+    por_secao: dict[str, Counter[str]] = {}
+    ultima = ""
+    for info in estado.values():
+        status = "ON" if str(info.get("Status", "")).upper() == "ON" else "OFF"
+        contagem[status] += 1
+        por_secao.setdefault(info.get("Seção", "(sem seção)"), Counter())[status] += 1
+        ultima = max(ultima, str(info.get("Última verificação", "")))
+
+    print(f"Última verificação: {ultima or '-'}")
+    print(f"Produtos: {len(estado)} | ON: {contagem['ON']} | OFF: {contagem['OFF']}")
+    for secao in sorted(por_secao):
+        c = por_secao[secao]
+        print(f"- {secao}: {c['ON']} ON | {c['OFF']} OFF")
+
+    return dict(contagem)
+
+
 def main() -> None:
     cfg = load_config()
-    setup_logging(cfg.log_path)
+    setup_logging(cfg.log_path, cfg.log)
 
     parser = argparse.ArgumentParser(
         description="Monitoramento de produtos iFood (demo com CSV)."
     )
     parser.add_argument(
         "--modo",
-        choices=["monitorar"],
+        choices=[
+            "monitorar",
+            "status",
+            "drenar_outbox",
+            "daemon",
+            "bot",
+            "ingestao",
+            "reprocessar",
+            "lojas",
+            "enfileirar",
+            "worker",
+        ],
         default="monitorar",
-        help="Ação a executar (por enquanto só 'monitorar').",
+        help=(
+            "Ação a executar: 'monitorar' (pipeline completo), 'status' "
+            "(resumo do último estado), 'drenar_outbox' (reenvia alertas pendentes), "
+            "'daemon' (processo contínuo com agenda interna 11h-23h BRT), "
+            "'bot' (responde /status, /secao, /off e /historico no Telegram), "
+            "'ingestao' (servidor HTTP que recebe cardápios/eventos por push), "
+            "'reprocessar' (reconstrói histórico/estado de uma pasta de CSVs), "
+            "'lojas' (regenera a visão geral das lojas em LOJAS_DIR), "
+            "'enfileirar' (põe as lojas de --lojas na fila) "
+            "ou 'worker' (executa as lojas da fila)."
+        ),
+    )
+    parser.add_argument(
+        "--forcar",
+        action="store_true",
+        help="Executa o pipeline completo mesmo se a entrada não mudou.",
+    )
+    parser.add_argument(
+        "--imediato",
+        action="store_true",
+        help="No modo daemon, executa uma vez logo ao iniciar.",
+    )
+    parser.add_argument(
+        "--com-bot",
+        action="store_true",
+        help="No modo daemon, atende também os comandos do bot do Telegram.",
+    )
+    parser.add_argument(
+        "--fonte-confiavel",
+        action="store_true",
+        help="Pula a validação em lote da entrada (mesmo efeito de VALIDAR_ENTRADA=0).",
+    )
+    parser.add_argument(
+        "--snapshots",
+        type=Path,
+        help="No modo reprocessar, pasta com os CSVs datados (data/hora no nome).",
+    )
+    parser.add_argument(
+        "--saida",
+        type=Path,
+        help=(
+            "No modo reprocessar, pasta onde gravar histórico e estado "
+            "(padrão: substitui os arquivos do projeto)."
+        ),
+    )
+    parser.add_argument(
+        "--lojas",
+        type=Path,
+        help="No modo enfileirar, JSON ou CSV com as colunas loja e fonte.",
+    )
+    parser.add_argument(
+        "--ate-esvaziar",
+        action="store_true",
+        help="No modo worker, sai quando a fila não tem mais tarefas.",
     )
 
     args = parser.parse_args()
+    if args.fonte_confiavel:
+        cfg.validar_entrada = False
 
     if args.modo == "monitorar":
-        monitorar(cfg)
+        monitorar(cfg, forcar=args.forcar)
+    elif args.modo == "status":
+        exibir_status(cfg)
+    elif args.modo == "drenar_outbox":
+        drenar_outbox_telegram(cfg)
+    elif args.modo == "daemon":
+        from .daemon import rodar_daemon
+
+        rodar_daemon(cfg, imediato=args.imediato, com_bot=args.com_bot)
+    elif args.modo == "bot":
+        from .bot_comandos import rodar_bot
+
+        rodar_bot(cfg)
+    elif args.modo == "ingestao":
+        from .ingestao import rodar_ingestao
+
+        rodar_ingestao(cfg)
+    elif args.modo == "reprocessar":
+        from .reprocessar import reprocessar_snapshots
+
+        if args.snapshots is None:
+            parser.error("--modo reprocessar exige --snapshots <pasta>")
+        reprocessar_snapshots(cfg, args.snapshots, saida=args.saida)
+    elif args.modo == "lojas":
+        from .visao_lojas import gerar_visao_lojas
+
+        if cfg.lojas_dir is None:
+            parser.error("--modo lojas exige a variável LOJAS_DIR")
+        gerar_visao_lojas(cfg.lojas_dir)
+    elif args.modo == "enfileirar":
+        from .fila import enfileirar_lojas
+
+        if args.lojas is None:
+            parser.error("--modo enfileirar exige --lojas <arquivo>")
+        enfileirar_lojas(cfg, args.lojas)
+    elif args.modo == "worker":
+        from .fila import rodar_worker
+
+        if cfg.lojas_dir is None:
+            parser.error("--modo worker exige a variável LOJAS_DIR")
+        rodar_worker(cfg, ate_esvaziar=args.ate_esvaziar)
 
 
 if __name__ == "__main__":
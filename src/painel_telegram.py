@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .config import AppConfig
+from .quedas import LOJA_FORA, ClassificacaoQuedas
+from .registros import ProdutoRegistro
+from .resumo import ResumoExecucao
+from .telegram_client import entregar_ou_guardar, montar_resumo_status_por_secao, url_api_telegram
+from .utils import horario_brasil
+
+
+logger = logging.getLogger(__name__)
+
+MAX_LISTAR_PAINEL = 15
+MAX_LISTAR_OCORRENCIAS = 10
+
+# Limite de texto de uma mensagem na Bot API
+LIMITE_TEXTO = 4096
+
+# Erros do editMessageText em que a mensagem fixada não serve mais (apagada,
+# antiga demais): só nesses casos um painel novo é criado e fixado
+ERROS_PAINEL_PERDIDO = (
+    "message to edit not found",
+    "message can't be edited",
+    "message_id_invalid",
+)
+
+
+@dataclass
+class EstadoPainel:
+    """O que foi publicado por último num chat (sidecar `painel_telegram.json`)."""
+
+    message_id: int | None = None
+    hash_conteudo: str = ""
+    atualizado_em: str = ""
+    # Ocorrências já avisadas: IDs de produtos OFF, seções fora, loja fora
+    problemas: list[str] = field(default_factory=list)
+    secoes_fora: list[str] = field(default_factory=list)
+    loja_fora: bool = False
+
+
+def carregar_paineis(path: str | Path) -> dict[str, EstadoPainel]:
+    p = Path(path)
+    if not p.exists():
+        return {}
+    try:
+        with p.open(encoding="utf-8") as f:
+            data = json.load(f)
+        return {chat: EstadoPainel(**e) for chat, e in data.items()}
+    except Exception as e:
+        logger.warning("Painel do Telegram inválido (%s). Uma nova mensagem será criada.", e)
+        return {}
+
+
+def salvar_paineis(path: str | Path, paineis: dict[str, EstadoPainel]) -> None:
+    with Path(path).open("w", encoding="utf-8") as f:
+        json.dump(
+            {chat: asdict(e) for chat, e in sorted(paineis.items())},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+
+def _identificador(p: ProdutoRegistro) -> str:
+    return p.id_produto or p.chave
+
+
+def montar_conteudo_painel(
+    produtos_off: list[ProdutoRegistro],
+    produtos_desaparecidos: list[ProdutoRegistro],
+    total_ativos: int,
+    resumo: ResumoExecucao,
+    quedas: ClassificacaoQuedas | None = None,
+) -> str:
+    """
+    Corpo do painel, sem data/hora: só muda quando o status muda, e é esse
+    texto que decide se a mensagem precisa ser editada.
+    """
+    linhas = ["📌 Status ao vivo – Monitoramento iFood", ""]
+
+    if quedas is not None and (quedas.secoes or quedas.tipo == LOJA_FORA):
+        linhas.extend([quedas.alerta(), ""])
+
+    linhas.append(
+        f"🟢 {total_ativos} ON | 🔴 {len(produtos_off)} OFF | "
+        f"⚪ {len(produtos_desaparecidos)} desaparecidos"
+    )
+
+    destaque = produtos_off + produtos_desaparecidos
+    if destaque:
+        linhas.append("")
+        linhas.append(f"⚠️ Fora do ar ({len(destaque)}):")
+        for p in destaque[:MAX_LISTAR_PAINEL]:
+            linhas.append(f"- {p.secao} – {p.nome}")
+        if len(destaque) > MAX_LISTAR_PAINEL:
+            linhas.append(f"... e mais {len(destaque) - MAX_LISTAR_PAINEL} produtos")
+
+    linhas.extend(["", montar_resumo_status_por_secao(resumo)])
+    return "\n".join(linhas)
+
+
+def _montar_ocorrencias(
+    anterior: EstadoPainel,
+    produtos_off: list[ProdutoRegistro],
+    produtos_desaparecidos: list[ProdutoRegistro],
+    quedas: ClassificacaoQuedas | None,
+) -> str | None:
+    """Mensagem avulsa com o que ficou fora do ar desde o último painel (ou None)."""
+    loja_fora = quedas is not None and quedas.tipo == LOJA_FORA
+    if loja_fora:
+        return None if anterior.loja_fora else quedas.alerta()
+
+    linhas: list[str] = []
+
+    secoes = quedas.secoes if quedas is not None else []
+    secoes_novas = [q for q in secoes if q.secao not in anterior.secoes_fora]
+    if secoes_novas:
+        linhas.append(f"⛔ {len(secoes_novas)} seção(ões) saíram do ar:")
+        linhas.extend(f"- {q.secao}: {q.off}/{q.total} OFF" for q in secoes_novas)
+
+    # Produtos das seções em queda já estão no painel/linha acima
+    candidatos = quedas.isolados if quedas is not None else produtos_off + produtos_desaparecidos
+    ja_avisados = set(anterior.problemas)
+    novos = [p for p in candidatos if _identificador(p) not in ja_avisados]
+    if novos:
+        if linhas:
+            linhas.append("")
+        linhas.append(f"🔴 {len(novos)} produto(s) ficaram OFF:")
+        linhas.extend(f"- {p.secao} – {p.nome}" for p in novos[:MAX_LISTAR_OCORRENCIAS])
+        if len(novos) > MAX_LISTAR_OCORRENCIAS:
+            linhas.append(f"... e mais {len(novos) - MAX_LISTAR_OCORRENCIAS} produtos")
+
+    return "\n".join(linhas) if linhas else None
+
+
+def _limitar(texto: str, limite: int) -> str:
+    """Corta `texto` em `limite` caracteres, numa quebra de linha, com "…"."""
+    if len(texto) <= limite:
+        return texto
+    return texto[: limite - 2].rsplit("\n", 1)[0] + "\n…"
+
+
+def _chamar_api(cfg: AppConfig, metodo: str, params: dict[str, Any]) -> tuple[bool, Any]:
+    """Chama a Bot API. Devolve (ok, result) ou (False, descrição do erro)."""
+    import requests
+
+    try:
+        resp = requests.post(url_api_telegram(cfg, metodo), json=params, timeout=20)
+        dados = resp.json()
+    except Exception as e:
+        logger.warning("Erro ao chamar %s no Telegram: %s", metodo, e)
+        return False, str(e)
+
+    if not dados.get("ok"):
+        return False, str(dados.get("description", resp.status_code))
+    return True, dados.get("result")
+
+
+def _publicar_painel(cfg: AppConfig, painel: EstadoPainel, texto: str) -> bool:
+    """
+    Edita a mensagem fixada; só cria e fixa outra se ela não existir mais ou
+    não puder ser editada. Outros erros (timeout, 429, 5xx) deixam o painel
+    como está: devolve False e a próxima execução tenta editar de novo.
+    """
+    chat_id = cfg.telegram.chat_id
+
+    if painel.message_id is not None:
+        ok, resultado = _chamar_api(
+            cfg,
+            "editMessageText",
+            {"chat_id": chat_id, "message_id": painel.message_id, "text": texto},
+        )
+        erro = "" if ok else str(resultado).lower()
+        if ok or "message is not modified" in erro:
+            logger.info("Painel do Telegram atualizado (mensagem %s).", painel.message_id)
+            return True
+        if not any(e in erro for e in ERROS_PAINEL_PERDIDO):
+            logger.warning(
+                "Não foi possível editar o painel (%s). Nova tentativa na próxima execução.",
+                resultado,
+            )
+            return False
+        logger.warning("Painel não pode mais ser editado (%s). Criando outro.", resultado)
+
+    ok, resultado = _chamar_api(
+        cfg,
+        "sendMessage",
+        {"chat_id": chat_id, "text": texto, "disable_notification": True},
+    )
+    if not ok:
+        logger.error("Erro ao criar o painel do Telegram: %s", resultado)
+        return False
+
+    painel.message_id = int(resultado["message_id"])
+    ok, resultado = _chamar_api(
+        cfg,
+        "pinChatMessage",
+        {"chat_id": chat_id, "message_id": painel.message_id, "disable_notification": True},
+    )
+    if not ok:
+        # Sem permissão de admin o painel continua funcionando, só não fica fixado
+        logger.warning("Painel criado, mas não foi fixado: %s", resultado)
+    logger.info("Painel do Telegram criado (mensagem %s).", painel.message_id)
+    return True
+
+
+def atualizar_painel_telegram(
+    cfg: AppConfig,
+    produtos_off: list[ProdutoRegistro],
+    produtos_desaparecidos: list[ProdutoRegistro],
+    total_ativos: int,
+    resumo: ResumoExecucao,
+    quedas: ClassificacaoQuedas | None = None,
+) -> bool:
+    """
+    Modo painel (`TELEGRAM_MODO=painel`): uma mensagem fixada por chat,
+    editada no lugar só quando o conteúdo muda, e mensagens novas só para
+    ocorrências novas (loja/seção saindo do ar, produto que ficou OFF).
+
+    Devolve se o sidecar `painel_path` mudou (para quem quiser enviá-lo ao
+    repositório).
+    """
+    token = cfg.telegram.token if cfg.telegram else ""
+    chat_id = cfg.telegram.chat_id if cfg.telegram else ""
+    if not token or not chat_id:
+        logger.warning("TELEGRAM_TOKEN ou TELEGRAM_CHAT_ID não configurados. Pulando painel.")
+        return False
+
+    paineis = carregar_paineis(cfg.painel_path)
+    primeira_vez = str(chat_id) not in paineis
+    painel = paineis.setdefault(str(chat_id), EstadoPainel())
+    mudou = False
+
+    # 1) Mensagens avulsas só para o que é novo (na 1ª vez o painel já mostra tudo)
+    if not primeira_vez:
+        ocorrencias = _montar_ocorrencias(painel, produtos_off, produtos_desaparecidos, quedas)
+        if ocorrencias:
+            data_str = horario_brasil().strftime("%d/%m/%Y %H:%M")
+            payload = {
+                "chat_id": chat_id,
+                "text": f"🔔 Novas ocorrências ({data_str})\n\n{ocorrencias}",
+            }
+            entregar_ou_guardar(cfg, url_api_telegram(cfg, "sendMessage"), payload)
+
+    problemas = sorted(_identificador(p) for p in produtos_off + produtos_desaparecidos)
+    secoes_fora = sorted(q.secao for q in quedas.secoes) if quedas is not None else []
+    loja_fora = quedas is not None and quedas.tipo == LOJA_FORA
+    ocorrencias_atuais = (problemas, secoes_fora, loja_fora)
+    if ocorrencias_atuais != (painel.problemas, painel.secoes_fora, painel.loja_fora):
+        painel.problemas, painel.secoes_fora, painel.loja_fora = ocorrencias_atuais
+        mudou = True
+
+    # 2) Painel: só chama a API se o texto renderizado mudou
+    conteudo = montar_conteudo_painel(
+        produtos_off, produtos_desaparecidos, total_ativos, resumo, quedas
+    )
+    hash_conteudo = hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+    if hash_conteudo == painel.hash_conteudo and painel.message_id is not None:
+        logger.info("Painel do Telegram sem mudanças. Nenhuma chamada à API.")
+    else:
+        agora = horario_brasil()
+        rodape = f"\n\n🕒 Última mudança: {agora.strftime('%d/%m/%Y %H:%M')}"
+        texto = _limitar(conteudo, LIMITE_TEXTO - len(rodape)) + rodape
+        if _publicar_painel(cfg, painel, texto):
+            painel.hash_conteudo = hash_conteudo
+            painel.atualizado_em = str(agora)
+            mudou = True
+
+    if mudou or primeira_vez:
+        salvar_paineis(cfg.painel_path, paineis)
+    return mudou or primeira_vez
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
+
+from .registros import ProdutoRegistro
+
+
+# "R$ 19,90", "R$1.229,60", "R$ 5" → captura só a parte numérica
+_RE_VALOR = re.compile(r"R\$\s*(\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d+(?:,\d{1,2})?)")
+
+# "De R$229,60 por R$159,90" → preço original + preço atual
+_RE_DE_POR = re.compile(r"\bde\b.*?R\$.*?\bpor\b.*?R\$", re.IGNORECASE)
+
+# Tipos de mudança de preço reportados
+PROMOCAO_INICIADA = "PROMOÇÃO INICIADA"
+PROMOCAO_ENCERRADA = "PROMOÇÃO ENCERRADA"
+AUMENTO = "AUMENTO DE PREÇO"
+
+
+def _para_centavos(valor: str) -> int:
+    """Converte "1.229,60" → 122960 (formato brasileiro)."""
+    inteiro, _, decimal = valor.replace(".", "").partition(",")
+    return int(inteiro) * 100 + int((decimal + "00")[:2])
+
+
+@lru_cache(maxsize=16384)
+def interpretar_preco(texto: str) -> tuple[int | None, int | None]:
+    """
+    Extrai (preço atual, preço original) em centavos de um texto de preço.
+
+    - "R$ 19,90"                  → (1990, None)
+    - "De R$229,60 por R$159,90"  → (15990, 22960)
+    - texto sem valor reconhecível → (None, None)
+
+    Memoizado: o mesmo texto de preço se repete entre produtos e execuções.
+    """
+    valores = _RE_VALOR.findall(texto or "")
+    if not valores:
+        return None, None
+
+    if len(valores) >= 2 and _RE_DE_POR.search(texto):
+        return _para_centavos(valores[-1]), _para_centavos(valores[0])
+
+    return _para_centavos(valores[-1]), None
+
+
+def normalizar_precos(produtos: Iterable[ProdutoRegistro]) -> None:
+    """Preenche `preco_centavos` / `preco_original_centavos` dos registros."""
+    for p in produtos:
+        p.preco_centavos, p.preco_original_centavos = interpretar_preco(p.preco)
+
+
+@dataclass(slots=True)
+class MudancaPreco:
+    secao: str
+    nome: str
+    tipo: str
+    preco_anterior: str
+    preco_atual: str
+    centavos_anterior: int | None
+    centavos_atual: int | None
+
+
+def _centavos_do_estado(info: dict) -> tuple[int | None, int | None]:
+    # Estados antigos só têm o texto do preço: interpreta na hora (com cache)
+    if "Preço (centavos)" in info:
+        return info.get("Preço (centavos)"), info.get("Preço original (centavos)")
+    return interpretar_preco(str(info.get("Preço", "")))
+
+
+def detectar_mudancas_preco(
+    produtos_atual: list[ProdutoRegistro],
+    estado_anterior: dict[str, dict],
+) -> list[MudancaPreco]:
+    """
+    Compara os preços dos produtos presentes nas duas execuções, de forma
+    vetorizada (NumPy), e devolve promoções iniciadas/encerradas e aumentos.
+
+    Um aumento causado pelo fim de uma promoção é reportado só como
+    "promoção encerrada".
+    """
+    import numpy as np
+
+    comuns = [p for p in produtos_atual if p.chave in estado_anterior]
+    if not comuns:
+        return []
+
+    # -1 representa "sem valor" nos arrays de inteiros
+    antes = [_centavos_do_estado(estado_anterior[p.chave]) for p in comuns]
+    atual_antes = np.array([a if a is not None else -1 for a, _ in antes], dtype=np.int64)
+    orig_antes = np.array([o if o is not None else -1 for _, o in antes], dtype=np.int64)
+    atual_agora = np.array(
+        [p.preco_centavos if p.preco_centavos is not None else -1 for p in comuns],
+        dtype=np.int64,
+    )
+    orig_agora = np.array(
+        [
+            p.preco_original_centavos if p.preco_original_centavos is not None else -1
+            for p in comuns
+        ],
+        dtype=np.int64,
+    )
+
+    promo_iniciada = (orig_agora >= 0) & (orig_antes < 0)
+    promo_encerrada = (orig_agora < 0) & (orig_antes >= 0)
+    aumento = (
+        (atual_antes >= 0)
+        & (atual_agora > atual_antes)
+        & ~promo_encerrada
+        & ~promo_iniciada
+    )
+
+    mudancas: list[MudancaPreco] = []
+    for tipo, mascara in (
+        (PROMOCAO_INICIADA, promo_iniciada),
+        (PROMOCAO_ENCERRADA, promo_encerrada),
+        (AUMENTO, aumento),
+    ):
+        for i in np.flatnonzero(mascara):
+            p = comuns[i]
+            mudancas.append(
+                MudancaPreco(
+                    secao=p.secao,
+                    nome=p.nome,
+                    tipo=tipo,
+                    preco_anterior=str(estado_anterior[p.chave].get("Preço", "")),
+                    preco_atual=p.preco,
+                    centavos_anterior=int(atual_antes[i]) if atual_antes[i] >= 0 else None,
+                    centavos_atual=p.preco_centavos,
+                )
+            )
+
+    return mudancas
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+
+logger = logging.getLogger(__name__)
+
+NOME_MANIFESTO = "manifest.json"
+
+
+def _hash(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def _nome_com_hash(nome: str, conteudo: bytes) -> str:
+    """"painel.css" → "painel.1a2b3c4d5e.css" (muda só quando o conteúdo muda)."""
+    base, ponto, ext = nome.rpartition(".")
+    curto = _hash(conteudo)[:10]
+    return f"{base}.{curto}.{ext}" if ponto else f"{nome}.{curto}"
+
+
+def minificar_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    # Espaço antes de ":" fica (em seletor, "a :hover" ≠ "a:hover")
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def minificar_html(html: str) -> str:
+    """
+    Remove comentários e a indentação/quebras entre tags. O dashboard não tem
+    <pre>/<script>/<textarea>, e os textos separados por quebra de linha são
+    células de tabela, então isso não muda o que é exibido.
+    """
+    html = re.sub(r"<!--.*?-->", "", html, flags=re.S)
+    html = re.sub(r">\s*\n\s*<", "><", html)
+    html = re.sub(r"\n\s+", "\n", html)
+    return html.strip()
+
+
+def _comprimir(conteudo: bytes) -> dict[str, bytes]:
+    """Variantes pré-comprimidas: gzip sempre, brotli se o módulo existir."""
+    # mtime=0: mesmo conteúdo → mesmos bytes (não gera deploy à toa)
+    variantes = {"gz": gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        logger.debug("brotli não instalado: publicando só as variantes .gz")
+    else:
+        variantes["br"] = brotli.compress(conteudo)
+    return variantes
+
+
+@dataclass
+class ResultadoPublicacao:
+    site_dir: Path
+    manifesto: dict[str, Any]
+    gravados: list[str] = field(default_factory=list)
+    removidos: list[str] = field(default_factory=list)
+
+    @property
+    def mudou(self) -> bool:
+        return bool(self.gravados or self.removidos)
+
+
+class _Site:
+    """Arquivos do site em memória; só o que mudou é gravado no disco."""
+
+    def __init__(self, raiz: Path) -> None:
+        self.raiz = raiz
+        self.arquivos: dict[str, bytes] = {}
+
+    def adicionar(self, caminho: str, conteudo: bytes) -> str:
+        self.arquivos[caminho] = conteudo
+        return caminho
+
+    def _publicados_antes(self) -> set[str]:
+        """Arquivos que a publicação anterior gerou (segundo o manifesto dela)."""
+        manifesto = self.raiz / NOME_MANIFESTO
+        if not manifesto.exists():
+            return set()
+        try:
+            arquivos = json.loads(manifesto.read_bytes())["arquivos"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Manifesto anterior inválido (%s): nada será removido.", e)
+            return set()
+        return {
+            caminho
+            for entrada in arquivos.values()
+            for chave, caminho in entrada.items()
+            if chave in ("arquivo", "gz", "br") and isinstance(caminho, str)
+        }
+
+    def gravar(self) -> tuple[list[str], list[str]]:
+        anteriores = self._publicados_antes()
+
+        gravados: list[str] = []
+        for caminho, conteudo in sorted(self.arquivos.items()):
+            destino = self.raiz / caminho
+            # Mesmo conteúdo: não regrava (o deploy não vê mudança)
+            if (
+                destino.exists()
+                and destino.stat().st_size == len(conteudo)
+                and destino.read_bytes() == conteudo
+            ):
+                continue
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            destino.write_bytes(conteudo)
+            gravados.append(caminho)
+
+        # Versões antigas dos assets/dados saem do site. Só o que a própria
+        # publicação gerou: nada fora do manifesto anterior é apagado
+        removidos: list[str] = []
+        for caminho in sorted(anteriores - self.arquivos.keys()):
+            arquivo = self.raiz / caminho
+            if arquivo.resolve().is_relative_to(self.raiz.resolve()) and arquivo.is_file():
+                arquivo.unlink()
+                removidos.append(caminho)
+        return gravados, removidos
+
+
+def publicar_site(
+    dashboard: str | Path,
+    site_dir: str | Path,
+    dados: Iterable[str | Path] = (),
+) -> ResultadoPublicacao:
+    """
+    Monta a pasta publicada no GitHub Pages (em vez do repositório inteiro):
+
+    - `index.html` minificado, com o CSS inline extraído para
+      `assets/painel.<hash>.css`
+    - cada JSON de `dados` compactado em `dados/<nome>.<hash>.json`, mais as
+      variantes `.gz` (e `.br`, com o módulo `brotli`)
+    - os demais arquivos de `dados` (o Excel) copiados como estão para
+      `dados/<nome>.<hash>.<ext>`: o xlsx já é um zip, comprimir de novo não
+      ganha nada
+    - `manifest.json` ligando os nomes lógicos aos arquivos com hash
+
+    Só os arquivos cujo conteúdo mudou são gravados, e os da publicação
+    anterior (manifesto) que não fazem mais parte do site são removidos; sem
+    mudança, a pasta fica idêntica e o deploy não tem o que publicar.
+
+    `site_dir` precisa ser uma pasta só do site: uma que contém `.git` (a
+    raiz do repositório, por exemplo) é recusada com ValueError.
+    """
+    raiz = Path(site_dir)
+    if (raiz / ".git").exists():
+        raise ValueError(f"SITE_DIR {raiz} é um repositório git, não uma pasta só do site.")
+    raiz.mkdir(parents=True, exist_ok=True)
+    site = _Site(raiz)
+    manifesto: dict[str, Any] = {"arquivos": {}}
+
+    html = Path(dashboard).read_text(encoding="utf-8")
+    estilo = re.search(r"<style>(.*?)</style>", html, flags=re.S)
+    if estilo is not None:
+        css = minificar_css(estilo.group(1)).encode("utf-8")
+        caminho_css = site.adicionar(f"assets/{_nome_com_hash('painel.css', css)}", css)
+        manifesto["arquivos"]["painel.css"] = {"arquivo": caminho_css, "bytes": len(css)}
+        html = (
+            html[: estilo.start()]
+            + f'<link rel="stylesheet" href="{caminho_css}" />'
+            + html[estilo.end() :]
+        )
+
+    index = minificar_html(html).encode("utf-8")
+    site.adicionar("index.html", index)
+    manifesto["arquivos"]["index.html"] = {"arquivo": "index.html", "bytes": len(index)}
+
+    for path in map(Path, dados):
+        if not path.exists():
+            logger.warning("Arquivo de dados %s não existe. Fora do site.", path)
+            continue
+        json_ = path.suffix.lower() == ".json"
+        if json_:
+            conteudo = json.dumps(
+                json.loads(path.read_bytes()), ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+        else:
+            conteudo = path.read_bytes()
+        caminho = site.adicionar(f"dados/{_nome_com_hash(path.name, conteudo)}", conteudo)
+        entrada: dict[str, Any] = {
+            "arquivo": caminho,
+            "bytes": len(conteudo),
+            "sha256": _hash(conteudo),
+        }
+        if json_:
+            for ext, comprimido in _comprimir(conteudo).items():
+                entrada[ext] = site.adicionar(f"{caminho}.{ext}", comprimido)
+                entrada[f"bytes_{ext}"] = len(comprimido)
+        manifesto["arquivos"][path.name] = entrada
+
+    # O manifesto só muda quando algum arquivo muda (sem data de geração)
+    manifesto_bytes = json.dumps(manifesto, ensure_ascii=False, indent=2).encode("utf-8")
+    site.adicionar(NOME_MANIFESTO, manifesto_bytes)
+    # Sem processamento do Jekyll no GitHub Pages
+    site.adicionar(".nojekyll", b"")
+
+    gravados, removidos = site.gravar()
+    resultado = ResultadoPublicacao(raiz, manifesto, gravados, removidos)
+    if resultado.mudou:
+        logger.info(
+            "Site atualizado em %s: %d arquivos gravados, %d removidos.",
+            raiz,
+            len(gravados),
+            len(removidos),
+        )
+    else:
+        logger.info("Site sem mudanças em %s.", raiz)
+    return resultado
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .registros import ProdutoRegistro
+
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento
+LOJA_FORA = "LOJA FORA DO AR"
+SECAO_FORA = "SEÇÃO FORA DO AR"
+ITENS_ISOLADOS = "ITENS ISOLADOS"
+NORMAL = "NORMAL"
+
+# Peso da execução atual na média móvel exponencial (EWMA)
+ALFA = 0.2
+
+# Queda = fração OFF a LIMIAR_Z desvios-padrão acima da média móvel e pelo
+# menos DESVIO_MINIMO_* acima dela (com variância ~0, um único produto OFF
+# já daria um escore enorme)
+LIMIAR_Z = 3.0
+DESVIO_MINIMO_LOJA = 0.5
+DESVIO_MINIMO_SECAO = 0.3
+MIN_PRODUTOS_SECAO = 2
+
+# Até MIN_EXECUCOES_Z execuções a variância ainda não diz nada: vale a
+# fração OFF absoluta
+MIN_EXECUCOES_Z = 5
+LIMIAR_SEM_HISTORICO = 0.8
+
+
+@dataclass(slots=True)
+class EstatisticaOff:
+    """Média e variância móveis (EWMA) da fração de produtos OFF."""
+
+    media: float = 0.0
+    variancia: float = 0.0
+    execucoes: int = 0
+
+    def atualizar(self, taxa: float, alfa: float = ALFA) -> None:
+        if self.execucoes == 0:
+            self.media, self.variancia = taxa, 0.0
+        else:
+            desvio = taxa - self.media
+            self.media += alfa * desvio
+            self.variancia = (1 - alfa) * (self.variancia + alfa * desvio * desvio)
+        self.execucoes += 1
+
+    def escore_z(self, taxa: float) -> float:
+        if self.execucoes == 0:
+            return 0.0
+        return (taxa - self.media) / math.sqrt(self.variancia + 1e-6)
+
+    def em_queda(self, taxa: float, desvio_minimo: float) -> bool:
+        """Fração OFF `taxa` está anormalmente alta para esta série?"""
+        if self.execucoes < MIN_EXECUCOES_Z:
+            return taxa >= LIMIAR_SEM_HISTORICO
+        return taxa - self.media >= desvio_minimo and self.escore_z(taxa) >= LIMIAR_Z
+
+
+@dataclass
+class EstatisticasOff:
+    """Sidecar `estatisticas_off.json`: EWMA da loja e de cada seção."""
+
+    loja: EstatisticaOff = field(default_factory=EstatisticaOff)
+    secoes: dict[str, EstatisticaOff] = field(default_factory=dict)
+
+
+def carregar_estatisticas(path: str | Path) -> EstatisticasOff:
+    p = Path(path)
+    if not p.exists():
+        return EstatisticasOff()
+    try:
+        with p.open(encoding="utf-8") as f:
+            data = json.load(f)
+        return EstatisticasOff(
+            loja=EstatisticaOff(**data.get("loja", {})),
+            secoes={s: EstatisticaOff(**e) for s, e in data.get("secoes", {}).items()},
+        )
+    except Exception as e:
+        logger.warning("Estatísticas de OFF inválidas (%s). Recomeçando do zero.", e)
+        return EstatisticasOff()
+
+
+def salvar_estatisticas(path: str | Path, estatisticas: EstatisticasOff, timestamp: str) -> None:
+    def _dict(e: EstatisticaOff) -> dict[str, Any]:
+        return {
+            "media": round(e.media, 6),
+            "variancia": round(e.variancia, 6),
+            "execucoes": e.execucoes,
+        }
+
+    data = {
+        "atualizado_em": timestamp,
+        "alfa": ALFA,
+        "loja": _dict(estatisticas.loja),
+        "secoes": {s: _dict(e) for s, e in sorted(estatisticas.secoes.items())},
+    }
+    with Path(path).open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+@dataclass(slots=True)
+class QuedaSecao:
+    secao: str
+    off: int
+    total: int
+    media: float  # fração OFF normal da seção (EWMA antes desta execução)
+
+    @property
+    def taxa(self) -> float:
+        return self.off / self.total if self.total else 0.0
+
+
+@dataclass
+class ClassificacaoQuedas:
+    """
+    Leitura da execução: queda da loja toda, seções fora do ar ou só itens
+    isolados OFF (produtos fora das seções em queda).
+    """
+
+    tipo: str
+    off: int
+    total: int
+    media_loja: float
+    secoes: list[QuedaSecao] = field(default_factory=list)
+    isolados: list[ProdutoRegistro] = field(default_factory=list)
+
+    def alerta(self) -> str:
+        """Linha(s) compactas para o topo da mensagem do Telegram."""
+        if self.tipo == LOJA_FORA:
+            return (
+                f"🛑 {LOJA_FORA}: {self.off}/{self.total} produtos OFF "
+                f"({self.off / self.total:.0%}; normal ~{self.media_loja:.0%})"
+            )
+
+        linhas: list[str] = []
+        if self.secoes:
+            linhas.append(f"⛔ {len(self.secoes)} seção(ões) fora do ar:")
+            linhas.extend(
+                f"- {q.secao}: {q.off}/{q.total} OFF (normal ~{q.media:.0%})"
+                for q in self.secoes
+            )
+        if self.isolados:
+            linhas.append(f"🔸 {len(self.isolados)} itens isolados OFF")
+        return "\n".join(linhas)
+
+
+def _atualizar(est: EstatisticaOff, taxa: float, em_queda: bool) -> None:
+    # Na fase de aquecimento a série sempre aprende (uma seção nova que já
+    # nasce OFF deixa de ser queda); depois, a queda não entra na média
+    if not em_queda or est.execucoes < MIN_EXECUCOES_Z:
+        est.atualizar(taxa)
+
+
+def detectar_quedas(
+    produtos: list[ProdutoRegistro],
+    estatisticas: EstatisticasOff,
+) -> ClassificacaoQuedas:
+    """
+    Classifica a execução pelo escore z da fração OFF da loja e de cada seção
+    em relação à média e variância móveis (EWMA) das execuções anteriores, e
+    atualiza `estatisticas` (O(seções) depois da contagem). Séries em queda
+    não são atualizadas (ver `_atualizar`): senão a média "aprende" a queda e
+    o alerta some algumas execuções depois, com a loja ainda fora do ar.
+    Seções que não existem mais saem de `estatisticas` (o sidecar não cresce
+    sem limite).
+
+    `produtos` inclui os desaparecidos (status "OFF (Desapareceu)").
+    """
+    contagem: dict[str, list[int]] = {}
+    for p in produtos:
+        c = contagem.setdefault(p.secao, [0, 0])
+        c[1] += 1
+        if p.status.upper() != "ON":
+            c[0] += 1
+
+    off = sum(c[0] for c in contagem.values())
+    total = sum(c[1] for c in contagem.values())
+    taxa_loja = off / total if total else 0.0
+    media_loja = estatisticas.loja.media
+
+    for secao in estatisticas.secoes.keys() - contagem.keys():
+        del estatisticas.secoes[secao]
+
+    secoes_fora: list[QuedaSecao] = []
+    for secao, (off_secao, total_secao) in sorted(contagem.items()):
+        est = estatisticas.secoes.setdefault(secao, EstatisticaOff())
+        taxa = off_secao / total_secao
+        em_queda = total_secao >= MIN_PRODUTOS_SECAO and est.em_queda(
+            taxa, DESVIO_MINIMO_SECAO
+        )
+        if em_queda:
+            secoes_fora.append(QuedaSecao(secao, off_secao, total_secao, est.media))
+        _atualizar(est, taxa, em_queda)
+
+    loja_fora = bool(total) and estatisticas.loja.em_queda(taxa_loja, DESVIO_MINIMO_LOJA)
+    _atualizar(estatisticas.loja, taxa_loja, loja_fora)
+    if loja_fora:
+        return ClassificacaoQuedas(LOJA_FORA, off, total, media_loja)
+
+    em_queda = {q.secao for q in secoes_fora}
+    isolados = [p for p in produtos if p.status.upper() != "ON" and p.secao not in em_queda]
+
+    if secoes_fora:
+        tipo = SECAO_FORA
+    elif isolados:
+        tipo = ITENS_ISOLADOS
+    else:
+        tipo = NORMAL
+
+    return ClassificacaoQuedas(tipo, off, total, media_loja, secoes_fora, isolados)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+
+# Grafia canônica de cada status (os valores de models.StatusType) pela
+# versão em maiúsculas: a fonte pode mandar "on" ou "Off "
+_STATUS_CANONICOS = {s.upper(): s for s in ("ON", "OFF", "OFF (Desapareceu)")}
+
+
+def normalizar_status(status: str) -> str:
+    """
+    " on " → "ON". Status desconhecidos voltam só sem os espaços das pontas,
+    para a validação (src/validacao.py) recusá-los.
+    """
+    limpo = status.strip()
+    return _STATUS_CANONICOS.get(limpo.upper(), limpo)
+
+
+@dataclass(slots=True)
+class ProdutoRegistro:
+    """
+    Registro interno e compacto de um produto, usado do CSV até os relatórios.
+
+    - `__slots__`: sem `__dict__` por instância (bem menos memória que um dict)
+    - seção e status são internados: milhares de produtos compartilham
+      o mesmo objeto str para "Bebidas", "ON", etc.
+
+    A validação com Pydantic (`models.Produto`) fica só nas bordas de I/O.
+    """
+
+    secao: str
+    nome: str
+    preco: str
+    descricao: str
+    status: str
+    ultima_verificacao: str | None = None
+
+    # Preenchidos pela etapa de normalização de preços (src/precos.py)
+    preco_centavos: int | None = None
+    preco_original_centavos: int | None = None
+
+    # ID estável entre execuções (src/identidade.py), sobrevive a renomeações
+    id_produto: str | None = None
+
+    @property
+    def chave(self) -> str:
+        """Chave usada no estado/histórico: "Seção|Produto"."""
+        return f"{self.secao}|{self.nome}"
+
+    def como_dict(self) -> dict[str, Any]:
+        """Dict com as chaves do modelo `Produto` (para as bordas de I/O)."""
+        return {
+            "secao": self.secao,
+            "nome": self.nome,
+            "preco": self.preco,
+            "descricao": self.descricao,
+            "status": self.status,
+        }
+
+    @classmethod
+    def de_dict(cls, d: Mapping[str, Any]) -> "ProdutoRegistro":
+        """Cria o registro a partir de um dict no formato secao/nome/preco/..."""
+        return novo_registro(
+            d.get("secao", ""),
+            d.get("nome", ""),
+            d.get("preco", ""),
+            d.get("descricao", ""),
+            d.get("status", ""),
+            d.get("ultima_verificacao"),
+        )
+
+
+def _texto(valor: Any) -> str:
+    # Células vazias podem chegar como None (ou NaN, se vierem do pandas)
+    if valor is None or valor != valor:
+        return ""
+    return str(valor)
+
+
+def novo_registro(
+    secao: Any,
+    nome: Any,
+    preco: Any,
+    descricao: Any,
+    status: Any,
+    ultima_verificacao: str | None = None,
+) -> ProdutoRegistro:
+    """
+    Cria um `ProdutoRegistro` normalizando para str (status na grafia
+    canônica) e internando seção/status.
+    """
+    return ProdutoRegistro(
+        secao=sys.intern(_texto(secao)),
+        nome=_texto(nome),
+        preco=_texto(preco),
+        descricao=_texto(descricao),
+        status=sys.intern(normalizar_status(_texto(status))),
+        ultima_verificacao=ultima_verificacao,
+    )
@@ -1,31 +1,99 @@
 from __future__ import annotations
-import pandas as pd
 from pathlib import Path
 
-def gerar_relatorio_excel(produtos_atual, produtos_desaparecidos, output_path):
-    # sheet 1 – todos os produtos
-    df1 = pd.DataFrame([
-        {
-            "Seção": p["secao"],
-            "Nome": p["nome"],
-            "Preço": p.get("preco", ""),
-            "Status": p.get("status", ""),
-        }
-        for p in produtos_atual
-    ])
+
+# Colunas da análise de disponibilidade (src/disponibilidade.py) → Excel
+_COLUNAS_DISPONIBILIDADE = {
+    "secao": "Seção",
+    "nome": "Nome",
+    "produtos": "Produtos",
+    "verificacoes": "Verificações",
+    "disponibilidade_pct": "% disponível",
+    "episodios_off": "Episódios OFF",
+    "tempo_medio_off_h": "Tempo médio OFF (h)",
+    "trocas": "Trocas de status",
+}
+
+
+def _reais(centavos):
+    return None if centavos is None else centavos / 100
+
+
+def _tabela_disponibilidade(pd, disponibilidade, atributo):
+    partes = [
+        getattr(d, atributo)
+        .filter(list(_COLUNAS_DISPONIBILIDADE))
+        .rename(columns=_COLUNAS_DISPONIBILIDADE)
+        .assign(Janela=d.janela.nome)
+        for d in disponibilidade
+    ]
+    df = pd.concat(partes, ignore_index=True)
+    return df[["Janela"] + [c for c in df.columns if c != "Janela"]]
+
+
+def _disponibilidade_produtos(disponibilidade):
+    # Uma linha por produto: métricas da primeira janela + % das demais
+    # (uma linha por produto e janela multiplicava o tempo de gravação)
+    def _pct(d):
+        return {"disponibilidade_pct": f"% disponível ({d.janela.nome})"}
+
+    principal = disponibilidade[0]
+    df = principal.por_produto.filter(list(_COLUNAS_DISPONIBILIDADE)).rename(columns=_pct(principal))
+    for d in disponibilidade[1:]:
+        df = df.merge(
+            d.por_produto[["secao", "nome", "disponibilidade_pct"]].rename(columns=_pct(d)),
+            on=["secao", "nome"],
+            how="left",
+        )
+    return df.rename(columns=_COLUNAS_DISPONIBILIDADE)
+
+
+def gerar_relatorio_excel(
+    produtos_atual, produtos_desaparecidos, output_path, disponibilidade=None, resumo=None
+):
+    # pandas/openpyxl são pesados: só carregam quando o Excel é gerado
+    import pandas as pd
+
+    # sheet 1 – todos os produtos (monta por colunas, sem um dict por linha)
+    df1 = pd.DataFrame({
+        "Seção": [p.secao for p in produtos_atual],
+        "Nome": [p.nome for p in produtos_atual],
+        "Preço": [p.preco for p in produtos_atual],
+        # Valores numéricos (R$) para ordenar/somar no Excel
+        "Preço atual (R$)": [_reais(p.preco_centavos) for p in produtos_atual],
+        "Preço original (R$)": [_reais(p.preco_original_centavos) for p in produtos_atual],
+        "Status": [p.status for p in produtos_atual],
+    })
 
     # sheet 2 – desaparecidos
-    df2 = pd.DataFrame([
-        {
-            "Seção": p["secao"],
-            "Nome": p["nome"],
-            "Preço": p.get("preco", ""),
-            "Status": "DESAPARECIDO",
-        }
-        for p in produtos_desaparecidos
-    ])
+    df2 = pd.DataFrame({
+        "Seção": [p.secao for p in produtos_desaparecidos],
+        "Nome": [p.nome for p in produtos_desaparecidos],
+        "Preço": [p.preco for p in produtos_desaparecidos],
+        "Status": ["DESAPARECIDO"] * len(produtos_desaparecidos),
+    })
+
+    # sheet 3 – contagens por seção (do resumo compartilhado da execução)
+    secoes = resumo.secoes if resumo is not None else ()
+    df3 = pd.DataFrame({
+        "Seção": [s.secao for s in secoes],
+        "ON": [s.on for s in secoes],
+        "OFF": [s.off for s in secoes],
+        "Desaparecidos": [s.desaparecidos for s in secoes],
+    })
 
     output = Path(output_path)
     with pd.ExcelWriter(output, engine="openpyxl") as writer:
         df1.to_excel(writer, sheet_name="Produtos Atual", index=False)
         df2.to_excel(writer, sheet_name="Produtos Desaparecidos", index=False)
+        if resumo is not None:
+            df3.to_excel(writer, sheet_name="Resumo por Seção", index=False)
+
+        # sheets 4 e 5 – disponibilidade por seção / produto (todas as janelas)
+        if disponibilidade:
+            _tabela_disponibilidade(pd, disponibilidade, "por_secao").to_excel(
+                writer, sheet_name="Disponibilidade Seções", index=False
+            )
+            _disponibilidade_produtos(disponibilidade).to_excel(
+                writer, sheet_name="Disponibilidade Produtos", index=False
+            )
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import itertools
+import json
+import logging
+import os
+import re
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from .config import AppConfig
+from .fontes import ler_produtos_csv
+from .identidade import reconciliar_produtos
+from .precos import normalizar_precos
+from .registros import ProdutoRegistro
+from .state import montar_estado, registros_historico, salvar_historico
+from .validacao import RelatorioQualidade, registrar_qualidade, validar_produtos
+
+
+logger = logging.getLogger(__name__)
+
+# Data/hora no nome do arquivo: "produtos_2026-10-01_1400.csv",
+# "20261001T140000.csv", "export-2026-10-01.csv" (sem hora = 00:00)
+PADRAO_TIMESTAMP = re.compile(
+    r"(\d{4})-?(\d{2})-?(\d{2})(?:[T_ -]?(\d{2})[:hH-]?(\d{2})(?:[:-]?(\d{2}))?)?"
+)
+
+FORMATO_TIMESTAMP = "%Y-%m-%d %H:%M:%S"
+
+# Snapshots lidos à frente do diff, por processo: a memória fica limitada a
+# alguns snapshots, não à pasta inteira
+LIDOS_A_FRENTE_POR_PROCESSO = 2
+
+
+def timestamp_do_arquivo(path: str | Path) -> dt.datetime | None:
+    """Data/hora do snapshot a partir do nome do arquivo (None se não houver)."""
+    for m in PADRAO_TIMESTAMP.finditer(Path(path).stem):
+        partes = [int(g) if g else 0 for g in m.groups()]
+        try:
+            return dt.datetime(*partes)
+        except ValueError:
+            continue
+    return None
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    timestamp: dt.datetime
+    path: Path
+
+
+def listar_snapshots(pasta: str | Path, padrao: str = "*.csv") -> list[Snapshot]:
+    """CSVs da pasta em ordem cronológica (arquivos sem data no nome são ignorados)."""
+    snapshots: list[Snapshot] = []
+    for arquivo in Path(pasta).glob(padrao):
+        ts = timestamp_do_arquivo(arquivo)
+        if ts is None:
+            logger.warning("Sem data/hora no nome, ignorado: %s", arquivo.name)
+            continue
+        snapshots.append(Snapshot(ts, arquivo))
+    return sorted(snapshots, key=lambda s: (s.timestamp, s.path.name))
+
+
+@dataclass
+class ResultadoReprocessamento:
+    snapshots: int
+    registros_historico: int
+    produtos_estado: int
+    desaparecimentos: int
+    reconciliados: int
+    invalidos: int  # snapshots descartados por `registrar_qualidade`
+
+
+def _ler_e_validar(
+    path: Path, confiavel: bool
+) -> tuple[list[ProdutoRegistro], RelatorioQualidade]:
+    # Roda nos processos do pool: leitura e validação são o grosso do custo
+    produtos = ler_produtos_csv(path)
+    return produtos, validar_produtos(produtos, confiavel=confiavel)
+
+
+def _em_ordem(
+    pool: Executor, funcao: Callable[[Any], Any], itens: Iterable[Any], a_frente: int
+) -> Iterator[Any]:
+    """
+    Resultados de `funcao` na ordem de `itens`, com no máximo `a_frente`
+    tarefas em andamento ou prontas esperando consumo (`pool.map` submete
+    todas de uma vez e guarda os resultados que o consumidor ainda não leu).
+    """
+    itens = iter(itens)
+    pendentes = deque(pool.submit(funcao, item) for item in itertools.islice(itens, a_frente))
+    while pendentes:
+        resultado = pendentes.popleft().result()
+        pendentes.extend(pool.submit(funcao, item) for item in itertools.islice(itens, 1))
+        yield resultado
+
+
+def reprocessar_snapshots(
+    cfg: AppConfig,
+    pasta: str | Path,
+    saida: str | Path | None = None,
+    processos: int | None = None,
+) -> ResultadoReprocessamento:
+    """
+    Reconstrói histórico e estado a partir de uma pasta de CSVs datados.
+
+    - a leitura e a validação dos CSVs (o grosso do custo) rodam em paralelo
+      num pool de processos, no máximo LIDOS_A_FRENTE_POR_PROCESSO snapshots
+      por processo à frente do diff
+    - snapshots que a validação recusaria no monitoramento (status
+      desconhecidos) são descartados, como uma execução que falhou
+    - o diff é sequencial, em ordem cronológica (cada snapshot depende do
+      estado deixado pelo anterior), com a mesma lógica do monitoramento:
+      reconciliação de identidade, preços e desaparecidos
+    - histórico e estado são gravados uma vez só, no final
+
+    Sem Telegram, GitHub, dashboard nem Excel. Com `saida`, os arquivos vão
+    para essa pasta; senão substituem `estado_path`/`historico_path` (e a
+    impressão digital é descartada, para a próxima execução ser completa).
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .monitor import comparar_com_estado_anterior
+
+    snapshots = listar_snapshots(pasta)
+    if not snapshots:
+        raise ValueError(f"Nenhum CSV com data/hora no nome em {pasta}")
+
+    processos = processos or os.cpu_count() or 1
+    logger.info("Reprocessando %d snapshots com %d processos.", len(snapshots), processos)
+
+    estado: dict[str, dict] = {}
+    historico: list[dict] = []
+    desaparecimentos = reconciliados = invalidos = 0
+
+    # "spawn": um fork copiaria a thread do QueueListener do log (src/logs.py)
+    with ProcessPoolExecutor(
+        max_workers=processos, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        # Na ordem dos snapshots: o diff de um snapshot roda enquanto os
+        # seguintes ainda estão sendo lidos
+        lidos = _em_ordem(
+            pool,
+            functools.partial(_ler_e_validar, confiavel=not cfg.validar_entrada),
+            [s.path for s in snapshots],
+            a_frente=LIDOS_A_FRENTE_POR_PROCESSO * processos,
+        )
+        for snapshot, (produtos, relatorio) in zip(snapshots, lidos):
+            ts = snapshot.timestamp.strftime(FORMATO_TIMESTAMP)
+            try:
+                registrar_qualidade(relatorio)
+            except ValueError as e:
+                logger.error("%s descartado: %s", snapshot.path.name, e)
+                invalidos += 1
+                continue
+
+            estado_alinhado, correspondencias = reconciliar_produtos(produtos, estado, ts)
+            normalizar_precos(produtos)
+            _, desaparecidos = comparar_com_estado_anterior(produtos, estado_alinhado, ts)
+            normalizar_precos(desaparecidos)
+
+            historico.extend(registros_historico(produtos, desaparecidos, ts))
+            estado = montar_estado(produtos, ts)
+
+            desaparecimentos += len(desaparecidos)
+            reconciliados += len(correspondencias)
+            logger.debug(
+                "%s: %d produtos, %d desaparecidos, %d reconciliados",
+                snapshot.path.name,
+                len(produtos),
+                len(desaparecidos),
+                len(correspondencias),
+            )
+
+    if saida is not None:
+        Path(saida).mkdir(parents=True, exist_ok=True)
+        estado_path = Path(saida) / cfg.estado_path.name
+        historico_path = Path(saida) / cfg.historico_path.name
+    else:
+        estado_path, historico_path = cfg.estado_path, cfg.historico_path
+        cfg.impressao_path.unlink(missing_ok=True)
+
+    salvar_historico(historico_path, historico)
+    with estado_path.open("w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+
+    resultado = ResultadoReprocessamento(
+        snapshots=len(snapshots),
+        registros_historico=len(historico),
+        produtos_estado=len(estado),
+        desaparecimentos=desaparecimentos,
+        reconciliados=reconciliados,
+        invalidos=invalidos,
+    )
+    logger.info(
+        "Reprocessamento concluído: %d snapshots (%d descartados), %d registros "
+        "no histórico, %d produtos no estado, %d desaparecimentos, %d reconciliados.",
+        resultado.snapshots,
+        resultado.invalidos,
+        resultado.registros_historico,
+        resultado.produtos_estado,
+        resultado.desaparecimentos,
+        resultado.reconciliados,
+    )
+    return resultado
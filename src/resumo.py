@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .registros import ProdutoRegistro
+
+
+@dataclass(frozen=True, slots=True)
+class ResumoSecao:
+    secao: str
+    on: int
+    off: int  # OFF entre os produtos presentes no CSV
+    desaparecidos: int  # sumiram desde a execução anterior
+    desapareceu_alguma_vez: int  # produtos da seção que já sumiram em qualquer execução
+
+    @property
+    def total(self) -> int:
+        return self.on + self.off
+
+
+@dataclass(frozen=True, slots=True)
+class ResumoExecucao:
+    """
+    Contagens da execução calculadas uma única vez e compartilhadas (somente
+    leitura) pelo dashboard, pelo Excel e pela mensagem do Telegram, que
+    podem rodar em paralelo.
+    """
+
+    ultima_atualizacao: str
+    total_on: int
+    total_off: int
+    total_desaparecidos: int
+    total_registros_historico: int
+    desapareceram_alguma_vez: int
+    secoes: tuple[ResumoSecao, ...]
+
+
+def _desapareceu(registro: dict) -> bool:
+    tipo = str(registro.get("tipo") or "").strip().upper()
+    return "DESAPARECIDO" in tipo or "DESAPARECEU" in tipo
+
+
+@dataclass
+class AgregadosHistorico:
+    """
+    O que o resumo precisa do histórico: quantos registros ele tem e quais
+    (seção, produto) já desapareceram em alguma execução. No daemon/ingestão
+    fica em memória e é atualizado só com os registros novos de cada rodada.
+    """
+
+    total_registros: int = 0
+    desaparecidos: set[tuple[str, str]] = field(default_factory=set)
+
+    @classmethod
+    def de_historico(cls, historico: Iterable[dict]) -> AgregadosHistorico:
+        agregados = cls()
+        agregados.atualizar(historico)
+        return agregados
+
+    def atualizar(self, novos: Iterable[dict]) -> None:
+        for r in novos:
+            self.total_registros += 1
+            if _desapareceu(r):
+                secao = r.get("secao") or r.get("Seção") or ""
+                nome = r.get("nome") or r.get("Produto") or ""
+                self.desaparecidos.add((secao, nome))
+
+
+def _montar(
+    ultima_atualizacao: str,
+    produtos: Iterable[tuple[str, str]],
+    desaparecidos_agora: Iterable[str],
+    agregados: AgregadosHistorico,
+) -> ResumoExecucao:
+    # secao → [on, off, desaparecidos agora, desapareceu alguma vez]
+    contagem: dict[str, list[int]] = {}
+    for secao, status in produtos:
+        c = contagem.setdefault(secao, [0, 0, 0, 0])
+        c[0 if status == "ON" else 1] += 1
+    for secao in desaparecidos_agora:
+        contagem.setdefault(secao, [0, 0, 0, 0])[2] += 1
+
+    for secao, _ in agregados.desaparecidos:
+        if secao:
+            contagem.setdefault(secao, [0, 0, 0, 0])[3] += 1
+
+    secoes = tuple(
+        ResumoSecao(secao, *contagem[secao]) for secao in sorted(contagem)
+    )
+    return ResumoExecucao(
+        ultima_atualizacao=ultima_atualizacao,
+        total_on=sum(s.on for s in secoes),
+        total_off=sum(s.off for s in secoes),
+        total_desaparecidos=sum(s.desaparecidos for s in secoes),
+        total_registros_historico=agregados.total_registros,
+        desapareceram_alguma_vez=len(agregados.desaparecidos),
+        secoes=secoes,
+    )
+
+
+def agregar_execucao(
+    produtos_atual: list[ProdutoRegistro],
+    produtos_desaparecidos: list[ProdutoRegistro],
+    historico: list[dict] | AgregadosHistorico,
+    timestamp: str,
+) -> ResumoExecucao:
+    """
+    Passe único de agregação da execução atual (mais o histórico, ou os
+    agregados dele já mantidos em memória).
+    """
+    if not isinstance(historico, AgregadosHistorico):
+        historico = AgregadosHistorico.de_historico(historico)
+    return _montar(
+        timestamp,
+        ((p.secao or "Desconhecida", p.status.upper()) for p in produtos_atual),
+        (p.secao or "Desconhecida" for p in produtos_desaparecidos),
+        historico,
+    )
+
+
+def agregar_historico(historico: list[dict], padrao_timestamp: str = "") -> ResumoExecucao:
+    """
+    Mesmo resumo a partir só do histórico (registros "ATUAL" da execução mais
+    recente), para gerar o dashboard fora do pipeline.
+    """
+    ultimo_ts = max((str(r.get("timestamp", "")) for r in historico), default="")
+
+    registros_ultimo = [
+        r
+        for r in historico
+        if str(r.get("timestamp", "")) == ultimo_ts
+        and str(r.get("tipo") or "").strip().upper() == "ATUAL"
+    ]
+    # Se por algum motivo não achar, cai pro histórico todo
+    if not registros_ultimo:
+        registros_ultimo = [
+            r for r in historico if str(r.get("tipo") or "").strip().upper() == "ATUAL"
+        ]
+
+    return _montar(
+        ultimo_ts or padrao_timestamp,
+        (
+            (
+                r.get("secao") or r.get("Seção") or "Desconhecida",
+                str(r.get("status") or r.get("Status") or "").strip().upper(),
+            )
+            for r in registros_ultimo
+        ),
+        (),
+        AgregadosHistorico.de_historico(historico),
+    )
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .disponibilidade import colunas_historico
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Orçamento de pontos por série: o tamanho do dashboard não cresce com o
+# histórico (meses de execuções viram no máximo esses pontos)
+MAX_PONTOS_LOJA = 240
+MAX_PONTOS_SECAO = 60
+
+
+def lttb(x: "np.ndarray", y: "np.ndarray", n: int) -> "np.ndarray":
+    """
+    Largest-Triangle-Three-Buckets: índices de `n` pontos que preservam a
+    forma da série (picos de OFF incluídos), sempre com o primeiro e o
+    último ponto. Um passo vetorizado por balde.
+    """
+    import numpy as np
+
+    tamanho = len(x)
+    if n >= tamanho or n < 3:
+        return np.arange(tamanho)
+
+    # n - 2 baldes entre o primeiro e o último ponto
+    bordas = np.linspace(1, tamanho - 1, n - 1).astype(np.int64)
+    indices = np.empty(n, dtype=np.int64)
+    indices[0], indices[-1] = 0, tamanho - 1
+
+    a = 0
+    for i in range(n - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        # Ponto médio do balde seguinte (no último balde, o último ponto)
+        if i + 2 < n - 1:
+            prox = slice(bordas[i + 1], bordas[i + 2])
+        else:
+            prox = slice(tamanho - 1, tamanho)
+        mx, my = x[prox].mean(), y[prox].mean()
+
+        # Área do triângulo (ponto escolhido antes, candidato, média seguinte)
+        areas = np.abs(
+            (x[a] - mx) * (y[inicio:fim] - y[a]) - (x[a] - x[inicio:fim]) * (my - y[a])
+        )
+        a = inicio + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+
+@dataclass
+class Serie:
+    """Série já reduzida: segundos desde a época e valor de cada ponto."""
+
+    ts: list[int]
+    valores: list[float]
+
+
+def _reduzir(ts: "np.ndarray", valores: "np.ndarray", max_pontos: int) -> Serie:
+    indices = lttb(ts.astype(float), valores.astype(float), max_pontos)
+    return Serie(ts[indices].tolist(), valores[indices].tolist())
+
+
+@dataclass
+class SerieSecao:
+    secao: str
+    on: Serie
+    off: Serie
+    total_atual: int  # produtos da seção na última execução
+
+
+@dataclass
+class SeriesTemporais:
+    """
+    ON/OFF por execução da loja e de cada seção, reduzidos a um número fixo
+    de pontos (`lttb`).
+    """
+
+    inicio: int
+    fim: int
+    execucoes: int
+    loja_on: Serie
+    loja_off: Serie
+    secoes: list[SerieSecao] = field(default_factory=list)
+
+
+def calcular_series(
+    historico: Iterable[dict],
+    max_pontos_loja: int = MAX_PONTOS_LOJA,
+    max_pontos_secao: int = MAX_PONTOS_SECAO,
+) -> SeriesTemporais | None:
+    """
+    Contagem de produtos ON e OFF (desaparecidos contam como OFF) em cada
+    execução do histórico, para a loja e por seção: um groupby por
+    (seção, execução) e outro por execução, sem loop por registro.
+    """
+    import numpy as np
+    import pandas as pd
+
+    colunas = colunas_historico(historico)
+    if colunas is None or not len(colunas.ts):
+        return None
+
+    contagens: Any = (
+        pd.DataFrame({"secao": colunas.secao, "ts": colunas.ts, "on": colunas.on})
+        .groupby(["secao", "ts"], sort=True)["on"]
+        .agg(on="sum", total="size")
+    )
+    contagens["off"] = contagens["total"] - contagens["on"]
+
+    loja = contagens.groupby(level="ts", sort=True)[["on", "off"]].sum()
+    ts_loja = loja.index.to_numpy(dtype=np.int64)
+
+    secoes: list[SerieSecao] = []
+    for codigo, grupo in contagens.groupby(level="secao", sort=False):
+        ts = grupo.index.get_level_values("ts").to_numpy(dtype=np.int64)
+        secoes.append(
+            SerieSecao(
+                secao=str(colunas.secoes[codigo]),
+                on=_reduzir(ts, grupo["on"].to_numpy(), max_pontos_secao),
+                off=_reduzir(ts, grupo["off"].to_numpy(), max_pontos_secao),
+                total_atual=int(grupo["total"].iloc[-1]),
+            )
+        )
+
+    return SeriesTemporais(
+        inicio=int(ts_loja[0]),
+        fim=int(ts_loja[-1]),
+        execucoes=len(ts_loja),
+        loja_on=_reduzir(ts_loja, loja["on"].to_numpy(), max_pontos_loja),
+        loja_off=_reduzir(ts_loja, loja["off"].to_numpy(), max_pontos_loja),
+        secoes=sorted(secoes, key=lambda s: s.secao),
+    )
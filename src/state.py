@@ -1,18 +1,35 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from .registros import ProdutoRegistro, novo_registro
+from .resumo import AgregadosHistorico
 from .utils import horario_brasil
 
 
+def _ler_json(path: Path, conteudo: bytes | None) -> Any:
+    """Interpreta os bytes recebidos ou, sem eles, o arquivo."""
+    if conteudo is not None:
+        # json.loads aceita bytes UTF-8 direto (sem passar por um str)
+        return json.loads(conteudo)
+    with path.open("rb") as f:
+        return json.loads(f.read())
+
+
 # -------------------------------
 # ESTADO ATUAL (estado_produtos.json)
 # -------------------------------
 
-def carregar_estado_anterior(path: str | Path) -> dict[str, dict]:
+def carregar_estado_anterior(
+    path: str | Path,
+    conteudo: bytes | None = None,
+) -> dict[str, dict]:
     """
     Carrega o estado anterior dos produtos a partir de um JSON.
 
@@ -24,20 +41,23 @@ def carregar_estado_anterior(path: str | Path) -> dict[str, dict]:
         "Preço": "...",
         "Descrição": "...",
         "Status": "...",
+        "Preço (centavos)": 1990,
+        "Preço original (centavos)": null,
         "Última verificação": "..."
       },
       ...
     }
+
+    Com `conteudo` (bytes já baixados do GitHub) o arquivo não é lido.
     """
     p = Path(path)
 
-    if not p.exists():
+    if conteudo is None and not p.exists():
         logging.warning("Nenhum estado anterior encontrado. Esta parece ser a primeira execução.")
         return {}
 
     try:
-        with p.open(encoding="utf-8") as f:
-            data = json.load(f)
+        data = _ler_json(p, conteudo)
 
         if not isinstance(data, dict):
             logging.warning(
@@ -54,28 +74,58 @@ def carregar_estado_anterior(path: str | Path) -> dict[str, dict]:
         return {}
 
 
-def salvar_estado_atual(path: str | Path, produtos_atual: list[dict]) -> None:
+def montar_estado(produtos_atual: list[ProdutoRegistro], ts: str) -> dict[str, dict[str, Any]]:
+    """Estado no formato do JSON: { "Seção|Produto": { ...info... } }."""
+    return {
+        prod.chave: {
+            "ID": prod.id_produto,
+            "Seção": prod.secao,
+            "Produto": prod.nome,
+            "Preço": prod.preco,
+            "Descrição": prod.descricao,
+            "Status": prod.status,
+            "Preço (centavos)": prod.preco_centavos,
+            "Preço original (centavos)": prod.preco_original_centavos,
+            "Última verificação": ts,
+        }
+        for prod in produtos_atual
+    }
+
+
+def registros_do_estado(estado: dict[str, dict[str, Any]]) -> list[ProdutoRegistro]:
+    """Inverso de `montar_estado`: o cardápio da execução que gravou o estado."""
+    registros: list[ProdutoRegistro] = []
+    for chave, info in estado.items():
+        secao, _, nome = chave.partition("|")
+        p = novo_registro(
+            secao,
+            nome,
+            info.get("Preço", ""),
+            info.get("Descrição", ""),
+            info.get("Status", ""),
+            info.get("Última verificação"),
+        )
+        p.id_produto = info.get("ID")
+        registros.append(p)
+    return registros
+
+
+def salvar_estado_atual(
+    path: str | Path,
+    produtos_atual: list[ProdutoRegistro],
+    timestamp: str | None = None,
+) -> dict[str, dict[str, Any]]:
     """
-    Salva o estado atual dos produtos em JSON, a partir da lista de dicts
-    (cada dict com chaves: secao, nome, preco, descricao, status).
+    Salva o estado atual dos produtos em JSON, a partir da lista de registros.
+    Devolve o estado gravado (mesmo formato de `carregar_estado_anterior`).
+
+    `timestamp` (padrão: agora) vai em "Última verificação".
     """
     p = Path(path)
+    novo_estado: dict[str, dict[str, Any]] = {}
 
     try:
-        novo_estado: dict[str, dict[str, Any]] = {}
-        ts = str(horario_brasil())
-
-        for prod in produtos_atual:
-            chave = f"{prod.get('secao', '')}|{prod.get('nome', '')}"
-
-            novo_estado[chave] = {
-                "Seção": prod.get("secao", ""),
-                "Produto": prod.get("nome", ""),
-                "Preço": prod.get("preco", ""),
-                "Descrição": prod.get("descricao", ""),
-                "Status": prod.get("status", ""),
-                "Última verificação": ts,
-            }
+        novo_estado = montar_estado(produtos_atual, timestamp or str(horario_brasil()))
 
         with p.open("w", encoding="utf-8") as f:
             json.dump(novo_estado, f, ensure_ascii=False, indent=2)
@@ -89,12 +139,14 @@ def salvar_estado_atual(path: str | Path, produtos_atual: list[dict]) -> None:
     except Exception as e:
         logging.exception("Erro ao salvar estado atual: %s", e)
 
+    return novo_estado
+
 
 # -------------------------------
 # HISTÓRICO (historico_status.json)
 # -------------------------------
 
-def carregar_historico(path: str | Path) -> list[dict]:
+def carregar_historico(path: str | Path, conteudo: bytes | None = None) -> list[dict]:
     """
     Carrega o histórico de produtos.
 
@@ -107,22 +159,24 @@ def carregar_historico(path: str | Path) -> list[dict]:
         "preco": "...",
         "descricao": "...",
         "status": "...",
+        "preco_centavos": 1990,
+        "preco_original_centavos": null,
         "tipo": "ATUAL" ou "DESAPARECIDO"
       },
       ...
     ]
 
     Também trata formatos antigos (dict) e converte para lista.
+    Com `conteudo` (bytes já baixados do GitHub) o arquivo não é lido.
     """
     p = Path(path)
 
-    if not p.exists():
+    if conteudo is None and not p.exists():
         logging.warning("Nenhum histórico encontrado. Um novo será criado.")
         return []
 
     try:
-        with p.open(encoding="utf-8") as f:
-            data = json.load(f)
+        data = _ler_json(p, conteudo)
 
         # Caso já esteja no formato novo (lista)
         if isinstance(data, list):
@@ -174,11 +228,103 @@ def salvar_historico(path: str | Path, historico: list[dict]) -> None:
         logging.exception("Erro ao salvar histórico: %s", e)
 
 
+def anexar_historico(path: str | Path, novos: list[dict]) -> bool:
+    """
+    Acrescenta registros ao final do JSON do histórico sem regravar o arquivo
+    inteiro: troca o "]" final por ",<novos registros>]".
+
+    Custo proporcional só aos registros novos. Devolve False se o arquivo não
+    existir ou não terminar como uma lista JSON (aí o chamador grava tudo).
+    """
+    p = Path(path)
+    if not p.exists():
+        return False
+
+    if not novos:
+        return True
+
+    try:
+        with p.open("r+b") as f:
+            # Procura o "]" final (ignorando espaços/quebras de linha)
+            pos = f.seek(0, 2)
+            fim = -1
+            while pos > 0:
+                pos -= 1
+                f.seek(pos)
+                c = f.read(1)
+                if c == b"]":
+                    fim = pos
+                    break
+                if not c.isspace():
+                    return False
+            if fim < 0:
+                return False
+
+            # Lista vazia ("[]") não leva vírgula antes dos novos registros
+            pos = fim
+            anterior = b""
+            while pos > 0:
+                pos -= 1
+                f.seek(pos)
+                anterior = f.read(1)
+                if not anterior.isspace():
+                    break
+            if anterior not in (b"[", b"}"):
+                return False
+
+            blocos = [
+                "  " + json.dumps(r, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+                for r in novos
+            ]
+            separador = "\n" if anterior == b"[" else ",\n"
+            trecho = separador + ",\n".join(blocos) + "\n]"
+
+            f.seek(pos + 1)
+            f.truncate()
+            f.write(trecho.encode("utf-8"))
+
+        logging.info("%d registros anexados ao histórico em %s", len(novos), p)
+        return True
+
+    except Exception as e:
+        logging.exception("Erro ao anexar registros ao histórico: %s", e)
+        return False
+
+
+def _registro_historico(p: ProdutoRegistro, ts: str, tipo: str) -> dict:
+    """Converte um registro de produto para o formato do histórico (JSON)."""
+    return {
+        "timestamp": ts,
+        "id_produto": p.id_produto,
+        "secao": p.secao,
+        "nome": p.nome,
+        "preco": p.preco,
+        "descricao": p.descricao,
+        "status": p.status or ("OFF (Desapareceu)" if tipo == "DESAPARECIDO" else ""),
+        "preco_centavos": p.preco_centavos,
+        "preco_original_centavos": p.preco_original_centavos,
+        "tipo": tipo,
+    }
+
+
+def registros_historico(
+    produtos_atual: list[ProdutoRegistro],
+    produtos_desaparecidos: list[ProdutoRegistro],
+    ts: str,
+) -> list[dict]:
+    """Registros de uma execução: todos os produtos atuais + os desaparecidos."""
+    novos = [_registro_historico(p, ts, "ATUAL") for p in produtos_atual]
+    novos.extend(_registro_historico(p, ts, "DESAPARECIDO") for p in produtos_desaparecidos)
+    return novos
+
+
 def atualizar_historico(
     path: str | Path,
     historico: list[dict] | dict,
-    produtos_atual: list[dict],
-    produtos_desaparecidos: list[dict],
+    produtos_atual: list[ProdutoRegistro],
+    produtos_desaparecidos: list[ProdutoRegistro],
+    incremental: bool = False,
+    timestamp: str | None = None,
 ) -> list[dict]:
     """
     Atualiza o histórico com:
@@ -186,8 +332,12 @@ def atualizar_historico(
       - os produtos que desapareceram
 
     Garante que o histórico será uma lista, mesmo que venha em formato antigo (dict).
+
+    Com `incremental=True` (histórico já em memória, ex.: modo daemon) só os
+    registros novos são escritos no fim do arquivo. `timestamp` (padrão:
+    agora) é o horário gravado nos registros novos.
     """
-    ts = str(horario_brasil())
+    ts = timestamp or str(horario_brasil())
 
     # 🔒 Garantia de que historico é uma lista
     if isinstance(historico, dict):
@@ -204,35 +354,11 @@ def atualizar_historico(
         )
         historico_lista = []
 
-    # Registros do estado atual
-    for p in produtos_atual:
-        historico_lista.append(
-            {
-                "timestamp": ts,
-                "secao": p.get("secao", ""),
-                "nome": p.get("nome", ""),
-                "preco": p.get("preco", ""),
-                "descricao": p.get("descricao", ""),
-                "status": p.get("status", ""),
-                "tipo": "ATUAL",
-            }
-        )
+    novos = registros_historico(produtos_atual, produtos_desaparecidos, ts)
+    historico_lista.extend(novos)
 
-    # Registros de produtos desaparecidos
-    for p in produtos_desaparecidos:
-        historico_lista.append(
-            {
-                "timestamp": ts,
-                "secao": p.get("secao", ""),
-                "nome": p.get("nome", ""),
-                "preco": p.get("preco", ""),
-                "descricao": p.get("descricao", ""),
-                "status": p.get("status", "OFF (Desapareceu)"),
-                "tipo": "DESAPARECIDO",
-            }
-        )
-
-    salvar_historico(path, historico_lista)
+    if not (incremental and anexar_historico(path, novos)):
+        salvar_historico(path, historico_lista)
 
     logging.info(
         "Histórico atualizado com %d registros em %s",
@@ -240,4 +366,131 @@ def atualizar_historico(
         path,
     )
 
-    return historico_lista
\ No newline at end of file
+    return historico_lista
+
+
+def anexar_execucao_historico(
+    path: str | Path,
+    produtos_atual: list[ProdutoRegistro],
+    produtos_desaparecidos: list[ProdutoRegistro],
+    timestamp: str | None = None,
+) -> list[dict]:
+    """
+    Grava os registros da execução no histórico sem tê-lo em memória (modo
+    daemon): só anexa ao fim do arquivo. Se o arquivo não puder ser anexado
+    (inexistente ou corrompido), relê e grava tudo. Devolve os registros novos.
+    """
+    novos = registros_historico(
+        produtos_atual, produtos_desaparecidos, timestamp or str(horario_brasil())
+    )
+    if not anexar_historico(path, novos):
+        historico = carregar_historico(path)
+        historico.extend(novos)
+        salvar_historico(path, historico)
+    return novos
+
+
+# -------------------------------
+# IMPRESSÃO DIGITAL DA ENTRADA (estado_produtos.fingerprint.json)
+# -------------------------------
+
+def calcular_impressao(produtos: list[ProdutoRegistro]) -> str:
+    """
+    Hash estável da entrada normalizada: SHA-256 das linhas
+    "secao|nome|preco|status" ordenadas (a ordem do CSV não importa).
+    """
+    h = hashlib.sha256()
+    for linha in sorted(f"{p.secao}|{p.nome}|{p.preco}|{p.status}" for p in produtos):
+        h.update(linha.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def carregar_impressao(path: str | Path) -> dict[str, Any]:
+    """Lê o arquivo de impressão digital ({} se não existir ou estiver inválido)."""
+    p = Path(path)
+    if not p.exists():
+        return {}
+
+    try:
+        with p.open(encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        logging.warning("Impressão digital da entrada ilegível (%s). Ignorando.", e)
+        return {}
+
+
+def salvar_impressao(
+    path: str | Path,
+    impressao: str,
+    timestamp: str,
+    artefatos_pendentes: bool = False,
+) -> None:
+    """
+    Grava a impressão da entrada processada numa execução completa.
+
+    `artefatos_pendentes` marca uma rodada leve (daemon/ingestão) que não
+    gerou dashboard/Excel: a próxima rodada com artefatos não pega o atalho.
+    """
+    dados = {
+        "impressao": impressao,
+        "execucao_completa": timestamp,
+        "ultimo_heartbeat": timestamp,
+        "heartbeats": 0,
+        "artefatos_pendentes": artefatos_pendentes,
+    }
+    try:
+        with Path(path).open("w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        logging.exception("Erro ao salvar impressão digital da entrada: %s", e)
+
+
+def registrar_heartbeat(path: str | Path, anterior: dict[str, Any], timestamp: str) -> None:
+    """Entrada sem mudanças: só registra que a execução aconteceu."""
+    dados = {
+        **anterior,
+        "ultimo_heartbeat": timestamp,
+        "heartbeats": int(anterior.get("heartbeats", 0)) + 1,
+    }
+    try:
+        with Path(path).open("w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        logging.info(
+            "Entrada sem mudanças desde %s: heartbeat registrado (%d seguidos).",
+            dados.get("execucao_completa", "?"),
+            dados["heartbeats"],
+        )
+    except Exception as e:
+        logging.exception("Erro ao registrar heartbeat: %s", e)
+
+
+# -------------------------------
+# ESTADO EM MEMÓRIA (modo daemon)
+# -------------------------------
+
+@dataclass
+class EstadoEmMemoria:
+    """
+    Estado e agregados do histórico mantidos em memória entre execuções
+    (modos daemon e ingestão), para não baixar nem reinterpretar os JSONs a
+    cada rodada. O histórico em si fica só no arquivo local: cada rodada
+    anexa os seus registros e ele só é relido nas rodadas com artefatos.
+    """
+
+    estado: dict[str, dict[str, Any]] = field(default_factory=dict)
+    agregados: AgregadosHistorico = field(default_factory=AgregadosHistorico)
+    # Registros do histórico ainda não entregues ao índice do bot
+    registros_novos: list[dict] = field(default_factory=list)
+    execucoes: int = 0
+    # time.monotonic() da última rodada com artefatos (None = nenhuma ainda)
+    artefatos_em: float | None = None
+
+    def artefatos_vencidos(self, intervalo_s: float) -> bool:
+        """Se já é hora de uma rodada com dashboard/Excel/upload do histórico."""
+        return self.artefatos_em is None or time.monotonic() - self.artefatos_em >= intervalo_s
+
+    def consumir_registros_novos(self) -> list[dict]:
+        novos, self.registros_novos = self.registros_novos, []
+        return novos
@@ -1,54 +1,67 @@
 from __future__ import annotations
 
+import json
 import logging
+from pathlib import Path
 from typing import Any, Dict, List
 
-import requests
-
 from .config import AppConfig
+from .precos import AUMENTO, PROMOCAO_ENCERRADA, PROMOCAO_INICIADA, MudancaPreco
+from .quedas import LOJA_FORA, SECAO_FORA, ClassificacaoQuedas
+from .registros import ProdutoRegistro
+from .resumo import ResumoExecucao
 from .utils import horario_brasil
 
 
 logger = logging.getLogger(__name__)
 
 
-def _montar_resumo_status_por_secao(produtos: List[Dict[str, Any]]) -> str:
+def url_api_telegram(cfg: AppConfig, metodo: str) -> str:
+    """URL de um método da Bot API (respeita `TELEGRAM_API_BASE`)."""
+    return f"{cfg.telegram.api_base}/bot{cfg.telegram.token}/{metodo}"
 
-    from collections import defaultdict
 
-    stats = defaultdict(lambda: {"on": 0, "off": 0, "desap": 0})
+def montar_resumo_status_por_secao(resumo: ResumoExecucao) -> str:
+    # Seções que só existem no histórico (já saíram do cardápio) ficam de fora
+    secoes = [s for s in resumo.secoes if s.total or s.desaparecidos]
+    if not secoes:
+        return "(sem dados de seção)"
 
-    for p in produtos:
-        secao = str(p.get("secao", "(sem seção)")).strip()
-        status_raw = str(p.get("status", "")).upper()
+    linhas = ["📊 Status por Seção:"]
+    for s in secoes:
+        linhas.append(
+            f"- {s.secao}: 🟢 {s.on} ON | 🔴 {s.off + s.desaparecidos} OFF "
+            f"(inclui {s.desaparecidos} desaparecidos)"
+        )
 
-        if status_raw == "ON":
-            stats[secao]["on"] += 1
-        else:
-            stats[secao]["off"] += 1
-            if "DESAPARECEU" in status_raw:
-                stats[secao]["desap"] += 1
+    return "\n".join(linhas)
 
-    if not stats:
-        return "(sem dados de seção)"
 
-    linhas = ["📊 Status por Seção:"]
-    for secao in sorted(stats.keys()):
-        s = stats[secao]
+def _montar_resumo_mudancas_preco(mudancas: List[MudancaPreco], max_listar: int = 10) -> str:
+    icones = {PROMOCAO_INICIADA: "🏷️", PROMOCAO_ENCERRADA: "⌛", AUMENTO: "📈"}
+
+    linhas = [f"💲 Mudanças de preço ({len(mudancas)}):"]
+    for m in mudancas[:max_listar]:
         linhas.append(
-            f"- {secao}: 🟢 {s['on']} ON | 🔴 {s['off']} OFF (inclui {s['desap']} desaparecidos)"
+            f"{icones.get(m.tipo, '-')} {m.tipo}: {m.secao} – {m.nome} "
+            f"({m.preco_anterior} → {m.preco_atual})"
         )
 
+    if len(mudancas) > max_listar:
+        linhas.append(f"... e mais {len(mudancas) - max_listar} mudanças")
+
     return "\n".join(linhas)
 
 
 def enviar_alerta_telegram(
     cfg: AppConfig,
     mensagem_resumo: str,
-    produtos_off: List[Dict[str, Any]],
-    produtos_desaparecidos: List[Dict[str, Any]],
+    produtos_off: List[ProdutoRegistro],
+    produtos_desaparecidos: List[ProdutoRegistro],
     total_ativos: int,
-    produtos_completos: List[Dict[str, Any]],
+    resumo: ResumoExecucao,
+    mudancas_preco: List[MudancaPreco] | None = None,
+    quedas: ClassificacaoQuedas | None = None,
 ) -> None:
 
     token = cfg.telegram.token if cfg.telegram else ""
@@ -60,7 +73,7 @@ def enviar_alerta_telegram(
         )
         return
 
-    base_url = f"https://api.telegram.org/bot{token}/sendMessage"
+    base_url = url_api_telegram(cfg, "sendMessage")
 
     agora = horario_brasil()
     data_str = agora.strftime("%d/%m/%Y %H:%M:%S")
@@ -70,32 +83,52 @@ def enviar_alerta_telegram(
     # ===== Cabeçalho =====
     linhas_msg: List[str] = []
     linhas_msg.append("🚨 ALERTA: Monitoramento de Produtos iFood (Demo CSV) 🚨\n")
+
+    # Queda da loja / de seções vem antes de tudo (o sinal mais importante)
+    if quedas is not None and quedas.tipo in (LOJA_FORA, SECAO_FORA):
+        linhas_msg.append(quedas.alerta() + "\n")
+
     linhas_msg.append(f"Data/Hora: {data_str}\n")
     linhas_msg.append(f"✅ Produtos ativos no cardápio (ON): {total_ativos}\n")
 
     # ===== Lista de produtos OFF / desaparecidos =====
-    if total_off > 0:
-        linhas_msg.append(
-            f"⚠️ {total_off} produtos com problemas (OFF ou desaparecidos):"
-        )
-        destaque = produtos_off + produtos_desaparecidos
+    destaque = produtos_off + produtos_desaparecidos
+    if quedas is not None and quedas.tipo == LOJA_FORA:
+        # A lista de produtos não acrescenta nada quando a loja toda caiu
+        destaque = []
+    elif quedas is not None:
+        # Produtos das seções em queda já estão resumidos no topo
+        destaque = quedas.isolados
+
+    if destaque:
+        if len(destaque) == total_off:
+            linhas_msg.append(
+                f"⚠️ {total_off} produtos com problemas (OFF ou desaparecidos):"
+            )
+        else:
+            linhas_msg.append(
+                f"⚠️ {len(destaque)} itens isolados OFF ou desaparecidos "
+                f"(de {total_off} no total):"
+            )
         max_listar = 10
 
         for p in destaque[:max_listar]:
-            secao = p.get("secao", "(sem seção)")
-            nome = p.get("nome", "(sem nome)")
-            preco = p.get("preco", "N/A")
-            linhas_msg.append(f"- {secao} – {nome} – Preço: {preco}")
+            linhas_msg.append(f"- {p.secao} – {p.nome} – Preço: {p.preco}")
 
         if len(destaque) > max_listar:
             linhas_msg.append(f"... e mais {len(destaque) - max_listar} produtos\n")
         else:
             linhas_msg.append("")
-    else:
+    elif total_off == 0:
         linhas_msg.append("✅ Nenhum produto OFF ou desaparecido.\n")
 
+    # ===== Mudanças de preço =====
+    if mudancas_preco:
+        linhas_msg.append(_montar_resumo_mudancas_preco(mudancas_preco))
+        linhas_msg.append("")
+
     # ===== Status por seção =====
-    linhas_msg.append(_montar_resumo_status_por_secao(produtos_completos))
+    linhas_msg.append(montar_resumo_status_por_secao(resumo))
     linhas_msg.append("")
 
     # ===== Rodapé =====
@@ -117,22 +150,34 @@ def enviar_alerta_telegram(
     }
 
     # ===== Envio com retries =====
+    entregar_ou_guardar(cfg, base_url, payload)
+
+
+# Resultado de uma tentativa de envio à Bot API
+ENVIADO = "enviado"
+REJEITADO = "rejeitado"  # 4xx (exceto 429): reenviar não adianta
+FALHOU = "falhou"  # rede, timeout, 429 ou 5xx: vale tentar de novo depois
+
+
+def _tentar_enviar(base_url: str, payload: Dict[str, Any], tentativas: int = 3) -> str:
+    """Envia o payload para a API do Telegram com retries (ENVIADO/REJEITADO/FALHOU)."""
     import time
     import requests
 
-    tentativas = 3
     for tentativa in range(1, tentativas + 1):
         try:
             resp = requests.post(base_url, json=payload, timeout=20)
             if resp.status_code == 200:
                 logger.info("Alerta enviado ao Telegram (tentativa %d).", tentativa)
-                break
-            else:
-                logger.error(
-                    "Erro ao enviar alerta para Telegram (tentativa %d): %s",
-                    tentativa,
-                    resp.text,
-                )
+                return ENVIADO
+            logger.error(
+                "Erro ao enviar alerta para Telegram (tentativa %d): %s",
+                tentativa,
+                resp.text,
+            )
+            # Ex.: Markdown inválido com parse_mode, chat inexistente
+            if 400 <= resp.status_code < 500 and resp.status_code != 429:
+                return REJEITADO
         except requests.exceptions.ReadTimeout:
             logger.warning(
                 "Timeout ao enviar alerta para Telegram (tentativa %d).",
@@ -146,4 +191,138 @@ def enviar_alerta_telegram(
             )
 
         if tentativa < tentativas:
-            time.sleep(5)
\ No newline at end of file
+            time.sleep(5)
+
+    return FALHOU
+
+
+def _enviar_payload(base_url: str, payload: Dict[str, Any], tentativas: int = 3) -> bool:
+    """Envia o payload para a API do Telegram com retries. Retorna se deu certo."""
+    return _tentar_enviar(base_url, payload, tentativas) == ENVIADO
+
+
+def entregar_ou_guardar(cfg: AppConfig, base_url: str, payload: Dict[str, Any]) -> bool:
+    """
+    Envia o payload; se falhar por algo passageiro, guarda no outbox, e se o
+    Telegram rejeitar, guarda entre os rejeitados (reenviar não adianta).
+    """
+    resultado = _tentar_enviar(base_url, payload)
+    if resultado == REJEITADO:
+        _guardar_rejeitados(cfg, [payload])
+    elif resultado == FALHOU:
+        _guardar_no_outbox(cfg, payload)
+    return resultado == ENVIADO
+
+
+# -------------------------------
+# OUTBOX (alertas que falharam)
+# -------------------------------
+
+def _carregar_outbox(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    try:
+        with path.open(encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        logger.exception("Erro ao ler outbox do Telegram: %s", e)
+        return []
+
+
+def _salvar_outbox(path: Path, mensagens: List[Dict[str, Any]]) -> None:
+    # Outbox vazio fica como "[]" (e não apagado) para poder ser enviado ao
+    # repositório e substituir a versão com pendências
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(mensagens, f, ensure_ascii=False, indent=2)
+
+
+def caminho_rejeitados(outbox_path: str | Path) -> Path:
+    """`outbox_telegram.json` → `outbox_telegram_rejeitados.json`."""
+    p = Path(outbox_path)
+    return p.with_name(f"{p.stem}_rejeitados{p.suffix}")
+
+
+def _guardar_no_outbox(cfg: AppConfig, payload: Dict[str, Any]) -> None:
+    """
+    Guarda um alerta que não foi entregue para reenviar com `--modo drenar_outbox`.
+    O outbox também vai para o repositório: no GitHub Actions o disco não
+    sobrevive entre execuções.
+    """
+    from .github_integration import fazer_upload_github
+
+    p = Path(cfg.outbox_path)
+    mensagens = _carregar_outbox(p)
+    mensagens.append({"payload": payload, "criado_em": str(horario_brasil())})
+    _salvar_outbox(p, mensagens)
+    logger.warning("Alerta guardado no outbox (%d pendentes) em %s", len(mensagens), p)
+    fazer_upload_github(cfg.github, p)
+
+
+def _guardar_rejeitados(cfg: AppConfig, payloads: List[Dict[str, Any]]) -> None:
+    """Alertas que o Telegram recusou (4xx) ficam à parte, para inspeção."""
+    p = caminho_rejeitados(cfg.outbox_path)
+    rejeitados = _carregar_outbox(p)
+    agora = str(horario_brasil())
+    rejeitados.extend({"payload": payload, "rejeitado_em": agora} for payload in payloads)
+    _salvar_outbox(p, rejeitados)
+    logger.error(
+        "%d alerta(s) recusados pelo Telegram guardados em %s (total %d).",
+        len(payloads),
+        p,
+        len(rejeitados),
+    )
+
+
+def drenar_outbox_telegram(cfg: AppConfig) -> int:
+    """
+    Reenvia os alertas pendentes no outbox, na ordem em que foram criados, e
+    devolve quantos foram enviados.
+
+    O outbox é baixado do repositório antes (no GitHub Actions o disco não
+    sobrevive entre execuções) e enviado de volta se mudou. Mensagens que o
+    Telegram recusa (4xx) vão para os rejeitados e a drenagem continua; num
+    erro passageiro (rede, 429, 5xx) ela para, mantendo o restante.
+    """
+    from .github_integration import baixar_arquivo_github, fazer_upload_github
+
+    token = cfg.telegram.token if cfg.telegram else ""
+    if not token:
+        logger.warning("TELEGRAM_TOKEN não configurado. Outbox mantido.")
+        return 0
+
+    p = Path(cfg.outbox_path)
+    baixar_arquivo_github(cfg.github, p)
+    mensagens = _carregar_outbox(p)
+    if not mensagens:
+        logger.info("Outbox do Telegram vazio.")
+        return 0
+
+    base_url = url_api_telegram(cfg, "sendMessage")
+
+    enviados = 0
+    rejeitados: List[Dict[str, Any]] = []
+    pendentes: List[Dict[str, Any]] = []
+    for i, item in enumerate(mensagens):
+        resultado = _tentar_enviar(base_url, item["payload"], tentativas=1)
+        if resultado == ENVIADO:
+            enviados += 1
+        elif resultado == REJEITADO:
+            rejeitados.append(item["payload"])
+        else:
+            pendentes = mensagens[i:]
+            break
+
+    if rejeitados:
+        _guardar_rejeitados(cfg, rejeitados)
+    _salvar_outbox(p, pendentes)
+    if len(pendentes) != len(mensagens):
+        fazer_upload_github(cfg.github, p)
+
+    logger.info(
+        "Outbox drenado: %d enviados, %d rejeitados, %d pendentes.",
+        enviados,
+        len(rejeitados),
+        len(pendentes),
+    )
+    return enviados
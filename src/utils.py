@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import datetime as dt
-import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import LogConfig
 
 
 def horario_brasil() -> dt.datetime:
@@ -10,15 +13,13 @@ def horario_brasil() -> dt.datetime:
     return dt.datetime.utcnow() - dt.timedelta(hours=3)
 
 
-def setup_logging(log_path: str) -> None:
-    """Configura logging padrão para arquivo + console."""
-    Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+def setup_logging(log_path: str | Path, log_cfg: LogConfig | None = None) -> None:
+    """
+    Configura logging para arquivo (com rotação) + console, sem bloquear:
+    os registros passam por uma fila gravada numa thread à parte.
+    Ver src/logs.py.
+    """
+    from .config import LogConfig
+    from .logs import configurar_logging
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_path, encoding="utf-8"),
-            logging.StreamHandler(),
-        ],
-    )
\ No newline at end of file
+    configurar_logging(log_path, log_cfg or LogConfig())
\ No newline at end of file
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from .registros import ProdutoRegistro
+
+if TYPE_CHECKING:
+    from pydantic import TypeAdapter
+
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _adapter_produtos() -> "TypeAdapter[Any]":
+    """TypeAdapter(list[Produto]) compilado uma única vez por processo."""
+    from pydantic import TypeAdapter
+
+    from .models import Produto
+
+    return TypeAdapter(list[Produto])
+
+
+@dataclass
+class RelatorioQualidade:
+    """
+    Resultado da validação em lote dos produtos recém-carregados.
+
+    - status_desconhecidos: status fora de ON / OFF / OFF (Desapareceu) → contagem
+    - sem_preco: chaves "Seção|Produto" sem preço
+    - duplicados: chaves "Seção|Produto" que aparecem mais de uma vez → ocorrências
+    """
+
+    total: int
+    validado: bool
+    status_desconhecidos: dict[str, int] = field(default_factory=dict)
+    sem_preco: list[str] = field(default_factory=list)
+    duplicados: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Sem erros fatais (status desconhecido distorce as contagens ON/OFF)."""
+        return not self.status_desconhecidos
+
+    def resumo(self) -> str:
+        if not self.validado:
+            return f"{self.total} produtos (validação pulada: fonte confiável)"
+
+        partes = [f"{self.total} produtos"]
+        if self.status_desconhecidos:
+            partes.append(f"status desconhecidos: {self.status_desconhecidos}")
+        if self.sem_preco:
+            partes.append(f"{len(self.sem_preco)} sem preço")
+        if self.duplicados:
+            partes.append(f"{len(self.duplicados)} chaves duplicadas")
+        if len(partes) == 1:
+            partes.append("sem problemas")
+        return ", ".join(partes)
+
+
+def validar_produtos(
+    produtos: list[ProdutoRegistro],
+    confiavel: bool = False,
+) -> RelatorioQualidade:
+    """
+    Valida todos os produtos de uma vez com `TypeAdapter(list[Produto])`
+    e monta o relatório de qualidade.
+
+    Com `confiavel=True` a validação é pulada (caminho rápido para fontes
+    já validadas na origem).
+    """
+    if confiavel:
+        return RelatorioQualidade(total=len(produtos), validado=False)
+
+    from pydantic import ValidationError
+
+    status_desconhecidos: Counter[str] = Counter()
+    try:
+        _adapter_produtos().validate_python([p.como_dict() for p in produtos])
+    except ValidationError as e:
+        for erro in e.errors():
+            loc = erro.get("loc", ())
+            if len(loc) >= 2 and isinstance(loc[0], int):
+                p = produtos[loc[0]]
+                if loc[1] == "status":
+                    status_desconhecidos[p.status] += 1
+                else:
+                    # Com registros normalizados isso não deveria acontecer
+                    logger.warning("Produto %s inválido: %s", p.chave, erro.get("msg"))
+
+    sem_preco = [p.chave for p in produtos if not p.preco.strip()]
+
+    ocorrencias = Counter(p.chave for p in produtos)
+    duplicados = {chave: n for chave, n in ocorrencias.items() if n > 1}
+
+    return RelatorioQualidade(
+        total=len(produtos),
+        validado=True,
+        status_desconhecidos=dict(status_desconhecidos),
+        sem_preco=sem_preco,
+        duplicados=duplicados,
+    )
+
+
+def verificar_qualidade(
+    produtos: list[ProdutoRegistro],
+    confiavel: bool = False,
+) -> RelatorioQualidade:
+    """
+    Roda `validar_produtos`, registra o relatório no log e interrompe a
+    execução (ValueError) se houver status desconhecidos.
+    """
+    return registrar_qualidade(validar_produtos(produtos, confiavel=confiavel))
+
+
+def registrar_qualidade(relatorio: RelatorioQualidade) -> RelatorioQualidade:
+    """
+    Parte de `verificar_qualidade` depois da validação (que pode ter rodado
+    em outro processo, ver src/reprocessar.py): log e ValueError.
+    """
+    if relatorio.sem_preco or relatorio.duplicados:
+        logger.warning("Qualidade dos dados: %s", relatorio.resumo())
+        if relatorio.duplicados:
+            # Duplicados colapsam no dict do diff e distorcem os totais
+            logger.warning(
+                "Chaves duplicadas (primeiras 5): %s",
+                list(relatorio.duplicados)[:5],
+            )
+    else:
+        logger.info("Qualidade dos dados: %s", relatorio.resumo())
+
+    if not relatorio.ok:
+        raise ValueError(f"Dados de entrada inválidos: {relatorio.resumo()}")
+
+    return relatorio
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import html
+import json
+import logging
+import os
+import re
+import shutil
+import unicodedata
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .config import AppConfig
+from .dashboard_html import ESTILO_PAINEL
+from .disponibilidade import Disponibilidade, pct_disponivel
+from .quedas import LOJA_FORA, ClassificacaoQuedas
+from .resumo import ResumoExecucao
+
+
+logger = logging.getLogger(__name__)
+
+# Em LOJAS_DIR: <slug>/index.html (dashboard da loja) + <slug>/resumo_loja.json
+NOME_RESUMO_LOJA = "resumo_loja.json"
+NOME_DASHBOARD_LOJA = "index.html"
+
+
+def slug_loja(nome: str) -> str:
+    """"Pizzaria São João" → "pizzaria-sao-joao" (nome da pasta da loja)."""
+    ascii_ = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", ascii_.lower()).strip("-") or "loja"
+
+
+@dataclass
+class ResumoLoja:
+    """
+    Resumo de poucas centenas de bytes gravado a cada execução da loja. A
+    visão geral lê só esses arquivos (nunca o histórico das lojas), então
+    gerá-la custa O(lojas).
+    """
+
+    loja: str
+    slug: str
+    atualizado_em: str
+    produtos: int
+    on: int
+    off: int
+    desaparecidos: int
+    queda: str  # tipo da classificação de quedas (NORMAL, LOJA FORA DO AR, ...)
+    secoes_fora: list[str] = field(default_factory=list)
+    disponibilidade_pct: float | None = None
+    janela_disponibilidade: str = ""
+
+    @property
+    def em_queda(self) -> bool:
+        return self.queda == LOJA_FORA or bool(self.secoes_fora)
+
+
+def montar_resumo_loja(
+    loja: str,
+    resumo: ResumoExecucao,
+    quedas: ClassificacaoQuedas,
+    disponibilidade: list[Disponibilidade],
+) -> ResumoLoja:
+    """Resumo da loja a partir do que o pipeline já calculou na execução."""
+    pct: float | None = None
+    janela = ""
+    if disponibilidade:
+        # % da loja = horas ON / horas verificadas na primeira janela
+        por_secao = disponibilidade[0].por_secao
+        verificacoes = int(por_secao["verificacoes"].sum())
+        if verificacoes:
+            pct = round(
+                float(
+                    pct_disponivel(
+                        por_secao["horas_on"].sum(),
+                        por_secao["horas"].sum(),
+                        por_secao["verificacoes_on"].sum(),
+                        verificacoes,
+                    )
+                ),
+                1,
+            )
+            janela = disponibilidade[0].janela.nome
+
+    return ResumoLoja(
+        loja=loja,
+        slug=slug_loja(loja),
+        atualizado_em=resumo.ultima_atualizacao,
+        produtos=resumo.total_on + resumo.total_off,
+        on=resumo.total_on,
+        off=resumo.total_off,
+        desaparecidos=resumo.total_desaparecidos,
+        queda=quedas.tipo,
+        secoes_fora=[q.secao for q in quedas.secoes],
+        disponibilidade_pct=pct,
+        janela_disponibilidade=janela,
+    )
+
+
+def salvar_resumo_loja(path: str | Path, resumo: ResumoLoja) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(asdict(resumo), f, ensure_ascii=False, indent=2)
+
+
+def carregar_resumos_lojas(pasta: str | Path) -> list[ResumoLoja]:
+    """Um resumo por subpasta de `pasta` (arquivos inválidos são ignorados)."""
+    resumos: list[ResumoLoja] = []
+    for arquivo in sorted(Path(pasta).glob(f"*/{NOME_RESUMO_LOJA}")):
+        try:
+            with arquivo.open("r", encoding="utf-8") as f:
+                resumos.append(ResumoLoja(**json.load(f)))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Resumo de loja inválido em %s: %s", arquivo, e)
+    return resumos
+
+
+def _linha_loja(r: ResumoLoja) -> str:
+    if r.queda == LOJA_FORA:
+        quedas = f"🛑 {LOJA_FORA}"
+    elif r.secoes_fora:
+        quedas = f"⛔ {len(r.secoes_fora)}: " + html.escape(", ".join(r.secoes_fora))
+    else:
+        quedas = "-"
+
+    pct = (
+        f"{r.disponibilidade_pct}% ({html.escape(r.janela_disponibilidade)})"
+        if r.disponibilidade_pct is not None
+        else "-"
+    )
+    return f"""
+            <tr>
+                <td><a href="{r.slug}/{NOME_DASHBOARD_LOJA}">{html.escape(r.loja)}</a></td>
+                <td>{r.produtos}</td>
+                <td>{r.on}</td>
+                <td>{r.off}</td>
+                <td>{r.desaparecidos}</td>
+                <td>{quedas}</td>
+                <td>{pct}</td>
+                <td>{html.escape(r.atualizado_em)}</td>
+            </tr>
+        """
+
+
+def gerar_visao_lojas(pasta: str | Path) -> Path:
+    """
+    Gera `<pasta>/index.html` com uma linha por loja (ON/OFF, quedas ativas,
+    % de disponibilidade) e link para o dashboard de cada uma. Lojas em
+    queda aparecem primeiro; depois, as menos disponíveis.
+    """
+    pasta = Path(pasta)
+    resumos = sorted(
+        carregar_resumos_lojas(pasta),
+        key=lambda r: (
+            not r.em_queda,
+            r.disponibilidade_pct if r.disponibilidade_pct is not None else 100.0,
+            r.loja,
+        ),
+    )
+
+    em_queda = sum(r.em_queda for r in resumos)
+    linhas = "".join(_linha_loja(r) for r in resumos)
+    atualizacao = max((r.atualizado_em for r in resumos), default="-")
+
+    pagina = f"""<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+    <meta charset="UTF-8" />
+    <title>Monitoramento de Produtos iFood - Lojas</title>
+    <style>
+{ESTILO_PAINEL}
+        a {{
+            color: var(--text-main);
+        }}
+    </style>
+</head>
+<body>
+    <div class="page">
+        <header>
+            <h1>Monitoramento de Produtos iFood - Lojas</h1>
+            <div class="subtitle">
+                Última atualização: {html.escape(atualizacao)}
+            </div>
+        </header>
+
+        <section class="cards">
+            <div class="card">
+                <div class="card-label">Lojas monitoradas</div>
+                <div class="card-value warn">{len(resumos)}</div>
+            </div>
+            <div class="card">
+                <div class="card-label">Lojas com queda ativa</div>
+                <div class="card-value off">{em_queda}</div>
+            </div>
+            <div class="card">
+                <div class="card-label">Produtos ON</div>
+                <div class="card-value on">{sum(r.on for r in resumos)}</div>
+            </div>
+            <div class="card">
+                <div class="card-label">Produtos OFF</div>
+                <div class="card-value off">{sum(r.off for r in resumos)}</div>
+            </div>
+        </section>
+
+        <section class="table-wrapper">
+            <table>
+                <thead>
+                    <tr>
+                        <th>Loja</th>
+                        <th>Produtos</th>
+                        <th>ON</th>
+                        <th>OFF</th>
+                        <th>Desaparecidos</th>
+                        <th>Quedas ativas</th>
+                        <th>% disponível</th>
+                        <th>Última execução</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {linhas}
+                </tbody>
+            </table>
+        </section>
+
+        <div class="footer">
+            Visão geral gerada a partir dos resumos em <code>{NOME_RESUMO_LOJA}</code>
+            de cada loja.
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+    saida = pasta / "index.html"
+    pasta.mkdir(parents=True, exist_ok=True)
+    # Várias lojas podem regenerar a visão ao mesmo tempo: troca atômica
+    temporario = saida.with_suffix(f".{os.getpid()}.tmp")
+    temporario.write_text(pagina, encoding="utf-8")
+    os.replace(temporario, saida)
+    logger.info("Visão geral de %d lojas gerada em %s", len(resumos), saida)
+    return saida
+
+
+def publicar_loja(cfg: AppConfig, resumo: ResumoLoja) -> Path | None:
+    """
+    Grava o resumo da loja e, com LOJAS_DIR definido, copia dashboard e
+    resumo para `<LOJAS_DIR>/<slug>/` e regenera a visão geral.
+    """
+    salvar_resumo_loja(cfg.resumo_loja_path, resumo)
+    if cfg.lojas_dir is None:
+        return None
+
+    destino = cfg.lojas_dir / resumo.slug
+    destino.mkdir(parents=True, exist_ok=True)
+    for origem, nome in (
+        (cfg.dashboard_output, NOME_DASHBOARD_LOJA),
+        (cfg.resumo_loja_path, NOME_RESUMO_LOJA),
+    ):
+        # Nos workers da fila (src/fila.py) os arquivos já estão na pasta da loja
+        if origem.exists() and origem.resolve() != (destino / nome).resolve():
+            shutil.copyfile(origem, destino / nome)
+    return gerar_visao_lojas(cfg.lojas_dir)
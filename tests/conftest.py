@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator
+
+import pytest
+
+# (método, caminho, cabeçalhos, corpo) → (status, cabeçalhos, corpo)
+Responder = Callable[[str, str, dict[str, str], bytes], tuple[int, dict[str, str], Any]]
+
+
+class ServidorLocal:
+    """Servidor HTTP numa thread, com as requisições recebidas em `chamadas`."""
+
+    def __init__(self, responder: Responder) -> None:
+        self.chamadas: list[tuple[str, str, bytes]] = []
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _atender(self) -> None:
+                tamanho = int(self.headers.get("content-length") or 0)
+                corpo = self.rfile.read(tamanho) if tamanho else b""
+                servidor.chamadas.append((self.command, self.path, corpo))
+                status, cabecalhos, resposta = responder(
+                    self.command, self.path, {k.lower(): v for k, v in self.headers.items()}, corpo
+                )
+                if not isinstance(resposta, bytes):
+                    resposta = json.dumps(resposta).encode("utf-8")
+                self.send_response(status)
+                for nome, valor in cabecalhos.items():
+                    self.send_header(nome, valor)
+                self.send_header("content-length", str(len(resposta)))
+                self.end_headers()
+                self.wfile.write(resposta)
+
+            do_GET = do_POST = do_PUT = _atender
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._http.server_address[1]}"
+        self._thread = threading.Thread(target=self._http.serve_forever, daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._http.shutdown()
+        self._http.server_close()
+
+
+@pytest.fixture
+def servidor_local() -> Iterator[Callable[[Responder], ServidorLocal]]:
+    """Fábrica de servidores locais (fonte HTTP, Bot API, API do GitHub falsas)."""
+    servidores: list[ServidorLocal] = []
+
+    def criar(responder: Responder) -> ServidorLocal:
+        servidores.append(ServidorLocal(responder))
+        return servidores[-1]
+
+    yield criar
+    for s in servidores:
+        s.parar()
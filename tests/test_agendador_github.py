@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from src import agendador_github
+from src.agendador_github import (
+    PRIORIDADE_COSMETICA,
+    PRIORIDADE_ESTADO,
+    AgendadorGithub,
+    BaldeDeFichas,
+)
+from src.config import GithubConfig
+from src.github_integration import baixar_conteudo_github, fazer_upload_github
+
+
+@pytest.fixture(autouse=True)
+def agendador_novo(monkeypatch):
+    # O agendador é compartilhado pelo processo: cada teste começa com um novo
+    monkeypatch.setattr(agendador_github, "_agendador", None)
+
+
+def _cfg(srv, **kwargs) -> GithubConfig:
+    return GithubConfig(
+        token="fake", repository="dono/repo", actor="teste", api_base=srv.url, **kwargs
+    )
+
+
+def test_balde_repoe_fichas_na_taxa_ate_a_capacidade():
+    agora = [0.0]
+    balde = BaldeDeFichas(taxa=2.0, capacidade=2, relogio=lambda: agora[0])
+
+    balde.consumir()
+    balde.consumir()
+    assert balde.espera() == 0.5
+
+    agora[0] = 0.25
+    assert balde.espera() == 0.25
+
+    agora[0] = 10.0
+    assert balde.espera() == 0.0
+    assert balde.fichas == 2
+
+
+def test_retry_after_pausa_e_repete_e_le_o_orcamento(servidor_local):
+    respostas = iter(
+        [
+            (429, {"Retry-After": "0.2", "X-RateLimit-Remaining": "50"}, {}),
+            (200, {"X-RateLimit-Remaining": "49"}, {"ok": True}),
+        ]
+    )
+    srv = servidor_local(lambda *_: next(respostas))
+    agendador = AgendadorGithub(taxa=100, capacidade=10)
+
+    inicio = time.monotonic()
+    resp = agendador.requisitar("GET", f"{srv.url}/x")
+
+    assert resp.status_code == 200
+    assert len(srv.chamadas) == 2
+    assert time.monotonic() - inicio >= 0.2
+    assert agendador.restantes == 49
+
+
+def test_orcamento_zerado_espera_o_reset_ou_desiste_se_longe(servidor_local):
+    resets = iter([time.time(), time.time() + 3600])
+
+    def responder(metodo, caminho, cabecalhos, corpo):
+        if len(srv.chamadas) == 2:
+            return 200, {}, {}
+        reset = str(int(next(resets)))
+        return 403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}, {}
+
+    srv = servidor_local(responder)
+    agendador = AgendadorGithub(taxa=100, capacidade=10)
+
+    # Reset já chegou: espera ~1s e repete
+    assert agendador.requisitar("GET", f"{srv.url}/x").status_code == 200
+    assert len(srv.chamadas) == 2
+
+    # Reset daqui a 1h (acima de ESPERA_MAXIMA_S): devolve o 403 sem esperar
+    inicio = time.monotonic()
+    assert agendador.requisitar("GET", f"{srv.url}/x").status_code == 403
+    assert len(srv.chamadas) == 3
+    assert time.monotonic() - inicio < 1
+
+
+def test_token_bucket_limita_o_ritmo_das_requisicoes(servidor_local):
+    srv = servidor_local(lambda *_: (200, {}, {}))
+    agendador = AgendadorGithub(taxa=10, capacidade=1)
+
+    inicio = time.monotonic()
+    for _ in range(4):
+        agendador.requisitar("GET", f"{srv.url}/x")
+
+    # 1 ficha na rajada, as outras 3 a 10/s
+    assert time.monotonic() - inicio >= 0.29
+
+
+def test_conflito_409_busca_o_sha_de_novo_e_repete_o_put(servidor_local, tmp_path):
+    shas = iter(["v1", "v2"])
+
+    def responder(metodo, caminho, cabecalhos, corpo):
+        if metodo == "GET":
+            return 200, {}, {"sha": next(shas)}
+        return (201, {}, {}) if json.loads(corpo)["sha"] == "v2" else (409, {}, {})
+
+    srv = servidor_local(responder)
+    arquivo = tmp_path / "estado_produtos.json"
+    arquivo.write_text("{}", encoding="utf-8")
+
+    assert fazer_upload_github(_cfg(srv), arquivo)
+
+    assert [m for m, _, _ in srv.chamadas] == ["GET", "PUT", "GET", "PUT"]
+    assert [json.loads(c)["sha"] for m, _, c in srv.chamadas if m == "PUT"] == ["v1", "v2"]
+    assert srv.chamadas[0][1] == "/repos/dono/repo/contents/estado_produtos.json"
+
+
+def test_orcamento_baixo_pula_cosmeticos_e_envia_o_estado(servidor_local, tmp_path):
+    srv = servidor_local(lambda *_: (201, {"X-RateLimit-Remaining": "5"}, {}))
+    cfg = _cfg(srv, reserva=100)
+    estado = tmp_path / "estado_produtos.json"
+    estado.write_text("{}", encoding="utf-8")
+    dashboard = tmp_path / "index.html"
+    dashboard.write_text("<html></html>", encoding="utf-8")
+
+    assert fazer_upload_github(cfg, estado, prioridade=PRIORIDADE_ESTADO)
+    chamadas = len(srv.chamadas)
+
+    assert not fazer_upload_github(cfg, dashboard, prioridade=PRIORIDADE_COSMETICA)
+    assert len(srv.chamadas) == chamadas
+    assert fazer_upload_github(cfg, estado, prioridade=PRIORIDADE_ESTADO)
+
+
+def test_estado_passa_na_frente_na_fila(servidor_local):
+    srv = servidor_local(lambda *_: (200, {}, {}))
+    agendador = AgendadorGithub(taxa=5, capacidade=1)
+    agendador.requisitar("GET", f"{srv.url}/primeira")  # esgota a rajada
+
+    cosmetica = threading.Thread(
+        target=agendador.requisitar,
+        args=("GET", f"{srv.url}/cosmetica", PRIORIDADE_COSMETICA),
+    )
+    cosmetica.start()
+    while not agendador._fila:
+        time.sleep(0.005)
+    # Chega depois, mas é servida primeiro
+    agendador.requisitar("GET", f"{srv.url}/estado", PRIORIDADE_ESTADO)
+    cosmetica.join()
+
+    assert [c for _, c, _ in srv.chamadas] == ["/primeira", "/estado", "/cosmetica"]
+
+
+def test_download_cortado_nao_deixa_o_part(servidor_local, tmp_path, monkeypatch):
+    srv = servidor_local(lambda *_: (200, {}, b"x" * 100))
+
+    def cortar(self, chunk_size=1):
+        yield b"x" * 10
+        raise requests.exceptions.ChunkedEncodingError("conexão caiu")
+
+    monkeypatch.setattr(requests.Response, "iter_content", cortar)
+    cache = tmp_path / "historico_status.json"
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        baixar_conteudo_github(_cfg(srv), cache.name, cache=cache)
+
+    assert list(tmp_path.iterdir()) == []
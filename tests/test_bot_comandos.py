@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+
+from src.bot_comandos import IndiceProdutos, ServidorComandos
+from src.config import TelegramConfig, load_config
+from src.identidade import id_produto
+
+ESTADO = {
+    "Bebidas|Coca-Cola": {
+        "Seção": "Bebidas",
+        "Produto": "Coca-Cola",
+        "Preço": "R$ 6,00",
+        "Status": "ON",
+        "Última verificação": "2026-01-01 10:00",
+    },
+    "Bebidas|Guaraná": {
+        "Seção": "Bebidas",
+        "Produto": "Guaraná",
+        "Preço": "R$ 5,00",
+        "Status": "OFF",
+        "Última verificação": "2026-01-01 10:00",
+    },
+}
+
+
+def _registro(ts: str, status: str) -> dict:
+    return {"timestamp": ts, "secao": "Bebidas", "nome": "Guaraná", "status": status, "preco": "R$ 5,00"}
+
+
+def test_indice_incremental_guarda_so_mudancas():
+    indice = IndiceProdutos()
+    historico = [_registro("2026-01-01 08:00", "ON"), _registro("2026-01-01 09:00", "ON")]
+    indice.sincronizar(ESTADO, historico)
+    indice.atualizar(ESTADO, [_registro("2026-01-01 10:00", "OFF")])
+
+    assert [e.status for e in indice.eventos[id_produto("Bebidas", "Guaraná")]] == ["ON", "OFF"]
+    assert indice.responder("/off") == "🔴 1 produtos OFF:\n- Bebidas – Guaraná (OFF)"
+    assert "Coca-Cola" in indice.responder("/secao bebidas")
+    assert indice.responder("bom dia") is None
+
+
+def test_historico_segue_o_id_de_um_produto_renomeado():
+    renomeado = {
+        "Bebidas|Guaraná 2L": {
+            **ESTADO["Bebidas|Guaraná"],
+            "ID": id_produto("Bebidas", "Guaraná"),
+            "Produto": "Guaraná 2L",
+        }
+    }
+    indice = IndiceProdutos()
+    indice.sincronizar(renomeado, [_registro("2026-01-01 08:00", "ON")])
+
+    resposta = indice.responder("/historico guaraná 2l")
+    assert "2026-01-01 08:00 – ON" in resposta
+
+
+def test_servidor_responde_comandos_do_chat_configurado(servidor_local):
+    updates = [
+        {"update_id": 10, "message": {"message_id": 1, "chat": {"id": 42}, "text": "/status"}},
+        {"update_id": 11, "message": {"message_id": 2, "chat": {"id": 99}, "text": "/status"}},
+        {"update_id": 12, "message": {"message_id": 3, "chat": {"id": 42}, "text": "bom dia"}},
+        {"update_id": 13, "message": {"message_id": 4, "chat": {"id": 42}, "text": "/off"}},
+    ]
+    enviados: list[dict] = []
+    offsets: list[int] = []
+    parar = threading.Event()
+
+    def bot_api(metodo, caminho, cabecalhos, corpo):
+        params = json.loads(corpo or b"{}")
+        if caminho.endswith("/getUpdates"):
+            offsets.append(params["offset"])
+            entregar = [u for u in updates if u["update_id"] >= params["offset"]]
+            return 200, {}, {"ok": True, "result": entregar}
+        if caminho.endswith("/sendMessage"):
+            enviados.append(params)
+            if len(enviados) == 2:
+                parar.set()
+            return 200, {}, {"ok": True, "result": {"message_id": 100 + len(enviados)}}
+        return 404, {}, {"ok": False, "description": "Not Found"}
+
+    srv = servidor_local(bot_api)
+    cfg = dataclasses.replace(
+        load_config(), telegram=TelegramConfig(token="fake", chat_id="42", api_base=srv.url)
+    )
+    indice = IndiceProdutos()
+    indice.sincronizar(ESTADO, [])
+
+    bot = threading.Thread(
+        target=ServidorComandos(cfg, indice, timeout_polling=0).executar, args=(parar,)
+    )
+    bot.start()
+    bot.join(timeout=10)
+    parar.set()
+
+    assert not bot.is_alive()
+    assert [(m["chat_id"], m["reply_to_message_id"]) for m in enviados] == [(42, 1), (42, 4)]
+    assert enviados[0]["text"].startswith("📊 Última verificação: 2026-01-01 10:00")
+    assert "Guaraná" in enviados[1]["text"]
+    # Cada update é confirmado (offset) e não é entregue de novo
+    assert offsets[0] == 0 and all(o == 14 for o in offsets[1:])
+    assert all(caminho.startswith("/botfake/") for _, caminho, _ in srv.chamadas)
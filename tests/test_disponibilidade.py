@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from src.disponibilidade import (
+    JanelaDisponibilidade,
+    calcular_disponibilidade,
+    interpretar_janelas,
+)
+
+
+def _registro(timestamp: str, status: str, nome: str = "Coca-Cola") -> dict:
+    return {"secao": "Bebidas", "nome": nome, "timestamp": timestamp, "status": status}
+
+
+def test_pct_disponivel_pondera_pelo_tempo_e_nao_pelas_verificacoes():
+    # ON às 12h (execuções sem mudança não gravam histórico), depois OFF das
+    # 14h às 18h com verificações a cada hora: 2h ON de 6h verificadas
+    historico = [_registro("2024-05-01 12:00:00", "ON")] + [
+        _registro(f"2024-05-01 {h}:00:00", "OFF") for h in range(14, 19)
+    ]
+
+    (d,) = calcular_disponibilidade(historico, [JanelaDisponibilidade("7d", 7)])
+
+    produto = d.por_produto.iloc[0]
+    assert produto["verificacoes"] == 6
+    assert produto["disponibilidade_pct"] == round(100 * 2 / 6, 1)
+
+
+def test_faixa_de_horas_nao_conta_o_tempo_fora_dela():
+    # ON às 23h, OFF às 18h do dia seguinte: na faixa 18-23 o ON valeu 1h
+    # (23h-24h), não as 19h até o próximo registro
+    historico = [
+        _registro("2024-05-01 23:00:00", "ON"),
+        _registro("2024-05-02 18:00:00", "OFF"),
+        _registro("2024-05-02 20:00:00", "OFF"),
+    ]
+
+    (d,) = calcular_disponibilidade(
+        historico, [JanelaDisponibilidade("noite", 7, (18, 23))]
+    )
+
+    assert d.por_produto.iloc[0]["disponibilidade_pct"] == round(100 * 1 / 3, 1)
+
+
+def test_faixa_que_passa_da_meia_noite():
+    # Faixa 22-1: ON das 23h à 0h30, depois OFF. A verificação das 12h fica
+    # fora da faixa, mas é a referência: o OFF vale até 2h (fim da faixa)
+    historico = [
+        _registro("2024-05-01 23:00:00", "ON"),
+        _registro("2024-05-02 00:30:00", "OFF"),
+        _registro("2024-05-02 01:30:00", "OFF"),
+        _registro("2024-05-02 12:00:00", "ON"),
+    ]
+
+    (janela,) = interpretar_janelas("7d@22-1")
+    (d,) = calcular_disponibilidade(historico, [janela])
+
+    produto = d.por_produto.iloc[0]
+    assert produto["verificacoes"] == 3
+    assert produto["disponibilidade_pct"] == 50.0
+
+
+def test_horas_fora_do_dia_invalidam_a_janela():
+    assert interpretar_janelas("7d@18-24,7d") == [JanelaDisponibilidade("7d", 7)]
+
+
+def test_verificacao_unica_usa_a_proporcao_de_verificacoes():
+    historico = [
+        _registro("2024-05-01 12:00:00", "ON"),
+        _registro("2024-05-01 12:00:00", "OFF", nome="Guaraná"),
+    ]
+
+    (d,) = calcular_disponibilidade(historico, [JanelaDisponibilidade("7d", 7)])
+
+    assert d.por_secao.iloc[0]["disponibilidade_pct"] == 50.0
+
+
+def test_produto_renomeado_continua_a_mesma_serie():
+    historico = [
+        {**_registro("2024-05-01 12:00:00", "ON"), "id_produto": "abc"},
+        {**_registro("2024-05-01 13:00:00", "OFF", nome="Coca-Cola 350ml"), "id_produto": "abc"},
+        {**_registro("2024-05-01 14:00:00", "OFF", nome="Coca-Cola 350ml"), "id_produto": "abc"},
+    ]
+
+    (d,) = calcular_disponibilidade(historico, [JanelaDisponibilidade("7d", 7)])
+
+    assert d.por_produto[["nome", "verificacoes", "disponibilidade_pct"]].values.tolist() == [
+        ["Coca-Cola 350ml", 3, 50.0]
+    ]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+import sqlite3
+import time
+
+import pytest
+
+from src.config import load_config
+from src.fila import (
+    CONCLUIDA,
+    EXECUTANDO,
+    ColisaoDeSlug,
+    FilaLojas,
+    config_da_loja,
+    executar_worker,
+)
+
+LOJAS = [f"Loja {i}" for i in range(6)]
+
+
+def test_nomes_que_caem_na_mesma_pasta_sao_recusados(tmp_path):
+    fila = FilaLojas(tmp_path / "fila.sqlite3")
+    fila.enfileirar("Loja A")
+
+    with pytest.raises(ColisaoDeSlug):
+        fila.enfileirar("loja-a")
+    # O mesmo nome só não duplica a tarefa pendente
+    assert fila.enfileirar("Loja A") is None
+    assert fila.contagens() == {"pendente": 1}
+
+
+def test_worker_morto_nao_perde_nem_repete_loja(tmp_path, monkeypatch):
+    for nome, valor in {
+        "LOJAS_DIR": str(tmp_path / "lojas"),
+        "FILA_PATH": str(tmp_path / "fila.sqlite3"),
+        "FILA_LEASE_S": "2",
+        "FILA_ESPERA_S": "0.2",
+        "TELEGRAM_TOKEN": "",
+        "GITHUB_TOKEN": "",
+    }.items():
+        monkeypatch.setenv(nome, valor)
+    cfg = load_config()
+    fila = FilaLojas(cfg.fila.path, cfg.fila.lease_s, cfg.fila.tentativas)
+    for loja in LOJAS:
+        fila.enfileirar(loja)
+
+    # spawn: o worker não herda as threads do processo do pytest
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(target=executar_worker, args=(cfg, f"w{i}", True)) for i in range(3)
+    ]
+    for w in workers:
+        w.start()
+
+    # Mata o primeiro worker no meio de uma loja (parado antes de conferir,
+    # para não concluir a loja entre a consulta e o kill)
+    limite = time.monotonic() + 120
+    con = sqlite3.connect(cfg.fila.path, timeout=1, isolation_level=None)
+    while True:
+        assert time.monotonic() < limite
+        os.kill(workers[0].pid, signal.SIGSTOP)
+        try:
+            linha = con.execute(
+                "SELECT loja FROM tarefas WHERE worker = 'w0' AND status = ?", (EXECUTANDO,)
+            ).fetchone()
+        except sqlite3.OperationalError:  # parado no meio de um commit
+            linha = None
+        if linha is not None:
+            break
+        os.kill(workers[0].pid, signal.SIGCONT)
+        time.sleep(0.05)
+    morta = linha[0]
+    workers[0].kill()
+
+    for w in workers[1:]:
+        w.join(timeout=180)
+        assert w.exitcode == 0
+
+    tarefas = {
+        loja: (status, worker, tentativas)
+        for loja, status, worker, tentativas in con.execute(
+            "SELECT loja, status, worker, tentativas FROM tarefas"
+        )
+    }
+    con.close()
+    # Uma tarefa por loja, todas concluídas; a do worker morto, na 2ª tentativa
+    assert sorted(tarefas) == LOJAS
+    assert {status for status, _, _ in tarefas.values()} == {CONCLUIDA}
+    assert tarefas[morta][1] != "w0" and tarefas[morta][2] == 2
+    for loja in LOJAS:
+        assert (config_da_loja(cfg, loja).estado_path).exists()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pytest
+
+from src.fontes import FonteHTTPJSON, carregar_fonte, ler_produtos_csv
+
+COCA = {"secao": "Bebidas", "nome": "Coca-Cola", "preco": "R$ 6,00", "descricao": "", "status": "ON"}
+
+
+def test_varias_lojas_nao_colidem(servidor_local, tmp_path):
+    def responder(metodo, caminho, cabecalhos, corpo):
+        if caminho == "/loja-a":
+            return 200, {}, [COCA]
+        return 200, {}, {"loja": "Loja B", "produtos": [{**COCA, "status": "OFF"}]}
+
+    srv = servidor_local(responder)
+    fonte = FonteHTTPJSON([f"{srv.url}/loja-a", f"{srv.url}/loja-b"], cache_dir=tmp_path)
+
+    produtos = {p.chave: p.status for p in carregar_fonte(fonte)}
+
+    host = srv.url.removeprefix("http://")
+    assert produtos == {
+        f"{host}/loja-a / Bebidas|Coca-Cola": "ON",
+        "Loja B / Bebidas|Coca-Cola": "OFF",
+    }
+
+
+def test_chaves_nao_mudam_quando_outra_loja_entra(servidor_local, tmp_path):
+    srv = servidor_local(lambda *_: (200, {}, {"loja": "Loja A", "produtos": [COCA]}))
+
+    sozinha = carregar_fonte(FonteHTTPJSON([f"{srv.url}/a"], cache_dir=tmp_path))
+    juntas = carregar_fonte(FonteHTTPJSON([f"{srv.url}/a", f"{srv.url}/b"], cache_dir=tmp_path))
+
+    assert [p.chave for p in sozinha] == ["Loja A / Bebidas|Coca-Cola"]
+    assert sozinha[0].chave in {p.chave for p in juntas}
+
+
+def test_url_unica_revalida_com_etag(servidor_local, tmp_path):
+    def responder(metodo, caminho, cabecalhos, corpo):
+        if cabecalhos.get("if-none-match") == '"v1"':
+            return 304, {}, b""
+        return 200, {"etag": '"v1"'}, {"loja": "Loja A", "produtos": [COCA]}
+
+    srv = servidor_local(responder)
+    fonte = FonteHTTPJSON([f"{srv.url}/cardapio"], cache_dir=tmp_path)
+
+    assert [p.chave for p in carregar_fonte(fonte)] == ["Loja A / Bebidas|Coca-Cola"]
+    assert [p.chave for p in carregar_fonte(fonte)] == ["Loja A / Bebidas|Coca-Cola"]
+    assert len(srv.chamadas) == 2
+
+
+def test_url_com_erro_usa_o_ultimo_cardapio_em_cache(servidor_local, tmp_path):
+    respostas = iter([(200, {}, [COCA]), (503, {}, b"")])
+    srv = servidor_local(lambda *_: next(respostas))
+    fonte = FonteHTTPJSON([f"{srv.url}/a"], cache_dir=tmp_path)
+
+    primeira = carregar_fonte(fonte)
+    segunda = carregar_fonte(fonte)
+
+    host = srv.url.removeprefix("http://")
+    assert [p.chave for p in segunda] == [p.chave for p in primeira]
+    assert [p.chave for p in segunda] == [f"{host}/a / Bebidas|Coca-Cola"]
+
+
+def test_url_com_erro_e_sem_cache_interrompe(servidor_local, tmp_path):
+    # Seguir sem a loja marcaria todos os produtos dela como desaparecidos
+    def responder(metodo, caminho, cabecalhos, corpo):
+        return (200, {}, [COCA]) if caminho == "/a" else (500, {}, {"erro": "fora do ar"})
+
+    srv = servidor_local(responder)
+    fonte = FonteHTTPJSON([f"{srv.url}/a", f"{srv.url}/quebrada"], cache_dir=tmp_path)
+
+    with pytest.raises(RuntimeError, match="quebrada"):
+        carregar_fonte(fonte)
+
+
+def test_todas_as_urls_com_erro_interrompe(servidor_local, tmp_path):
+    srv = servidor_local(lambda *_: (500, {}, b""))
+    fonte = FonteHTTPJSON([f"{srv.url}/a", f"{srv.url}/b"], cache_dir=tmp_path)
+
+    with pytest.raises(RuntimeError):
+        carregar_fonte(fonte)
+
+
+def test_csv_com_linha_curta_aponta_a_linha(tmp_path):
+    csv = tmp_path / "produtos.csv"
+    csv.write_text(
+        "Secao,Produto,Preco,Descricao,Status\n"
+        "Bebidas,Coca-Cola,\"R$ 6,00\",Lata,ON\n"
+        "Bebidas,Guaraná\n",
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValueError, match="Linha 3"):
+        ler_produtos_csv(csv)
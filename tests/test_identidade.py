@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from src.identidade import id_produto, reconciliar_produtos
+from src.registros import novo_registro
+from src.state import montar_estado
+
+
+def _produto(nome: str, secao: str = "Bebidas"):
+    return novo_registro(secao, nome, "R$ 6,00", "", "ON", "2024-05-01 12:00:00")
+
+
+def test_renomeado_mantem_id_e_chave_antiga_fica_aposentada():
+    original = _produto("Coca-Cola Lata 350ml")
+    reconciliar_produtos([original], {}, "2024-05-01 12:00:00")
+    estado = montar_estado([original], "2024-05-01 12:00:00")
+
+    renomeado = _produto("Coca-Cola Lata 350 ml")
+    estado, correspondencias = reconciliar_produtos([renomeado], estado, "2024-05-01 13:00:00")
+    assert [c.chave_anterior for c in correspondencias] == ["Bebidas|Coca-Cola Lata 350ml"]
+    assert renomeado.id_produto == original.id_produto == id_produto("Bebidas", "Coca-Cola Lata 350ml")
+    estado = montar_estado([renomeado], "2024-05-01 13:00:00")
+
+    # Um produto novo com o nome antigo não herda o ID do renomeado
+    renomeado, intruso = _produto("Coca-Cola Lata 350 ml"), _produto("Coca-Cola Lata 350ml")
+    reconciliar_produtos([renomeado, intruso], estado, "2024-05-01 14:00:00")
+    assert renomeado.id_produto == original.id_produto
+    assert intruso.id_produto == id_produto("Bebidas", "Coca-Cola Lata 350ml", "2024-05-01 14:00:00")
+
+
+def test_produto_que_volta_recupera_o_id_da_chave():
+    produto = _produto("Guaraná")
+    reconciliar_produtos([produto], {}, "2024-05-01 12:00:00")
+
+    # Sumiu do estado e voltou: sem conflito, o mesmo ID derivado da chave
+    de_volta = _produto("Guaraná")
+    reconciliar_produtos([de_volta], {}, "2024-05-03 12:00:00")
+    assert de_volta.id_produto == produto.id_produto
+
+
+def test_variantes_de_tamanho_nao_sao_renomeacao():
+    dois_litros = _produto("Coca-Cola 2L")
+    reconciliar_produtos([dois_litros], {}, "2024-05-01 12:00:00")
+    estado = montar_estado([dois_litros], "2024-05-01 12:00:00")
+
+    um_litro = _produto("Coca-Cola 1L")
+    estado, correspondencias = reconciliar_produtos([um_litro], estado, "2024-05-01 13:00:00")
+
+    # O 2L sumiu de verdade e o 1L é novo
+    assert correspondencias == []
+    assert um_litro.id_produto == id_produto("Bebidas", "Coca-Cola 1L")
+    assert "Bebidas|Coca-Cola 2L" in estado
+
+
+def test_mesma_quantidade_em_outra_grafia_ainda_casa():
+    antigo = _produto("Guaraná Lata 1,5L")
+    reconciliar_produtos([antigo], {}, "2024-05-01 12:00:00")
+    estado = montar_estado([antigo], "2024-05-01 12:00:00")
+
+    novo = _produto("Guaraná Lata 1.5 L")
+    _, correspondencias = reconciliar_produtos([novo], estado, "2024-05-01 13:00:00")
+
+    assert novo.id_produto == antigo.id_produto
+    assert len(correspondencias) == 1
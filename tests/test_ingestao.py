@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+import src.monitor
+from src.config import load_config
+from src.ingestao import ErroRequisicao, ServidorIngestao, carregar_catalogo_inicial
+from src.registros import novo_registro
+from src.state import EstadoEmMemoria, montar_estado
+
+COCA = novo_registro("Bebidas", "Coca-Cola", "R$ 6,00", "", "ON")
+
+
+def _servidor(memoria: EstadoEmMemoria | None = None) -> ServidorIngestao:
+    return ServidorIngestao(load_config(), memoria or EstadoEmMemoria(), [COCA])
+
+
+async def _ler(servidor: ServidorIngestao, cabecalhos: str, corpo: bytes = b""):
+    reader = asyncio.StreamReader()
+    reader.feed_data(f"POST /eventos HTTP/1.1\r\n{cabecalhos}\r\n".encode() + corpo)
+    reader.feed_eof()
+    return await servidor._ler_requisicao(reader)
+
+
+@pytest.mark.parametrize(
+    "cabecalhos, status",
+    [
+        ("Content-Length: abc\r\n", 400),
+        ("Content-Length: -5\r\n", 400),
+        ("Transfer-Encoding: chunked\r\n", 411),
+    ],
+)
+def test_content_length_invalido_e_recusado(cabecalhos, status):
+    async def cenario():
+        with pytest.raises(ErroRequisicao) as erro:
+            await _ler(_servidor(), cabecalhos)
+        assert erro.value.status == status
+
+    asyncio.run(cenario())
+
+
+@pytest.mark.parametrize(
+    "evento",
+    [
+        '{"secao": "Bebidas", "nome": "Coca-Cola", "status": 1}',
+        '{"secao": "Bebidas", "nome": "Coca-Cola", "status": "ESGOTADO"}',
+        '{"secao": "Bebidas", "nome": "Coca-Cola", "preco": 6.5}',
+        '{"secao": "Bebidas", "nome": "Coca-Cola", "preco": "barato"}',
+    ],
+)
+def test_evento_invalido_recusa_o_lote_sem_mexer_no_catalogo(evento):
+    async def cenario():
+        servidor = _servidor()
+        lote = f'[{{"secao": "Bebidas", "nome": "Guaraná", "status": "OFF"}}, {evento}]'
+        with pytest.raises(ErroRequisicao) as erro:
+            servidor._rotear("POST", "/eventos", {}, lote.encode())
+        assert erro.value.status == 400
+        assert list(servidor.catalogo) == ["Bebidas|Coca-Cola"]
+        assert servidor.pendentes == 0
+
+        so_preco = b'{"secao": "Bebidas", "nome": "Coca-Cola", "preco": "R$ 7,00"}'
+        status, _ = servidor._rotear("POST", "/eventos", {}, so_preco)
+        assert status == 202
+        assert servidor.catalogo["Bebidas|Coca-Cola"].preco == "R$ 7,00"
+        assert servidor.catalogo["Bebidas|Coca-Cola"].status == "ON"
+
+    asyncio.run(cenario())
+
+
+def test_lotes_de_push_sao_rodadas_leves_ate_vencer_o_intervalo(monkeypatch):
+    chamadas: list[bool] = []
+
+    def monitorar(cfg, memoria, produtos=None, artefatos=True):
+        chamadas.append(artefatos)
+        memoria.registros_novos.append({"nome": "Coca-Cola"})
+        if artefatos:
+            memoria.artefatos_em = time.monotonic()
+
+    monkeypatch.setattr(src.monitor, "monitorar", monitorar)
+
+    async def cenario():
+        servidor = _servidor()
+        evento = b'{"secao": "Bebidas", "nome": "Coca-Cola", "status": "OFF"}'
+        for _ in range(3):
+            servidor._rotear("POST", "/eventos", {}, evento)
+            await servidor.processar_pendencias()
+        return servidor
+
+    servidor = asyncio.run(cenario())
+    assert chamadas == [True, False, False]
+    assert servidor.memoria.registros_novos == []
+
+
+def test_fonte_fora_do_ar_parte_do_ultimo_estado(tmp_path):
+    # Começar vazio faria o primeiro evento marcar o resto como desaparecido
+    cfg = load_config()
+    cfg.fonte = f"csv:{tmp_path / 'nao_existe.csv'}"
+    guarana = novo_registro("Bebidas", "Guaraná", "R$ 5,00", "", "OFF")
+    memoria = EstadoEmMemoria(estado=montar_estado([COCA, guarana], "2024-05-01 12:00:00"))
+
+    catalogo = asyncio.run(carregar_catalogo_inicial(cfg, memoria))
+
+    assert {p.chave: p.status for p in catalogo} == {
+        "Bebidas|Coca-Cola": "ON",
+        "Bebidas|Guaraná": "OFF",
+    }
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import json
+import logging
+
+from src import logs
+from src.config import LogConfig
+
+
+def test_json_inclui_excecao_e_parar_e_idempotente(tmp_path):
+    arquivo = tmp_path / "monitor.log"
+    raiz = logging.getLogger()
+    handlers_antes = list(raiz.handlers)
+    try:
+        logs.configurar_logging(arquivo, LogConfig(formato="json"))
+        with logs.etapa_de_log("historico"):
+            try:
+                {}["faltando"]
+            except KeyError:
+                logging.getLogger("teste").exception("Falha ao ler %s", "historico")
+        logs._parar_listener()
+        logs._parar_listener()
+    finally:
+        for handler in raiz.handlers:
+            if handler not in handlers_antes:
+                raiz.removeHandler(handler)
+
+    (linha,) = [json.loads(l) for l in arquivo.read_text(encoding="utf-8").splitlines()]
+    assert linha["mensagem"] == "Falha ao ler historico"
+    assert linha["etapa"] == "historico"
+    assert "KeyError: 'faltando'" in linha["exc"]
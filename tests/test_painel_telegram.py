@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+
+import pytest
+
+from src.config import TelegramConfig, load_config
+from src.painel_telegram import (
+    LIMITE_TEXTO,
+    EstadoPainel,
+    atualizar_painel_telegram,
+    carregar_paineis,
+    salvar_paineis,
+)
+from src.registros import novo_registro
+from src.resumo import agregar_execucao
+
+
+def _rodar(servidor_local, tmp_path, responder, secoes: int = 2):
+    chamadas: list[tuple[str, dict]] = []
+
+    def bot_api(metodo, caminho, cabecalhos, corpo):
+        params = json.loads(corpo or b"{}")
+        chamadas.append((caminho.rsplit("/", 1)[-1], params))
+        return responder(caminho.rsplit("/", 1)[-1])
+
+    srv = servidor_local(bot_api)
+    cfg = dataclasses.replace(
+        load_config(),
+        telegram=TelegramConfig(token="fake", chat_id="42", api_base=srv.url, modo="painel"),
+        painel_path=tmp_path / "painel_telegram.json",
+        outbox_path=tmp_path / "outbox_telegram.json",
+    )
+    salvar_paineis(cfg.painel_path, {"42": EstadoPainel(message_id=7, hash_conteudo="antigo")})
+
+    produtos = [
+        novo_registro(f"Seção {i:03d}", "Coca-Cola", "R$ 6,00", "", "ON", "2026-01-01 10:00:00")
+        for i in range(secoes)
+    ]
+    resumo = agregar_execucao(produtos, [], [], "2026-01-01 10:00:00")
+    atualizar_painel_telegram(cfg, [], [], len(produtos), resumo)
+    return chamadas, carregar_paineis(cfg.painel_path)["42"]
+
+
+def _ok(metodo):
+    return 200, {}, {"ok": True, "result": {"message_id": 8} if metodo == "sendMessage" else True}
+
+
+@pytest.mark.parametrize(
+    "status, descricao",
+    [
+        (400, "Bad Request: message is not modified"),
+        (500, "Internal Server Error"),
+        (429, "Too Many Requests: retry after 5"),
+    ],
+)
+def test_erro_ao_editar_nao_recria_o_painel(servidor_local, tmp_path, status, descricao):
+    def responder(metodo):
+        if metodo == "editMessageText":
+            return status, {}, {"ok": False, "description": descricao}
+        return _ok(metodo)
+
+    chamadas, painel = _rodar(servidor_local, tmp_path, responder)
+
+    assert [m for m, _ in chamadas] == ["editMessageText"]
+    assert painel.message_id == 7
+    # "not modified" é sucesso; nos demais a próxima execução tenta de novo
+    assert (painel.hash_conteudo != "antigo") == (status == 400)
+
+
+def test_mensagem_apagada_recria_e_fixa_o_painel(servidor_local, tmp_path):
+    def responder(metodo):
+        if metodo == "editMessageText":
+            return 400, {}, {"ok": False, "description": "Bad Request: message to edit not found"}
+        return _ok(metodo)
+
+    chamadas, painel = _rodar(servidor_local, tmp_path, responder)
+
+    assert [m for m, _ in chamadas] == ["editMessageText", "sendMessage", "pinChatMessage"]
+    assert painel.message_id == 8
+
+
+def test_texto_do_painel_respeita_o_limite_da_api(servidor_local, tmp_path):
+    chamadas, _ = _rodar(servidor_local, tmp_path, _ok, secoes=300)
+
+    ((metodo, params),) = chamadas
+    assert metodo == "editMessageText"
+    assert len(params["text"]) <= LIMITE_TEXTO
+    assert "…\n\n🕒 Última mudança:" in params["text"]
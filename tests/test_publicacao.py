@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import zipfile
+
+import pytest
+
+from src.publicacao import publicar_site
+
+
+def _arquivos(tmp_path):
+    dashboard = tmp_path / "dashboard.html"
+    dashboard.write_text(
+        "<html><head><style>body { color: red; }</style></head><body>oi</body></html>",
+        encoding="utf-8",
+    )
+    estado = tmp_path / "estado_produtos.json"
+    estado.write_text(json.dumps({"a": {"status": "ON"}}, indent=2), encoding="utf-8")
+    excel = tmp_path / "produtos_ifood.xlsx"
+    with zipfile.ZipFile(excel, "w") as z:
+        z.writestr("xl/workbook.xml", "<workbook/>")
+    return dashboard, [estado, excel]
+
+
+def test_excel_publicado_como_esta_e_json_compactado(tmp_path):
+    dashboard, dados = _arquivos(tmp_path)
+
+    resultado = publicar_site(dashboard, tmp_path / "site", dados)
+
+    excel = resultado.manifesto["arquivos"]["produtos_ifood.xlsx"]
+    assert excel["arquivo"].startswith("dados/produtos_ifood.")
+    assert excel["arquivo"].endswith(".xlsx")
+    assert "gz" not in excel
+    assert (tmp_path / "site" / excel["arquivo"]).read_bytes() == dados[1].read_bytes()
+
+    estado = resultado.manifesto["arquivos"]["estado_produtos.json"]
+    assert (tmp_path / "site" / estado["arquivo"]).read_bytes() == b'{"a":{"status":"ON"}}'
+    assert "gz" in estado
+
+
+def test_sem_mudanca_nao_grava_nada(tmp_path):
+    dashboard, dados = _arquivos(tmp_path)
+    publicar_site(dashboard, tmp_path / "site", dados)
+
+    resultado = publicar_site(dashboard, tmp_path / "site", dados)
+
+    assert not resultado.mudou
+
+
+def test_so_remove_o_que_a_publicacao_anterior_gerou(tmp_path):
+    dashboard, dados = _arquivos(tmp_path)
+    site = tmp_path / "site"
+    antes = publicar_site(dashboard, site, dados)
+    alheio = site / "notas.txt"
+    alheio.write_text("não é do site", encoding="utf-8")
+
+    dados[0].write_text(json.dumps({"a": {"status": "OFF"}}), encoding="utf-8")
+    depois = publicar_site(dashboard, site, dados)
+
+    antigo = antes.manifesto["arquivos"]["estado_produtos.json"]["arquivo"]
+    assert antigo in depois.removidos
+    assert not (site / antigo).exists()
+    assert alheio.exists()
+
+
+def test_recusa_pasta_com_repositorio_git(tmp_path):
+    dashboard, dados = _arquivos(tmp_path)
+    (tmp_path / ".git").mkdir()
+
+    with pytest.raises(ValueError):
+        publicar_site(dashboard, tmp_path, dados)
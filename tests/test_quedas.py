@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from src.quedas import (
+    LOJA_FORA,
+    MIN_EXECUCOES_Z,
+    NORMAL,
+    SECAO_FORA,
+    EstatisticasOff,
+    detectar_quedas,
+)
+from src.registros import ProdutoRegistro
+
+
+def _produtos(off_por_secao: dict[str, int], total: int = 10) -> list[ProdutoRegistro]:
+    return [
+        ProdutoRegistro(secao, f"{secao} {i}", "R$ 1,00", "", "OFF" if i < off else "ON")
+        for secao, off in off_por_secao.items()
+        for i in range(total)
+    ]
+
+
+def _aquecer(estatisticas: EstatisticasOff, off_por_secao: dict[str, int]) -> None:
+    for i in range(MIN_EXECUCOES_Z + 5):
+        # Um pouco de ruído para a variância não ser zero
+        ruido = {s: off + i % 2 for s, off in off_por_secao.items()}
+        detectar_quedas(_produtos(ruido), estatisticas)
+
+
+def test_secao_so_cai_com_escore_z_alto_e_alerta_persiste():
+    estatisticas = EstatisticasOff()
+    _aquecer(estatisticas, {"Bebidas": 0, "Lanches": 1})
+    assert detectar_quedas(_produtos({"Bebidas": 1, "Lanches": 1}), estatisticas).tipo != SECAO_FORA
+
+    # 60% OFF: abaixo do antigo limiar fixo de 80%, mas muito acima do normal
+    quedas = detectar_quedas(_produtos({"Bebidas": 6, "Lanches": 1}), estatisticas)
+    assert quedas.tipo == SECAO_FORA
+    assert [q.secao for q in quedas.secoes] == ["Bebidas"]
+
+    # A média não aprende a queda: o alerta continua nas execuções seguintes
+    for _ in range(10):
+        quedas = detectar_quedas(_produtos({"Bebidas": 6, "Lanches": 1}), estatisticas)
+        assert [q.secao for q in quedas.secoes] == ["Bebidas"]
+
+    assert detectar_quedas(_produtos({"Bebidas": 0, "Lanches": 1}), estatisticas).tipo != SECAO_FORA
+
+
+def test_secao_normalmente_off_nao_e_queda_e_loja_toda_off_e():
+    estatisticas = EstatisticasOff()
+    _aquecer(estatisticas, {"Bebidas": 0, "Sazonais": 9})
+
+    assert detectar_quedas(_produtos({"Bebidas": 0, "Sazonais": 10}), estatisticas).tipo != SECAO_FORA
+    assert detectar_quedas(_produtos({"Bebidas": 10, "Sazonais": 10}), estatisticas).tipo == LOJA_FORA
+
+
+def test_sem_historico_vale_a_fracao_absoluta():
+    assert detectar_quedas(_produtos({"Bebidas": 8}), EstatisticasOff()).tipo == LOJA_FORA
+    assert detectar_quedas(_produtos({"Bebidas": 0}), EstatisticasOff()).tipo == NORMAL
+
+
+def test_secao_que_sumiu_sai_das_estatisticas():
+    estatisticas = EstatisticasOff()
+    detectar_quedas(_produtos({"Bebidas": 0, "Natal": 0}), estatisticas)
+
+    detectar_quedas(_produtos({"Bebidas": 0}), estatisticas)
+
+    assert list(estatisticas.secoes) == ["Bebidas"]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+
+from src.config import load_config
+from src.reprocessar import reprocessar_snapshots
+
+CABECALHO = "Secao,Produto,Preco,Descricao,Status\n"
+
+
+def test_reprocessa_em_ordem_e_descarta_snapshot_invalido(tmp_path):
+    pasta = tmp_path / "exports"
+    pasta.mkdir()
+    snapshots = {
+        "produtos_2026-10-01_1200.csv": (
+            "Bebidas,Coca-Cola,\"R$ 6,00\",,ON\nBebidas,Guaraná,\"R$ 5,00\",,ON\n"
+        ),
+        "produtos_2026-10-01_1300.csv": "Bebidas,Coca-Cola,\"R$ 6,00\",,TALVEZ\n",
+        "produtos_2026-10-01_1400.csv": "Bebidas,Coca-Cola,\"R$ 6,00\",,OFF\n",
+    }
+    for nome, linhas in snapshots.items():
+        (pasta / nome).write_text(CABECALHO + linhas, encoding="utf-8")
+
+    saida = tmp_path / "saida"
+    resultado = reprocessar_snapshots(load_config(), pasta, saida=saida, processos=2)
+
+    assert (resultado.snapshots, resultado.invalidos, resultado.desaparecimentos) == (3, 1, 1)
+    estado = json.loads((saida / "estado_produtos.json").read_text(encoding="utf-8"))
+    assert {chave: info["Status"] for chave, info in estado.items()} == {"Bebidas|Coca-Cola": "OFF"}
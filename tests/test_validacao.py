@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+from src.fontes import ler_produtos_csv
+from src.validacao import verificar_qualidade
+
+
+def _csv(tmp_path, *status: str):
+    arquivo = tmp_path / "cardapio.csv"
+    linhas = ["Secao,Produto,Preco,Descricao,Status"] + [
+        f'Bebidas,Item {i},"R$ 5,00",,{s}' for i, s in enumerate(status)
+    ]
+    arquivo.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+    return ler_produtos_csv(arquivo)
+
+
+def test_status_em_outra_grafia_e_normalizado(tmp_path):
+    produtos = _csv(tmp_path, "on", "Off ", "off (desapareceu)")
+
+    assert verificar_qualidade(produtos).ok
+    assert [p.status for p in produtos] == ["ON", "OFF", "OFF (Desapareceu)"]
+
+
+def test_status_desconhecido_interrompe(tmp_path):
+    with pytest.raises(ValueError, match="status desconhecidos"):
+        verificar_qualidade(_csv(tmp_path, "ON", "ativo"))